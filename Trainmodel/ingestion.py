@@ -0,0 +1,261 @@
+# backend/Trainmodel/ingestion.py
+#
+# Streaming ingestion for training: reads the CSV or a SQLite table in
+# fixed-size float32 chunks and produces the imputed, scaled matrix as an
+# on-disk memmap, so memory during preprocessing stays bounded by
+# chunkRows + reservoirSize no matter how many rows there are.
+#
+#   pass 1  count rows, keep a uniform reservoir sample, fit KNNImputer on it
+#   pass 2  impute each chunk, write it to the memmap, scaler.partial_fit
+#   pass 3  scale the memmap in place, chunk by chunk
+#
+# Used by `python Trainmodel/train_model.py --stream [--source sqlite]`.
+
+import hashlib
+import json
+import os
+import sqlite3
+
+import numpy as np
+
+from database.queries import (
+    TRAINING_LABEL, labeledIdsQuery, labeledRowsCountQuery, trainingRowsByIdQuery, trainingRowsQuery
+)
+from models.inference_pipeline import FEATURE_ORDER
+
+DTYPE = np.float32
+
+# MB sklearn may use for one block of the imputer's distance matrix
+# (its default is 1024)
+IMPUTER_WORKING_MEMORY = 64
+
+# Ids per IN (...) statement, well under SQLite's bound-parameter limit
+ID_BATCH = 500
+
+
+# ---------------- SOURCES ----------------
+
+def iterCsvChunks(path: str, chunkRows: int):
+    """
+    Yields (X float32 [n, 8], y int8 [n]) chunks of a PIMA-layout CSV
+    """
+    import pandas as pd
+
+    dtypes = dict.fromkeys(FEATURE_ORDER, DTYPE)
+    dtypes["Outcome"] = np.int8
+    reader = pd.read_csv(path, usecols=FEATURE_ORDER + ["Outcome"], dtype=dtypes, chunksize=chunkRows)
+    for chunk in reader:
+        yield chunk[FEATURE_ORDER].to_numpy(dtype=DTYPE), chunk["Outcome"].to_numpy(dtype=np.int8)
+
+
+def requireLabeledRows(databasePath: str, table: str) -> int:
+    """
+    Number of rows of table with a confirmed outcome; raises ValueError if
+    there are none (or the database predates the column)
+    """
+    connection = sqlite3.connect(databasePath)
+    try:
+        count = connection.execute(labeledRowsCountQuery(table)).fetchone()[0]
+    except sqlite3.OperationalError as e:
+        raise ValueError(f"{table} in {databasePath} has no {TRAINING_LABEL} column ({e}); start the API once to migrate it")
+    finally:
+        connection.close()
+    if not count:
+        raise ValueError(
+            f"{table} has no rows with a {TRAINING_LABEL}. Served predictions are not labels: "
+            f"record confirmed diagnoses first"
+        )
+    return count
+
+
+def iterSqliteChunks(databasePath: str, table: str, chunkRows: int, afterId: int = 0):
+    """
+    Yields (X float32 [n, 8], y int8 [n], last id) chunks of the rows of
+    daily_reports or patients with a confirmed outcome, in id order,
+    starting after afterId. NULL readings become NaN.
+    """
+    sql = trainingRowsQuery(table)
+    connection = sqlite3.connect(databasePath)
+    try:
+        while True:
+            rows = connection.execute(sql, (afterId, chunkRows)).fetchall()
+            if not rows:
+                return
+            data = np.array([row[1:] for row in rows], dtype=np.float64)
+            afterId = rows[-1][0]
+            yield data[:, :8].astype(DTYPE), data[:, 8].astype(np.int8), afterId
+    finally:
+        connection.close()
+
+
+def labeledIds(databasePath: str, table: str) -> np.ndarray:
+    """
+    Sorted ids of the rows of table with a confirmed outcome
+    """
+    connection = sqlite3.connect(databasePath)
+    try:
+        return np.array([row[0] for row in connection.execute(labeledIdsQuery(table))], dtype=np.int64)
+    finally:
+        connection.close()
+
+
+def iterSqliteRowsById(databasePath: str, table: str, ids: np.ndarray, chunkRows: int):
+    """
+    Yields (X float32 [n, 8], y int8 [n], ids int64 [n]) chunks of the given
+    labeled rows, in id order
+    """
+    connection = sqlite3.connect(databasePath)
+    try:
+        for start in range(0, len(ids), chunkRows):
+            rows = []
+            chunk = [int(rowId) for rowId in ids[start:start + chunkRows]]
+            for offset in range(0, len(chunk), ID_BATCH):
+                batch = chunk[offset:offset + ID_BATCH]
+                rows.extend(connection.execute(trainingRowsByIdQuery(table, len(batch)), batch).fetchall())
+            if not rows:
+                continue
+            data = np.array([row[1:] for row in rows], dtype=np.float64)
+            yield data[:, :8].astype(DTYPE), data[:, 8].astype(np.int8), np.array([row[0] for row in rows], dtype=np.int64)
+    finally:
+        connection.close()
+
+
+def chunkSource(source: str, path: str, chunkRows: int, table: str = "daily_reports"):
+    """
+    Returns a zero-argument callable producing a fresh (X, y) chunk iterator,
+    since preprocessing reads the source more than once
+    """
+    if source == "csv":
+        return lambda: iterCsvChunks(path, chunkRows)
+    return lambda: ((X, y) for X, y, _ in iterSqliteChunks(path, table, chunkRows))
+
+
+def sourceKey(source: str, path: str, table: str = "daily_reports") -> str:
+    """
+    Identifies the current contents of a source for the preprocessing cache
+    """
+    digest = hashlib.sha256(f"{source}:{table}".encode())
+    if source == "csv":
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+    else:
+        # Rows are append-only but outcomes are confirmed later, so the key
+        # covers which rows are labeled and how, not just the last id
+        connection = sqlite3.connect(path)
+        try:
+            digest.update(repr(connection.execute(
+                f"SELECT COUNT(*), MAX(id), TOTAL(id * 2 + {TRAINING_LABEL}) FROM {table} WHERE {TRAINING_LABEL} IS NOT NULL"
+            ).fetchone()).encode())
+        finally:
+            connection.close()
+    return digest.hexdigest()
+
+
+# ---------------- SAMPLING ----------------
+
+class ReservoirSampler:
+    """
+    Uniform sample of at most capacity rows from a stream of chunks
+    (Algorithm R, with the random draws vectorized per chunk)
+    """
+
+    def __init__(self, capacity: int, columns: int, seed: int = 42):
+        self.capacity = capacity
+        self.sample = np.empty((capacity, columns), dtype=DTYPE)
+        self.seen = 0
+        self._rng = np.random.default_rng(seed)
+
+    # +add(chunk : ndarray) : void
+    def add(self, chunk: np.ndarray):
+        # Fill the reservoir first
+        free = max(0, min(self.capacity - self.seen, len(chunk)))
+        self.sample[self.seen:self.seen + free] = chunk[:free]
+        rest = chunk[free:]
+        start = self.seen + free
+        self.seen += len(chunk)
+        if not len(rest):
+            return
+
+        # Row i of the stream (0-based) replaces a random slot with probability capacity / (i + 1)
+        slots = self._rng.integers(0, np.arange(start, start + len(rest)) + 1)
+        for row, slot in zip(np.flatnonzero(slots < self.capacity), slots[slots < self.capacity]):
+            self.sample[slot] = rest[row]
+
+    def values(self) -> np.ndarray:
+        return self.sample[:min(self.seen, self.capacity)]
+
+
+# ---------------- PREPROCESS ----------------
+
+def streamPreprocess(chunks, outDir: str, reservoirSize: int = 20000, neighbors: int = 5, seed: int = 42):
+    """
+    Runs the three passes over chunks() and returns
+    (X memmap [n, 8] float32, y memmap [n] int8, imputer, scaler)
+    """
+    from sklearn import config_context
+    from sklearn.impute import KNNImputer
+    from sklearn.preprocessing import StandardScaler
+
+    # Pass 1: row count + reservoir sample for the imputer
+    sampler = ReservoirSampler(reservoirSize, len(FEATURE_ORDER), seed)
+    for X, _ in chunks():
+        sampler.add(X)
+    rowCount = sampler.seen
+    if rowCount == 0:
+        raise ValueError("Training source has no rows")
+
+    # The API keeps the fit data for neighbour lookups, so this also bounds
+    # the imputer artifact and serving-side KD-trees
+    imputer = KNNImputer(n_neighbors=neighbors)
+    imputer.fit(sampler.values().astype(np.float64))
+
+    os.makedirs(outDir, exist_ok=True)
+    Xout = np.lib.format.open_memmap(os.path.join(outDir, "X.npy"), mode="w+", dtype=DTYPE, shape=(rowCount, len(FEATURE_ORDER)))
+    yout = np.lib.format.open_memmap(os.path.join(outDir, "y.npy"), mode="w+", dtype=np.int8, shape=(rowCount,))
+
+    # Pass 2: impute, store, accumulate scaler statistics
+    scaler = StandardScaler()
+    offset = 0
+    for X, y in chunks():
+        with config_context(working_memory=IMPUTER_WORKING_MEMORY):
+            imputed = imputer.transform(X.astype(np.float64))
+        scaler.partial_fit(imputed)
+        Xout[offset:offset + len(X)] = imputed
+        yout[offset:offset + len(X)] = y
+        offset += len(X)
+
+    # Pass 3: scale in place
+    chunkRows = max(1, min(rowCount, 1 << 16))
+    for start in range(0, rowCount, chunkRows):
+        Xout[start:start + chunkRows] = scaler.transform(Xout[start:start + chunkRows].astype(np.float64))
+
+    Xout.flush()
+    yout.flush()
+    return Xout, yout, imputer, scaler
+
+
+def loadStreamed(source: str, path: str, cacheDir: str, chunkRows: int = 50000, reservoirSize: int = 20000,
+                 table: str = "daily_reports", seed: int = 42, useCache: bool = True):
+    """
+    streamPreprocess() through the on-disk cache; the memmaps are reopened
+    read-only when the source has not changed.
+    Returns (X, y, imputer, scaler, cacheHit).
+    """
+    import joblib
+
+    settings = {"source": source, "table": table, "reservoir": reservoirSize, "neighbors": 5, "seed": seed}
+    key = hashlib.sha256((sourceKey(source, path, table) + json.dumps(settings, sort_keys=True)).encode()).hexdigest()[:16]
+    outDir = os.path.join(cacheDir, f"stream-{key}")
+    marker = os.path.join(outDir, "preprocessors.joblib")
+
+    if useCache and os.path.exists(marker):
+        preprocessors = joblib.load(marker)
+        X = np.load(os.path.join(outDir, "X.npy"), mmap_mode="r")
+        y = np.load(os.path.join(outDir, "y.npy"), mmap_mode="r")
+        return X, y, preprocessors["imputer"], preprocessors["scaler"], True
+
+    X, y, imputer, scaler = streamPreprocess(chunkSource(source, path, chunkRows, table), outDir, reservoirSize, seed=seed)
+    # Written last: its presence marks a complete cache entry
+    joblib.dump({"imputer": imputer, "scaler": scaler}, marker)
+    return X, y, imputer, scaler, False
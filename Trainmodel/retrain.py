@@ -0,0 +1,311 @@
+# backend/Trainmodel/retrain.py
+#
+# Incremental retraining from production data.
+#
+#   python Trainmodel/retrain.py --report retrain.json   # export new rows, update, report only
+#   python Trainmodel/retrain.py --export-only
+#   python Trainmodel/retrain.py --save                  # ...and replace the served artifacts
+#
+# Labels are the confirmed_outcome column only (see database/queries.py):
+# rows without a confirmed diagnosis are never exported, and a database
+# without any is refused. Served predictions are model output; training on
+# them would feed the models their own answers.
+#
+# 1. Export: labeled rows of daily_reports (and optionally patients) that
+#    no shard holds yet are appended to training_store/ as NPZ shards of
+#    raw float32 features + labels + ids. Outcomes are confirmed after the
+#    fact, so the store tracks exported ids rather than an id watermark.
+# 2. Update: shards not yet trained on are run through the serving
+#    imputer + scaler (unchanged, so existing trees stay valid), then
+#    RandomForest / ExtraTrees grow --add-trees more trees (warm_start) and
+#    XGBoost continues boosting from the current booster for --add-rounds.
+# 3. Report: old vs. new ensemble on a holdout of the new labeled rows and
+#    on the reference CSV, plus wall time per stage.
+#
+# Nothing is written to the model directory without --save: review the
+# report first. Saved artifacts are published with a manifest written
+# after them, so an API running with MODEL_WATCH_INTERVAL picks up the
+# complete set without a restart.
+
+import argparse
+import copy
+import json
+import os
+import sys
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from database.database_manager import DB_PATH
+from models.compiled_ensemble import MODEL_ORDER
+from models.inference_pipeline import FEATURE_ORDER, InferencePipeline, writeManifest
+from database.queries import TRAINING_LABEL
+from Trainmodel.ingestion import iterSqliteRowsById, labeledIds, requireLabeledRows
+from Trainmodel.train_model import DATA_PATH, MODEL_DIR, RANDOM_STATE, StageTimer, exportCompiled, saveArtifacts
+
+STORE_DIR = os.path.join(BASE_DIR, "training_store")
+
+# Share of the new rows kept out of training for the diff report, drawn
+# with RANDOM_STATE so reruns on the same shards split the same way
+HOLDOUT_SHARE = 0.2
+
+
+class TrainingStore:
+    """
+    Append-only directory of NPZ shards plus a manifest listing them and
+    which ones the models have been trained on
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.manifestPath = os.path.join(path, "manifest.json")
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(self.manifestPath):
+            with open(self.manifestPath) as file:
+                self.manifest = json.load(file)
+            if self.manifest.get("label") != TRAINING_LABEL:
+                # Stores written before confirmed outcomes hold served predictions as labels
+                raise ValueError(f"{path} was not labeled with {TRAINING_LABEL}; move it away and export again")
+        else:
+            self.manifest = {"label": TRAINING_LABEL, "shards": []}
+
+    # +exportedIds(table : String) : ndarray
+    def exportedIds(self, table: str) -> np.ndarray:
+        """
+        Sorted ids of table already held by a shard
+        """
+        parts = [np.load(os.path.join(self.path, shard["file"]))["ids"]
+                 for shard in self.manifest["shards"] if shard["table"] == table]
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+
+    # +appendShard(table : String, X : ndarray, y : ndarray, ids : ndarray) : dict
+    def appendShard(self, table: str, X: np.ndarray, y: np.ndarray, ids: np.ndarray) -> dict:
+        name = f"{table}-{len(self.manifest['shards']):06d}-{int(ids[-1]):010d}.npz"
+        temporaryPath = os.path.join(self.path, name + ".tmp")
+        with open(temporaryPath, "wb") as file:
+            np.savez(file, X=X, y=y, ids=ids)
+        os.replace(temporaryPath, os.path.join(self.path, name))
+
+        # The manifest is the commit point: a shard missing from it is
+        # ignored and its rows are exported again
+        shard = {"file": name, "table": table, "first_id": int(ids[0]), "last_id": int(ids[-1]),
+                 "rows": int(len(y)), "trained": False}
+        self.manifest["shards"].append(shard)
+        self.save()
+        return shard
+
+    def exportedRows(self) -> dict:
+        counts = {}
+        for shard in self.manifest["shards"]:
+            counts[shard["table"]] = counts.get(shard["table"], 0) + shard["rows"]
+        return counts
+
+    def pendingShards(self) -> list:
+        return [shard for shard in self.manifest["shards"] if not shard["trained"]]
+
+    def load(self, shards: list):
+        """
+        Concatenated (X, y) of the given shards
+        """
+        if not shards:
+            return np.empty((0, len(FEATURE_ORDER)), dtype=np.float32), np.empty(0, dtype=np.int8)
+        parts = [np.load(os.path.join(self.path, shard["file"])) for shard in shards]
+        return np.concatenate([part["X"] for part in parts]), np.concatenate([part["y"] for part in parts])
+
+    def markTrained(self, shards: list, modelVersion: str):
+        for shard in shards:
+            shard["trained"] = True
+            shard["model_version"] = modelVersion
+        self.save()
+
+    def save(self):
+        temporaryPath = self.manifestPath + ".tmp"
+        with open(temporaryPath, "w") as file:
+            json.dump(self.manifest, file, indent=2)
+        os.replace(temporaryPath, self.manifestPath)
+
+
+# ---------------- EXPORT ----------------
+
+def exportNewRows(store: TrainingStore, databasePath: str, tables: list, chunkRows: int) -> list:
+    """
+    Appends labeled rows no shard holds yet as new shards; returns them.
+    An outcome changed after its row was exported is not picked up again.
+    """
+    shards = []
+    for table in tables:
+        newIds = np.setdiff1d(labeledIds(databasePath, table), store.exportedIds(table))
+        for X, y, ids in iterSqliteRowsById(databasePath, table, newIds, chunkRows):
+            shards.append(store.appendShard(table, X, y, ids))
+    return shards
+
+
+# ---------------- UPDATE ----------------
+
+def updateModels(models: dict, X: np.ndarray, y: np.ndarray, addTrees: int, addRounds: int) -> dict:
+    """
+    Returns updated copies: rf / et with addTrees more trees fitted on X,
+    xgb boosted addRounds more rounds on X starting from its booster
+    """
+    from xgboost import XGBClassifier
+
+    updated = {}
+    for name in ["rf", "et"]:
+        model = copy.deepcopy(models[name])
+        # warm_start keeps the fitted trees and only fits the extra ones
+        model.set_params(warm_start=True, n_estimators=len(model.estimators_) + addTrees)
+        model.fit(X, y)
+        model.set_params(warm_start=False)
+        updated[name] = model
+
+    params = models["xgb"].get_params()
+    params.update(n_estimators=addRounds, early_stopping_rounds=None)
+    # Models saved by older training scripts still carry this removed option
+    params.pop("use_label_encoder", None)
+    xgb = XGBClassifier(**params)
+    xgb.fit(X, y, xgb_model=models["xgb"].get_booster())
+    updated["xgb"] = xgb
+
+    return updated
+
+
+def ensembleProbability(models: dict, X: np.ndarray) -> np.ndarray:
+    return sum(models[name].predict_proba(X)[:, 1] for name in MODEL_ORDER) / len(MODEL_ORDER)
+
+
+def compareModels(old: dict, new: dict, X: np.ndarray, y: np.ndarray) -> dict:
+    """
+    Old vs. new ensemble on one labeled, already transformed dataset
+    """
+    from sklearn.metrics import roc_auc_score
+
+    before = ensembleProbability(old, X)
+    after = ensembleProbability(new, X)
+    bothClasses = len(np.unique(y)) == 2
+
+    return {
+        "rows": int(len(y)),
+        "accuracy_before": float(np.mean((before >= 0.5) == y)),
+        "accuracy_after": float(np.mean((after >= 0.5) == y)),
+        "auc_before": float(roc_auc_score(y, before)) if bothClasses else None,
+        "auc_after": float(roc_auc_score(y, after)) if bothClasses else None,
+        "prediction_agreement": float(np.mean((before >= 0.5) == (after >= 0.5))),
+        "mean_abs_probability_change": float(np.mean(np.abs(after - before))),
+        "max_abs_probability_change": float(np.max(np.abs(after - before))),
+    }
+
+
+def modelSizes(models: dict) -> dict:
+    return {
+        "rf": len(models["rf"].estimators_),
+        "xgb": models["xgb"].get_booster().num_boosted_rounds(),
+        "et": len(models["et"].estimators_),
+    }
+
+
+def loadReference(path: str):
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    return df[FEATURE_ORDER].to_numpy(dtype=float), df["Outcome"].to_numpy()
+
+
+# ---------------- MAIN ----------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally retrain the tri-ensemble from production data")
+    parser.add_argument("--database", default=DB_PATH)
+    parser.add_argument("--tables", nargs="+", default=["daily_reports"], choices=["daily_reports", "patients"])
+    parser.add_argument("--store", default=STORE_DIR, help="directory of NPZ training shards")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--reference", default=DATA_PATH, help="labeled CSV also used for the diff report")
+    parser.add_argument("--chunk-rows", type=int, default=50000)
+    parser.add_argument("--add-trees", type=int, default=25, help="trees added to RF and ExtraTrees")
+    parser.add_argument("--add-rounds", type=int, default=25, help="boosting rounds added to XGBoost")
+    parser.add_argument("--min-rows", type=int, default=100, help="new rows needed before models are updated")
+    parser.add_argument("--export-only", action="store_true")
+    parser.add_argument("--save", action="store_true",
+                        help="replace the artifacts in --model-dir (default: update and report only)")
+    parser.add_argument("--report", help="write the diff report + timings as JSON to this path")
+    args = parser.parse_args()
+
+    try:
+        for table in args.tables:
+            requireLabeledRows(args.database, table)
+        store = TrainingStore(args.store)
+    except ValueError as e:
+        parser.error(str(e))
+
+    timer = StageTimer()
+    report = {"database": args.database, "tables": args.tables, "label": TRAINING_LABEL}
+
+    with timer.stage("export"):
+        exported = exportNewRows(store, args.database, args.tables, args.chunk_rows)
+    report["exported_rows"] = sum(shard["rows"] for shard in exported)
+    report["exported_total"] = store.exportedRows()
+    print(f"Exported {report['exported_rows']} new rows in {len(exported)} shards")
+
+    pending = store.pendingShards()
+    X, y = store.load(pending)
+    report["pending_rows"] = int(len(y))
+
+    if args.export_only or len(y) < args.min_rows or len(np.unique(y)) < 2:
+        if not args.export_only:
+            print(f"Not updating models: {len(y)} pending rows (need {args.min_rows}, both classes)")
+        report["updated"] = False
+    else:
+        with timer.stage("load_models"):
+            pipeline = InferencePipeline(args.model_dir)
+            previousVersion = pipeline.version
+            current = pipeline.models
+
+        # Same imputer + scaler as serving: the existing trees split on this feature space
+        with timer.stage("transform"):
+            Xt = pipeline.transform(X)
+            holdout = np.random.default_rng(RANDOM_STATE).random(len(y)) < HOLDOUT_SHARE
+
+        with timer.stage("update"):
+            updated = updateModels(current, Xt[~holdout], y[~holdout], args.add_trees, args.add_rounds)
+
+        with timer.stage("evaluate"):
+            report["sizes_before"] = modelSizes(current)
+            report["sizes_after"] = modelSizes(updated)
+            report["new_rows_holdout"] = compareModels(current, updated, Xt[holdout], y[holdout])
+            if args.reference and os.path.exists(args.reference):
+                Xref, yref = loadReference(args.reference)
+                report["reference"] = compareModels(current, updated, pipeline.transform(Xref), yref)
+
+        report["updated"] = True
+        report["saved"] = args.save
+        report["previous_version"] = previousVersion
+        if not args.save:
+            print("Models not saved (pass --save after reviewing the report)")
+        else:
+            with timer.stage("save"):
+                saveArtifacts(updated, pipeline.imputer.imputer, pipeline.scaler, args.model_dir)
+            with timer.stage("compile"):
+                exportCompiled(updated, Xt, args.model_dir)
+            report["version"] = writeManifest(args.model_dir)["versions"]["sklearn"]
+            store.markTrained(pending, report["version"])
+            print(f"Models updated: {previousVersion} -> {report['version']}")
+
+        for section in ["new_rows_holdout", "reference"]:
+            if section in report:
+                diff = report[section]
+                print(f"{section}: accuracy {diff['accuracy_before']:.4f} -> {diff['accuracy_after']:.4f}, "
+                      f"agreement {diff['prediction_agreement']:.4f}, "
+                      f"mean |dp| {diff['mean_abs_probability_change']:.4f}")
+
+    report["stages"] = timer.stages
+    print("Stage timings:")
+    print(timer.report())
+
+    if args.report:
+        with open(args.report, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,68 +1,370 @@
 # backend/Trainmodel/train_model.py
+#
+# Trains the tri-ensemble (RF + XGBoost + ExtraTrees) and writes the
+# artifacts the API loads from saved_models/.
+#
+#   python Trainmodel/train_model.py
+#   python Trainmodel/train_model.py --sequential --no-cache --timings timings.json
+#   python Trainmodel/train_model.py --tune --tune-report tuning.json [--save-recommended]
+#   python Trainmodel/train_model.py --stream [--source sqlite --table daily_reports]
+#
+# The three models are fitted concurrently in a process pool, each with
+# its own thread budget. The imputed / scaled matrix is cached under
+# .train_cache/, keyed by a hash of the CSV, so re-training on unchanged
+# data skips KNN imputation.
+#
+# --tune searches hyperparameters instead of using the fixed settings and
+# reports holdout AUC against per-row inference latency (see tuning.py).
+#
+# --stream (implied by --source sqlite) reads the data in float32 chunks
+# and preprocesses it out of core (see ingestion.py).
 
+import argparse
+import hashlib
+import json
+import multiprocessing
 import os
-import pandas as pd
-import joblib
-
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-from sklearn.impute import KNNImputer
-from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
-from xgboost import XGBClassifier
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 
-print("=== Training Started ===")
+import joblib
+import numpy as np
 
 # ---------------- PATH SETUP (NO ERROR GUARANTEE) ----------------
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_PATH = os.path.join(BASE_DIR, "data", "pima_diabetes.csv")
 MODEL_DIR = os.path.join(BASE_DIR, "saved_models")
+CACHE_DIR = os.path.join(BASE_DIR, ".train_cache")
+
+sys.path.insert(0, BASE_DIR)
+from database.database_manager import DB_PATH
+from models.compiled_ensemble import CompiledEnsemble
+from models.inference_pipeline import writeManifest
+
+# Part of the cache key: bump when imputation / scaling settings change
+PREPROCESS_KEY = "knn5-standard-v1"
+RANDOM_STATE = 42
+
+# Rows the compiled export is checked against the original models on
+PARITY_ROWS = 10000
+
+
+class StageTimer:
+    """
+    Wall time per named training stage
+    """
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        startedAt = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = round(time.perf_counter() - startedAt, 3)
+
+    def report(self) -> str:
+        return "\n".join(f"  {name:<22}{seconds:>9.3f} s" for name, seconds in self.stages.items())
+
+
+# ---------------- DATA ----------------
+
+def fileHash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def preprocess(dataPath: str):
+    """
+    Reads the CSV, fits KNN imputation and standard scaling.
+    Returns (X, y, imputer, scaler).
+    """
+    import pandas as pd
+    from sklearn.impute import KNNImputer
+    from sklearn.preprocessing import StandardScaler
 
-os.makedirs(MODEL_DIR, exist_ok=True)
+    df = pd.read_csv(dataPath)
+    X = df.drop("Outcome", axis=1)
+    y = df["Outcome"].to_numpy()
 
-# ---------------- LOAD DATA ----------------
-df = pd.read_csv(DATA_PATH)
+    imputer = KNNImputer(n_neighbors=5)
+    X = imputer.fit_transform(X)
 
-X = df.drop("Outcome", axis=1)
-y = df["Outcome"]
+    scaler = StandardScaler()
+    X = scaler.fit_transform(X)
 
-# ---------------- PREPROCESS ----------------
-imputer = KNNImputer(n_neighbors=5)
-X = imputer.fit_transform(X)
+    return X, y, imputer, scaler
 
-scaler = StandardScaler()
-X = scaler.fit_transform(X)
 
-# ---------------- TRAIN TEST SPLIT ----------------
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
+def loadPreprocessed(dataPath: str, cacheDir: str = CACHE_DIR, useCache: bool = True):
+    """
+    preprocess() through an on-disk cache keyed by the CSV contents.
+    Returns (X, y, imputer, scaler, cacheHit).
+    """
+    key = hashlib.sha256((fileHash(dataPath) + PREPROCESS_KEY).encode()).hexdigest()[:16]
+    cachePath = os.path.join(cacheDir, f"preprocessed-{key}.joblib")
+
+    if useCache and os.path.exists(cachePath):
+        cached = joblib.load(cachePath)
+        return cached["X"], cached["y"], cached["imputer"], cached["scaler"], True
+
+    X, y, imputer, scaler = preprocess(dataPath)
+    if useCache:
+        os.makedirs(cacheDir, exist_ok=True)
+        dumpAtomic({"X": X, "y": y, "imputer": imputer, "scaler": scaler}, cachePath)
+    return X, y, imputer, scaler, False
+
 
 # ---------------- MODELS ----------------
-rf = RandomForestClassifier(n_estimators=150, random_state=42)
-xgb = XGBClassifier(
-    use_label_encoder=False,
-    eval_metric="logloss",
-    n_estimators=150,
-    random_state=42
-)
-et = ExtraTreesClassifier(n_estimators=150, random_state=42)
-
-rf.fit(X_train, y_train)
-xgb.fit(X_train, y_train)
-et.fit(X_train, y_train)
-
-# ---------------- SAVE EVERYTHING ----------------
-joblib.dump(
-    {
-        "rf": rf,
-        "xgb": xgb,
-        "et": et
-    },
-    os.path.join(MODEL_DIR, "tri_ensemble.pkl")
-)
-
-joblib.dump(scaler, os.path.join(MODEL_DIR, "scaler.pkl"))
-joblib.dump(imputer, os.path.join(MODEL_DIR, "imputer.pkl"))
-
-print("✅ Model trained & saved successfully")
-print("📁 Saved at:", MODEL_DIR)
+
+def threadBudgets(cpuCount: int, parallel: bool = True) -> dict:
+    """
+    n_jobs per model. In parallel mode the cores are split so the three
+    fits together use about cpuCount threads; RF / ExtraTrees parallelize
+    over trees and get the larger share, XGBoost threads within a tree
+    and saturates early on small data.
+    """
+    if not parallel:
+        return {"rf": cpuCount, "xgb": cpuCount, "et": cpuCount}
+
+    xgbJobs = max(1, cpuCount // 4)
+    rest = max(2, cpuCount - xgbJobs)
+    return {"rf": (rest + 1) // 2, "xgb": xgbJobs, "et": rest // 2}
+
+
+def buildModels(budgets: dict) -> dict:
+    from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
+    from xgboost import XGBClassifier
+
+    return {
+        "rf": RandomForestClassifier(n_estimators=150, random_state=RANDOM_STATE, n_jobs=budgets["rf"]),
+        "xgb": XGBClassifier(
+            eval_metric="logloss",
+            n_estimators=150,
+            random_state=RANDOM_STATE,
+            n_jobs=budgets["xgb"]
+        ),
+        "et": ExtraTreesClassifier(n_estimators=150, random_state=RANDOM_STATE, n_jobs=budgets["et"]),
+    }
+
+
+def fitModel(name: str, model, X: np.ndarray, y: np.ndarray):
+    """
+    Process-pool task: returns (name, fitted model, fit seconds)
+    """
+    startedAt = time.perf_counter()
+    model.fit(X, y)
+    # Serve with the library defaults, not the training thread budget:
+    # per-call thread pools only add latency to single-row predictions
+    model.set_params(n_jobs=None)
+    return name, model, time.perf_counter() - startedAt
+
+
+def trainModels(models: dict, X: np.ndarray, y: np.ndarray, parallel: bool = True):
+    """
+    Fits every model; returns (fitted models, fit seconds per model)
+    """
+    if not parallel:
+        results = [fitModel(name, model, X, y) for name, model in models.items()]
+    else:
+        # spawn: forking after the parent has started OpenMP / BLAS threads
+        # can deadlock XGBoost in the child
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=len(models), mp_context=context) as pool:
+            futures = [pool.submit(fitModel, name, model, X, y) for name, model in models.items()]
+            results = [future.result() for future in futures]
+
+    fitted = {name: model for name, model, _ in results}
+    seconds = {name: round(elapsed, 3) for name, _, elapsed in results}
+    return fitted, seconds
+
+
+# ---------------- SAVE ----------------
+
+def dumpAtomic(obj, path: str, **kwargs):
+    # Write-then-rename so a running API (MODEL_WATCH_INTERVAL) never
+    # sees a half-written artifact
+    temporaryPath = path + ".tmp"
+    joblib.dump(obj, temporaryPath, **kwargs)
+    os.replace(temporaryPath, path)
+
+
+def saveArtifacts(models: dict, imputer, scaler, modelDir: str):
+    os.makedirs(modelDir, exist_ok=True)
+    dumpAtomic(models, os.path.join(modelDir, "tri_ensemble.pkl"))
+
+    # Uncompressed dumps keep the plain arrays (imputer fit data, compiled
+    # trees) memory-mappable by the API workers (mmap_mode="r")
+    dumpAtomic(scaler, os.path.join(modelDir, "scaler.pkl"), compress=0)
+    dumpAtomic(imputer, os.path.join(modelDir, "imputer.pkl"), compress=0)
+
+
+def exportCompiled(models: dict, X: np.ndarray, modelDir: str) -> CompiledEnsemble:
+    """
+    Packed-array copy of all trees for the NumPy inference engine,
+    checked against the original models before it is written
+    """
+    compiled = CompiledEnsemble.fromModels(models)
+    parity = compiled.verifyParity(models, X[:PARITY_ROWS])
+    temporaryPath = os.path.join(modelDir, "tri_ensemble_compiled.pkl.tmp")
+    compiled.save(temporaryPath)
+    os.replace(temporaryPath, os.path.join(modelDir, "tri_ensemble_compiled.pkl"))
+
+    print(f"Compiled ensemble exported ({len(compiled.roots)} trees, max diff {parity:.2e})")
+    return compiled
+
+
+# ---------------- MAIN ----------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the tri-ensemble diabetes model")
+    parser.add_argument("--data", default=DATA_PATH, help="training CSV (PIMA columns + Outcome)")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true", help="always re-run imputation / scaling")
+    parser.add_argument("--sequential", action="store_true", help="fit the models one after another")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="total CPU budget")
+    parser.add_argument("--timings", help="write per-stage timings as JSON to this path")
+    parser.add_argument("--stream", action="store_true", help="chunked, out-of-core preprocessing")
+    parser.add_argument("--source", default="csv", choices=["csv", "sqlite"], help="sqlite implies --stream")
+    parser.add_argument("--database", default=DB_PATH, help="SQLite database for --source sqlite")
+    parser.add_argument("--table", default="daily_reports", choices=["daily_reports", "patients"])
+    parser.add_argument("--chunk-rows", type=int, default=50000)
+    parser.add_argument("--reservoir", type=int, default=20000, help="rows sampled to fit the KNN imputer")
+    parser.add_argument("--tune", action="store_true", help="search hyperparameters, report AUC vs. latency")
+    parser.add_argument("--tune-candidates", type=int, default=20, help="sampled configurations per model")
+    parser.add_argument("--tune-top-k", type=int, default=3, help="configurations per model combined into ensembles")
+    parser.add_argument("--tune-report", help="write the full tuning report as JSON to this path")
+    parser.add_argument("--latency-engine", default="sklearn", choices=["sklearn", "compiled"])
+    parser.add_argument("--max-auc-drop", type=float, default=0.005,
+                        help="holdout AUC the recommended ensemble may give up for speed")
+    parser.add_argument("--save-recommended", action="store_true",
+                        help="with --tune, save the recommended ensemble as the model artifacts")
+    args = parser.parse_args()
+
+    from sklearn.model_selection import train_test_split
+
+    if args.source == "sqlite":
+        from Trainmodel.ingestion import requireLabeledRows
+
+        try:
+            requireLabeledRows(args.database, args.table)
+        except ValueError as e:
+            parser.error(f"{e} (or train from --source csv)")
+
+    print("=== Training Started ===")
+    timer = StageTimer()
+    startedAt = time.perf_counter()
+
+    # ---------------- PREPROCESS ----------------
+    with timer.stage("preprocess"):
+        if args.stream or args.source == "sqlite":
+            from Trainmodel.ingestion import loadStreamed
+
+            X, y, imputer, scaler, cacheHit = loadStreamed(
+                args.source,
+                args.data if args.source == "csv" else args.database,
+                args.cache_dir,
+                chunkRows=args.chunk_rows,
+                reservoirSize=args.reservoir,
+                table=args.table,
+                seed=RANDOM_STATE,
+                useCache=not args.no_cache,
+            )
+        else:
+            X, y, imputer, scaler, cacheHit = loadPreprocessed(args.data, args.cache_dir, not args.no_cache)
+    print(f"Preprocessed {X.shape[0]} rows ({'cache hit' if cacheHit else 'computed'})")
+
+    # ---------------- TRAIN TEST SPLIT ----------------
+    with timer.stage("split"):
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=RANDOM_STATE
+        )
+
+    if args.tune:
+        tuneModels(args, timer, X, X_train, X_test, y_train, y_test, imputer, scaler)
+        return
+
+    # ---------------- MODELS ----------------
+    # Below three cores the pool start-up costs more than the overlap saves
+    parallel = not args.sequential and args.jobs >= 3
+    budgets = threadBudgets(args.jobs, parallel)
+    with timer.stage("train"):
+        models, fitSeconds = trainModels(buildModels(budgets), X_train, y_train, parallel)
+    for name, seconds in fitSeconds.items():
+        timer.stages[f"fit.{name}"] = seconds
+
+    # ---------------- SAVE EVERYTHING ----------------
+    with timer.stage("save"):
+        saveArtifacts(models, imputer, scaler, args.model_dir)
+
+    # ---------------- EXPORT COMPILED ENSEMBLE ----------------
+    with timer.stage("compile"):
+        exportCompiled(models, X, args.model_dir)
+    # Last: a watching API reloads only once the whole set is published
+    writeManifest(args.model_dir)
+
+    timer.stages["total"] = round(time.perf_counter() - startedAt, 3)
+    print("Stage timings:")
+    print(timer.report())
+
+    if args.timings:
+        with open(args.timings, "w") as file:
+            json.dump({
+                "source": args.source if args.source == "csv" else f"{args.database}:{args.table}",
+                "data_sha256": fileHash(args.data) if args.source == "csv" else None,
+                "streamed": args.stream or args.source == "sqlite",
+                "rows": int(X.shape[0]),
+                "cache_hit": cacheHit,
+                "parallel": parallel,
+                "thread_budgets": budgets,
+                "stages": timer.stages,
+            }, file, indent=2)
+
+    print("✅ Model trained & saved successfully")
+    print("📁 Saved at:", args.model_dir)
+
+
+def tuneModels(args, timer, X, X_train, X_test, y_train, y_test, imputer, scaler):
+    from Trainmodel.tuning import formatFront, tune
+
+    with timer.stage("tune"):
+        report, recommended = tune(
+            X_train, y_train, X_test, y_test,
+            candidates=args.tune_candidates,
+            topK=args.tune_top_k,
+            jobs=args.jobs,
+            latencyEngine=args.latency_engine,
+            maxAucDrop=args.max_auc_drop,
+            randomState=RANDOM_STATE,
+        )
+    timer.stages.update(report["stages"])
+
+    print(f"Pareto front, holdout AUC vs. {args.latency_engine} latency (* = recommended):")
+    print(formatFront(report))
+
+    if args.save_recommended:
+        with timer.stage("save"):
+            saveArtifacts(recommended, imputer, scaler, args.model_dir)
+        with timer.stage("compile"):
+            exportCompiled(recommended, X, args.model_dir)
+        writeManifest(args.model_dir)
+        print("📁 Recommended ensemble saved at:", args.model_dir)
+
+    print("Stage timings:")
+    print(timer.report())
+
+    if args.tune_report:
+        with open(args.tune_report, "w") as file:
+            json.dump(dict(report, rows=int(X.shape[0])), file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+# backend/Trainmodel/tuning.py
+#
+# Hyperparameter search for the tri-ensemble that scores serving latency
+# next to accuracy. Used by `python Trainmodel/train_model.py --tune`.
+#
+#   1. RF and ExtraTrees: successive-halving random search (5-fold CV AUC)
+#   2. XGBoost: random search with early stopping on each validation fold;
+#      the tree count is the averaged best iteration
+#   3. The top-k configurations of each model are refitted, every rf/xgb/et
+#      combination is scored on the holdout split (AUC of the averaged
+#      probability) and timed per row with both inference engines
+#   4. The report lists the Pareto front of holdout AUC vs. per-row latency
+#      and recommends the fastest ensemble within maxAucDrop of the best
+
+import itertools
+import time
+
+import numpy as np
+
+from models.compiled_ensemble import CompiledEnsemble, MODEL_ORDER
+
+FOREST_SPACE = {
+    "n_estimators": [25, 50, 100, 150, 300],
+    "max_depth": [4, 6, 8, 12, None],
+    "min_samples_leaf": [1, 2, 4, 8],
+    "max_features": ["sqrt", 0.5, 1.0],
+}
+
+XGBOOST_SPACE = {
+    "max_depth": [2, 3, 4, 6],
+    "learning_rate": [0.03, 0.1, 0.3],
+    "subsample": [0.7, 0.85, 1.0],
+    "colsample_bytree": [0.6, 0.8, 1.0],
+    "min_child_weight": [1, 3, 5],
+}
+
+# Upper bound for XGBoost; early stopping picks the actual tree count
+XGBOOST_MAX_ROUNDS = 600
+EARLY_STOPPING_ROUNDS = 30
+
+
+# ---------------- SEARCH ----------------
+
+def searchForest(name: str, X: np.ndarray, y: np.ndarray, candidates: int, jobs: int, randomState: int) -> list:
+    """
+    Successive-halving random search for "rf" or "et".
+    Returns [{"params", "cv_auc"}] best first.
+    """
+    from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+    from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+    from sklearn.model_selection import HalvingRandomSearchCV, StratifiedKFold
+
+    estimator = (RandomForestClassifier if name == "rf" else ExtraTreesClassifier)(random_state=randomState)
+    search = HalvingRandomSearchCV(
+        estimator,
+        FOREST_SPACE,
+        n_candidates=candidates,
+        factor=3,
+        # Tiny early rounds leave single-class validation folds (AUC undefined)
+        min_resources=min(len(y), 200),
+        cv=StratifiedKFold(5, shuffle=True, random_state=randomState),
+        scoring="roc_auc",
+        n_jobs=jobs,
+        random_state=randomState,
+    )
+    search.fit(X, y)
+
+    # Only candidates scored in the last (largest-sample) round are comparable
+    results = search.cv_results_
+    lastRound = results["iter"] == results["iter"].max()
+    ranked = sorted(np.flatnonzero(lastRound), key=lambda i: -results["mean_test_score"][i])
+    return [{"params": results["params"][i], "cv_auc": float(results["mean_test_score"][i])} for i in ranked]
+
+
+def _scoreXGBoostCandidate(params: dict, folds: list, X: np.ndarray, y: np.ndarray, randomState: int) -> dict:
+    from sklearn.metrics import roc_auc_score
+    from xgboost import XGBClassifier
+
+    scores, rounds = [], []
+    for trainIdx, validIdx in folds:
+        model = XGBClassifier(
+            eval_metric="logloss",
+            n_estimators=XGBOOST_MAX_ROUNDS,
+            early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+            random_state=randomState,
+            n_jobs=1,
+            **params
+        )
+        model.fit(X[trainIdx], y[trainIdx], eval_set=[(X[validIdx], y[validIdx])], verbose=False)
+        scores.append(roc_auc_score(y[validIdx], model.predict_proba(X[validIdx])[:, 1]))
+        rounds.append(model.best_iteration + 1)
+
+    return {
+        "params": dict(params, n_estimators=int(np.mean(rounds))),
+        "cv_auc": float(np.mean(scores)),
+    }
+
+
+def searchXGBoost(X: np.ndarray, y: np.ndarray, candidates: int, jobs: int, randomState: int) -> list:
+    """
+    Random search with per-fold early stopping, candidates scored in parallel.
+    Returns [{"params", "cv_auc"}] best first.
+    """
+    from joblib import Parallel, delayed
+    from sklearn.model_selection import ParameterSampler, StratifiedKFold
+
+    folds = list(StratifiedKFold(5, shuffle=True, random_state=randomState).split(X, y))
+    sampled = ParameterSampler(XGBOOST_SPACE, n_iter=candidates, random_state=randomState)
+    results = Parallel(n_jobs=jobs)(
+        delayed(_scoreXGBoostCandidate)(params, folds, X, y, randomState) for params in sampled
+    )
+    return sorted(results, key=lambda result: -result["cv_auc"])
+
+
+def buildModel(name: str, params: dict, randomState: int):
+    from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+    from xgboost import XGBClassifier
+
+    if name == "xgb":
+        return XGBClassifier(eval_metric="logloss", random_state=randomState, **params)
+    return (RandomForestClassifier if name == "rf" else ExtraTreesClassifier)(random_state=randomState, **params)
+
+
+# ---------------- LATENCY ----------------
+
+def measureLatency(predict, row: np.ndarray, repeats: int = 200) -> float:
+    """
+    Median milliseconds of one single-row call
+    """
+    predict(row)
+    timings = []
+    for _ in range(repeats):
+        startedAt = time.perf_counter()
+        predict(row)
+        timings.append(time.perf_counter() - startedAt)
+    return float(np.median(timings) * 1000)
+
+
+def paretoFront(entries: list, latencyKey: str) -> list:
+    """
+    Indices of entries no other entry beats on both holdout AUC and latency
+    """
+    front = []
+    for i, entry in enumerate(entries):
+        dominated = any(
+            other["holdout_auc"] >= entry["holdout_auc"] and other[latencyKey] <= entry[latencyKey]
+            and (other["holdout_auc"] > entry["holdout_auc"] or other[latencyKey] < entry[latencyKey])
+            for other in entries
+        )
+        if not dominated:
+            front.append(i)
+    return sorted(front, key=lambda i: entries[i][latencyKey])
+
+
+# ---------------- TUNE ----------------
+
+def tune(X_train, y_train, X_test, y_test, candidates: int = 20, topK: int = 3, jobs: int = -1,
+         latencyEngine: str = "sklearn", maxAucDrop: float = 0.005, randomState: int = 42):
+    """
+    Runs the search and returns (report dict, recommended fitted models)
+    """
+    from sklearn.metrics import roc_auc_score
+
+    report = {"candidates": candidates, "top_k": topK, "latency_engine": latencyEngine, "models": {}}
+    stageSeconds = {}
+
+    searches = {}
+    for name in MODEL_ORDER:
+        startedAt = time.perf_counter()
+        if name == "xgb":
+            searches[name] = searchXGBoost(X_train, y_train, candidates, jobs, randomState)
+        else:
+            searches[name] = searchForest(name, X_train, y_train, candidates, jobs, randomState)
+        stageSeconds[f"search.{name}"] = round(time.perf_counter() - startedAt, 3)
+
+    # Refit the top-k of each model on the full training split
+    row = X_test[:1]
+    fitted = {}
+    for name in MODEL_ORDER:
+        fitted[name] = []
+        for result in searches[name][:topK]:
+            model = buildModel(name, result["params"], randomState).fit(X_train, y_train)
+            fitted[name].append(model)
+            result["holdout_auc"] = float(roc_auc_score(y_test, model.predict_proba(X_test)[:, 1]))
+            result["sklearn_row_ms"] = measureLatency(model.predict_proba, row)
+        report["models"][name] = searches[name]
+
+    # Every rf / xgb / et combination of the refitted candidates
+    startedAt = time.perf_counter()
+    ensembles = []
+    for choice in itertools.product(*(range(len(fitted[name])) for name in MODEL_ORDER)):
+        models = {name: fitted[name][index] for name, index in zip(MODEL_ORDER, choice)}
+        compiled = CompiledEnsemble.fromModels(models)
+        probabilities = compiled.combinePredictionsBatch(X_test)
+
+        ensembles.append({
+            "choice": dict(zip(MODEL_ORDER, choice)),
+            "params": {name: searches[name][index]["params"] for name, index in zip(MODEL_ORDER, choice)},
+            "holdout_auc": float(roc_auc_score(y_test, probabilities)),
+            "trees": int(len(compiled.roots)),
+            "max_depth": compiled.maxDepth,
+            "sklearn_row_ms": sum(searches[name][index]["sklearn_row_ms"] for name, index in zip(MODEL_ORDER, choice)),
+            "compiled_row_ms": measureLatency(compiled.combinePredictionsBatch, row),
+        })
+    stageSeconds["ensembles"] = round(time.perf_counter() - startedAt, 3)
+
+    latencyKey = f"{latencyEngine}_row_ms"
+    front = paretoFront(ensembles, latencyKey)
+    bestAuc = max(entry["holdout_auc"] for entry in ensembles)
+    recommended = min(
+        (i for i in front if ensembles[i]["holdout_auc"] >= bestAuc - maxAucDrop),
+        key=lambda i: ensembles[i][latencyKey]
+    )
+
+    report["ensembles"] = ensembles
+    report["pareto_front"] = front
+    report["recommended"] = recommended
+    report["max_auc_drop"] = maxAucDrop
+    report["stages"] = stageSeconds
+
+    chosen = ensembles[recommended]["choice"]
+    return report, {name: fitted[name][chosen[name]] for name in MODEL_ORDER}
+
+
+def formatFront(report: dict) -> str:
+    latencyKey = f"{report['latency_engine']}_row_ms"
+    lines = [f"  {'auc':>7}{'ms/row':>9}{'trees':>7}{'depth':>7}  rf / xgb / et"]
+    for i in report["pareto_front"]:
+        entry = report["ensembles"][i]
+        marker = "*" if i == report["recommended"] else " "
+        sizes = " / ".join(str(entry["params"][name].get("n_estimators", 100)) for name in MODEL_ORDER)
+        lines.append(f"{marker} {entry['holdout_auc']:>7.4f}{entry[latencyKey]:>9.3f}{entry['trees']:>7}"
+                     f"{entry['max_depth']:>7}  {sizes}")
+    return "\n".join(lines)
@@ -1,17 +1,38 @@
+import atexit
+import hmac
+import json
 import logging
+import math
 import os
+import queue
+import random
 import sqlite3
-import traceback
+import time
+from contextlib import nullcontext
+from datetime import datetime, timezone
+
+# Start of the startup timing report (stdlib imports above are negligible)
+STARTUP_BEGAN = time.perf_counter()
 
-import joblib
 import numpy as np
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, g, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 
 # ---------------- PROJECT IMPORTS ----------------
-from database.database_manager import Database
-from models.patient import Patient
-from reports.report_generator import ReportGenerator
+from database import queries
+from database.database_manager import INSERT_DAILY_REPORT, getPool
+from database.migrations import migrate
+from database.write_behind import WriteBehindQueue
+from models.inference_pipeline import FEATURE_ORDER, MODEL_DIR, getPipeline
+from models.inference_workers import InferenceWorkerPool
+from models.micro_batcher import MicroBatcher
+from models.model_manager import ModelManager
+from models.prediction_cache import MemoryCacheBackend, PredictionCache, SqliteCacheBackend
+from monitoring import metrics as prometheus
+from monitoring.profiler import RequestProfiler
+
+# Milliseconds per startup stage, served at /stats/startup
+startup_timings = {"imports": round((time.perf_counter() - STARTUP_BEGAN) * 1000, 1)}
 
 # ---------------- LOGGING ----------------
 logging.basicConfig(
@@ -26,80 +47,308 @@ app = Flask(__name__, static_folder="../project/dist", static_url_path="/")
 CORS_ORIGIN = os.environ.get("CORS_ORIGIN", "*")
 CORS(app, resources={r"/*": {"origins": CORS_ORIGIN}}, supports_credentials=True)
 
+MAX_BATCH_ROWS = int(os.environ.get("MAX_BATCH_ROWS", 10000))
+HISTORY_MAX_LIMIT = int(os.environ.get("HISTORY_MAX_LIMIT", 1000))
+MAX_TRAILING_MONTHS = int(os.environ.get("MAX_TRAILING_MONTHS", 60))
+
+# "sklearn" runs the pickled models, "compiled" the packed NumPy trees
+INFERENCE_ENGINE = os.environ.get("INFERENCE_ENGINE", "sklearn")
+
+# Memory-map model arrays read-only so workers share pages (MODEL_MMAP=1)
+MODEL_MMAP_MODE = "r" if os.environ.get("MODEL_MMAP", "0") == "1" else None
+
+# Score in N worker processes fed through shared-memory slots (0 = in this
+# process). Workers start with the first prediction, or at worker boot under
+# gunicorn.conf.py / uvicorn asgi_app. Prefer those over `python app.py`:
+# spawned workers re-import the main script.
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", 0))
+INFERENCE_SLOTS = int(os.environ.get("INFERENCE_SLOTS", 0)) or None
+INFERENCE_SLOT_ROWS = int(os.environ.get("INFERENCE_SLOT_ROWS", 1024))
+
+# Micro-batching of concurrent /predict calls (0 disables it)
+MICRO_BATCH_WINDOW_MS = float(os.environ.get("MICRO_BATCH_WINDOW_MS", 0))
+MICRO_BATCH_MAX_ROWS = int(os.environ.get("MICRO_BATCH_MAX_ROWS", 64))
+
+# Write-behind persistence of /predict results (WRITE_BEHIND=1)
+WRITE_BEHIND = os.environ.get("WRITE_BEHIND", "0") == "1"
+WRITE_BEHIND_QUEUE_SIZE = int(os.environ.get("WRITE_BEHIND_QUEUE_SIZE", 10000))
+WRITE_BEHIND_FLUSH_ROWS = int(os.environ.get("WRITE_BEHIND_FLUSH_ROWS", 200))
+WRITE_BEHIND_FLUSH_MS = float(os.environ.get("WRITE_BEHIND_FLUSH_MS", 50))
+
+# Hot model reload: POST /admin/reload-models with X-Admin-Token (unset
+# disables the endpoint), and/or poll saved_models every N seconds (0 = off).
+# With several workers use the watcher: the endpoint only reaches one of them.
+# Both load only artifact sets published by Trainmodel (saved_models/manifest.json).
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+MODEL_WATCH_INTERVAL = float(os.environ.get("MODEL_WATCH_INTERVAL", 0))
+
+# Cache of results for repeated identical inputs: off | memory | sqlite
+PREDICTION_CACHE = os.environ.get("PREDICTION_CACHE", "off")
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", 10000))
+PREDICTION_CACHE_TTL = float(os.environ.get("PREDICTION_CACHE_TTL", 3600))
+PREDICTION_CACHE_PATH = os.environ.get("PREDICTION_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "prediction_cache.db"))
+
+# Serve stats from the trigger-maintained summary tables (SUMMARY_TABLES=0
+# falls back to aggregating daily_reports per request)
+SUMMARY_TABLES = os.environ.get("SUMMARY_TABLES", "1") == "1"
+
+# Request counters and stage / SQL timings served at /metrics (METRICS=0 disables both)
+METRICS_ENABLED = os.environ.get("METRICS", "1") == "1"
+
+# Share of requests whose per-request INFO lines are written (1 = all).
+# Logging is synchronous I/O on the hot path; warnings and errors are always logged.
+REQUEST_LOG_SAMPLE_RATE = float(os.environ.get("REQUEST_LOG_SAMPLE_RATE", 0.01))
+
+# cProfile of single requests: a share of all requests (PROFILE_SAMPLE_RATE) and/or
+# any request sending X-Profile-Token: <PROFILE_TOKEN>. Both unset = no hooks at all.
+# GET /stats/profiles needs the same header (and is off without a token).
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", 0))
+PROFILE_TOKEN = os.environ.get("PROFILE_TOKEN")
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+PROFILE_MAX_FILES = int(os.environ.get("PROFILE_MAX_FILES", 200))
+
 logger.info("Diabetes Risk Prediction API Started")
 
+# ---------------- METRICS ----------------
+metrics = prometheus.MetricsRegistry()
+REQUESTS = metrics.counter(
+    "api_requests_total", "HTTP requests by route, method and status", ("route", "method", "status"))
+REQUEST_SECONDS = metrics.histogram(
+    "api_request_duration_seconds", "Time until the response is returned to the server", ("route", "method"))
+STAGE_SECONDS = metrics.histogram(
+    "api_stage_duration_seconds", "Time per stage of the prediction routes (parse, cache, predict, db_write, serialize)",
+    ("route", "stage"))
+INFERENCE_SECONDS = metrics.histogram(
+    "api_inference_stage_duration_seconds", "Time per pipeline stage of one model call (impute, scale, rf, xgb, et or compiled)",
+    ("stage",))
+SQL_SECONDS = metrics.histogram(
+    "api_sql_query_duration_seconds", "Time per SQL statement, execute through fetch", ("route", "query"))
+
 # ---------------- DATABASE ----------------
-def init_user_table():
-    conn = sqlite3.connect("diabetes.db")
-    cur = conn.cursor()
-
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS users(
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        username TEXT UNIQUE,
-        password TEXT,
-        email TEXT,
-        full_name TEXT,
-        phone TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+stage_began = time.perf_counter()
+# Per-thread pooled connections (WAL, tuned pragmas, cached statements)
+db_pool = getPool()
+
+# Schema is versioned (PRAGMA user_version) and upgraded once here, never per request
+migrate(db_pool.getConnection())
+
+report_writer = None
+if WRITE_BEHIND:
+    report_writer = WriteBehindQueue(
+        db_pool,
+        INSERT_DAILY_REPORT,
+        maxQueueSize=WRITE_BEHIND_QUEUE_SIZE,
+        flushSize=WRITE_BEHIND_FLUSH_ROWS,
+        flushIntervalMs=WRITE_BEHIND_FLUSH_MS
+    )
+    # Drain queued predictions before the process exits
+    atexit.register(report_writer.close)
+    logger.info("Write-behind enabled: %d rows / %.0f ms per flush", WRITE_BEHIND_FLUSH_ROWS, WRITE_BEHIND_FLUSH_MS)
+
+startup_timings["database"] = round((time.perf_counter() - stage_began) * 1000, 1)
+
+# ---------------- LOAD MODELS ----------------
+stage_began = time.perf_counter()
+# Imputer, scaler and ensemble are loaded once and shared process-wide.
+# Handlers read model_manager.active once per request, so a reload never
+# changes the models under a request that is already running.
+model_manager = ModelManager(
+    MODEL_DIR, INFERENCE_ENGINE, MODEL_MMAP_MODE,
+    pipeline=getPipeline(MODEL_DIR, INFERENCE_ENGINE, MODEL_MMAP_MODE)
+)
+if MODEL_WATCH_INTERVAL > 0:
+    model_manager.watch(MODEL_WATCH_INTERVAL)
+
+def observe_inference_stage(stage, seconds):
+    INFERENCE_SECONDS.observe(seconds, stage=stage)
+
+if METRICS_ENABLED:
+    # Also covers micro-batched calls, which run on the batcher thread
+    model_manager.active.stageObserver = observe_inference_stage
+    model_manager.onSwap(lambda new, old: setattr(new, "stageObserver", observe_inference_stage))
+
+logger.info("Inference engine: %s (mmap: %s, model version %s)",
+            INFERENCE_ENGINE, MODEL_MMAP_MODE or "off", model_manager.active.version)
+
+inference_pool = None
+if INFERENCE_WORKERS > 0:
+    inference_pool = InferenceWorkerPool(
+        INFERENCE_WORKERS, INFERENCE_SLOTS, INFERENCE_SLOT_ROWS, MODEL_DIR, INFERENCE_ENGINE, MODEL_MMAP_MODE
+    )
+    # No swap listener: every call names its pipeline's version, and workers
+    # load the new artifacts on the first call that asks for them
+    atexit.register(inference_pool.close)
+    logger.info("Inference workers enabled: %d processes, %d rows per slot", INFERENCE_WORKERS, INFERENCE_SLOT_ROWS)
+
+prediction_cache = None
+if PREDICTION_CACHE == "memory":
+    prediction_cache = PredictionCache(MemoryCacheBackend(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL), model_manager.active.version)
+elif PREDICTION_CACHE == "sqlite":
+    # Shared by all workers on this host
+    prediction_cache = PredictionCache(
+        SqliteCacheBackend(PREDICTION_CACHE_PATH, PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL),
+        model_manager.active.version
     )
-    """)
+if prediction_cache is not None:
+    model_manager.onSwap(lambda new, old: prediction_cache.setVersion(new.version))
+    logger.info("Prediction cache: %s", PREDICTION_CACHE)
+
+batcher = None
+if MICRO_BATCH_WINDOW_MS > 0:
+    batcher = MicroBatcher(model_manager.active.predictProba, maxBatchSize=MICRO_BATCH_MAX_ROWS, maxWaitMs=MICRO_BATCH_WINDOW_MS)
+    logger.info("Micro-batching enabled: %.1f ms window, %d rows max", MICRO_BATCH_WINDOW_MS, MICRO_BATCH_MAX_ROWS)
+
+startup_timings["models"] = round((time.perf_counter() - stage_began) * 1000, 1)
+startup_timings["artifacts"] = dict(model_manager.active.loadTimings)
+startup_timings["total"] = round((time.perf_counter() - STARTUP_BEGAN) * 1000, 1)
+logger.info(
+    "Startup took %.0f ms (imports %.0f, database %.0f, models %.0f; artifacts %s)",
+    startup_timings["total"], startup_timings["imports"], startup_timings["database"],
+    startup_timings["models"], startup_timings["artifacts"]
+)
 
-    # Migration for existing databases
-    for col in ['email', 'full_name', 'phone', 'created_at']:
+# ---------------- REQUEST INSTRUMENTATION ----------------
+def route_label():
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+@app.before_request
+def start_request():
+    g.started_at = time.perf_counter()
+    # Sampled once per request so a logged request keeps all of its lines
+    g.log_sampled = REQUEST_LOG_SAMPLE_RATE >= 1 or random.random() < REQUEST_LOG_SAMPLE_RATE
+
+@app.after_request
+def record_request(response):
+    # Streamed responses are timed until the generator is handed to the server
+    if METRICS_ENABLED:
+        route = route_label()
+        REQUESTS.inc(route=route, method=request.method, status=str(response.status_code))
+        REQUEST_SECONDS.observe(time.perf_counter() - g.started_at, route=route, method=request.method)
+    return response
+
+def log_info(message, *args):
+    """INFO line of the current request, written only if the request was sampled."""
+    if g.get("log_sampled"):
+        logger.info(message, *args)
+
+def observe_stage(stage, started_at):
+    if METRICS_ENABLED:
+        STAGE_SECONDS.observe(time.perf_counter() - started_at, route=route_label(), stage=stage)
+
+def sql_timer(query):
+    """Times a with-block running one SQL statement of the current route."""
+    if not METRICS_ENABLED:
+        return nullcontext()
+    return SQL_SECONDS.time(route=route_label(), query=query)
+
+def timed_rows(cur, query):
+    """Yields the cursor's rows; the time spent fetching them (not sending them) is recorded as one SQL sample."""
+    rows = iter(cur)
+    fetch_seconds = 0.0
+    while True:
+        started_at = time.perf_counter()
+        row = next(rows, None)
+        fetch_seconds += time.perf_counter() - started_at
+        if row is None:
+            break
+        yield row
+    if METRICS_ENABLED:
+        SQL_SECONDS.observe(fetch_seconds, route=route_label(), query=query)
+
+# ---------------- REQUEST PROFILING ----------------
+profiler = RequestProfiler(PROFILE_DIR, PROFILE_SAMPLE_RATE, PROFILE_TOKEN, PROFILE_MAX_FILES)
+
+def start_profile():
+    g.profile = profiler.start() if profiler.shouldProfile(request.headers.get("X-Profile-Token")) else None
+
+def finish_profile(response):
+    # Registered after record_request, so this after_request hook runs before it
+    profile = g.pop("profile", None)
+    if profile is not None:
         try:
-            cur.execute(f"ALTER TABLE users ADD COLUMN {col} TEXT")
-        except sqlite3.OperationalError:
-            pass
-
-    conn.commit()
-    conn.close()
-
-init_user_table()
-
-# Ensure daily_reports table has all required columns (migration for existing DBs)
-def migrate_daily_reports():
-    conn = sqlite3.connect("diabetes.db")
-    cur = conn.cursor()
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS daily_reports (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            pregnancies REAL,
-            glucose REAL,
-            bmi REAL,
-            blood_pressure REAL,
-            skin_thickness REAL,
-            insulin REAL,
-            dpf REAL,
-            age REAL,
-            prediction INTEGER,
-            probability REAL,
-            risk_level TEXT
-        )
-    """)
-    for col in ['pregnancies', 'dpf', 'age']:
+            summary = profiler.finish(profile, {
+                "route": route_label(),
+                "endpoint": request.endpoint,
+                "method": request.method,
+                "path": request.path,
+                "status": response.status_code,
+                "duration_ms": round((time.perf_counter() - g.started_at) * 1000, 3),
+            })
+            logger.info("Profiled %s %s in %.1f ms -> %s", request.method, request.path, summary["duration_ms"], summary["file"])
+        except Exception as e:
+            logger.error("Saving request profile failed: %s", e, exc_info=True)
+    return response
+
+def discard_profile(error):
+    # Requests that raised never reach finish_profile: just stop the profiler
+    profile = g.pop("profile", None)
+    if profile is not None:
+        profile.disable()
+
+if profiler.enabled:
+    app.before_request(start_profile)
+    app.after_request(finish_profile)
+    app.teardown_request(discard_profile)
+    logger.info("Request profiling enabled: sample rate %s, token %s, keeping %d in %s",
+                PROFILE_SAMPLE_RATE, "set" if PROFILE_TOKEN else "unset", PROFILE_MAX_FILES, PROFILE_DIR)
+
+# ---------------- PREDICTION HELPERS ----------------
+# JSON field names, in the order expected by the pipeline
+FEATURE_FIELDS = FEATURE_ORDER
+
+def safe_float(value):
+    # Missing, unparsable or non-finite readings stay NaN so the KNN imputer fills them
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+    return number if math.isfinite(number) else float("nan")
+
+def parse_batch_row(row):
+    """Strict variant of safe_float for batch rows: unparsable values are reported, not treated as missing."""
+    if not isinstance(row, dict):
+        raise ValueError("Row must be a JSON object")
+
+    values = []
+    for field in FEATURE_FIELDS:
+        value = row.get(field)
+        if value is None or value == "":
+            values.append(float("nan"))
+            continue
+        if isinstance(value, bool):
+            raise ValueError(f"Invalid value for {field}: {value!r}")
         try:
-            cur.execute(f"ALTER TABLE daily_reports ADD COLUMN {col} REAL")
-        except sqlite3.OperationalError:
-            pass  # Column already exists
-    conn.commit()
-    conn.close()
+            number = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Invalid value for {field}: {value!r}")
+        # "inf" / "1e999" parse fine but make the imputer reject the whole batch
+        if not math.isfinite(number):
+            raise ValueError(f"Invalid value for {field}: {value!r}")
+        values.append(number)
+    return values
+
+def categorize_probability(avg_probability):
+    # Determine prediction (0 or 1)
+    prediction = 1 if avg_probability >= 0.5 else 0
+
+    # Determine risk level
+    if avg_probability < 0.3:
+        risk_level = "LOW"
+    elif avg_probability < 0.6:
+        risk_level = "MEDIUM"
+    else:
+        risk_level = "HIGH"
 
-migrate_daily_reports()
+    return prediction, risk_level
 
-# ---------------- LOAD MODELS ----------------
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-MODEL_DIR = os.path.join(BASE_DIR, "saved_models")
+def scorer(pipeline):
+    """Function scoring raw N x 8 rows with pipeline's models: the worker processes if enabled, else in-process."""
+    return inference_pool.scorer(pipeline) if inference_pool is not None else pipeline.predictProba
 
-models = joblib.load(os.path.join(MODEL_DIR, "tri_ensemble.pkl"))
-scaler = joblib.load(os.path.join(MODEL_DIR, "scaler.pkl"))
-imputer = joblib.load(os.path.join(MODEL_DIR, "imputer.pkl"))
-
-rf = models["rf"]
-xgb = models["xgb"]
-et = models["et"]
+def report_row(user_id, values, prediction, probability_percentage, risk_level):
+    pregnancies, glucose, blood_pressure, skin_thickness, insulin, bmi, dpf, age = values
+    return (user_id, pregnancies, glucose, bmi, blood_pressure, skin_thickness, insulin, dpf, age,
+            prediction, probability_percentage, risk_level)
 
 # =====================================================
 # REGISTER
@@ -116,15 +365,9 @@ def register():
         return jsonify({"status": "error", "message": "Missing fields"}), 400
 
     try:
-        conn = sqlite3.connect("diabetes.db")
-        cur = conn.cursor()
-
-        cur.execute("INSERT INTO users (username, password, email) VALUES (?,?,?)",
-                    (username, password, email))
-
-        conn.commit()
-        user_id = cur.lastrowid
-        conn.close()
+        with sql_timer("insert_user"), db_pool.transaction() as conn:
+            cur = conn.execute(queries.INSERT_USER, (username, password, email))
+            user_id = cur.lastrowid
 
         return jsonify({"status": "success", "user_id": user_id})
 
@@ -141,14 +384,11 @@ def login():
     username = data.get("username")
     password = data.get("password")
 
-    conn = sqlite3.connect("diabetes.db")
-    cur = conn.cursor()
+    cur = db_pool.getConnection().cursor()
 
-    cur.execute("SELECT id, username, email FROM users WHERE username=? AND password=?",
-                (username, password))
-
-    user = cur.fetchone()
-    conn.close()
+    with sql_timer("select_user"):
+        cur.execute(queries.USER_BY_CREDENTIALS, (username, password))
+        user = cur.fetchone()
 
     if user:
         return jsonify({"status": "success", "user_id": user[0], "username": user[1], "email": user[2]})
@@ -161,76 +401,63 @@ def login():
 @app.route("/profile/<int:user_id>", methods=["GET"])
 def get_profile(user_id):
     try:
-        conn = sqlite3.connect("diabetes.db")
-        conn.row_factory = sqlite3.Row
-        cur = conn.cursor()
+        cur = db_pool.getConnection().cursor()
 
-        cur.execute("SELECT id, username, email, full_name, phone, created_at FROM users WHERE id=?", (user_id,))
-        user = cur.fetchone()
+        with sql_timer("select_user"):
+            cur.execute(queries.USER_PROFILE, (user_id,))
+            user = cur.fetchone()
 
         if not user:
-            conn.close()
             return jsonify({"status": "error", "message": "User not found"}), 404
 
-        # Get prediction stats
-        cur.execute("SELECT COUNT(*) as cnt FROM daily_reports WHERE user_id=?", (user_id,))
-        total_predictions = cur.fetchone()["cnt"]
-
-        cur.execute("SELECT COUNT(*) as cnt FROM daily_reports WHERE user_id=? AND prediction=1", (user_id,))
-        diabetic_count = cur.fetchone()["cnt"]
-
-        cur.execute("SELECT COUNT(*) as cnt FROM daily_reports WHERE user_id=? AND prediction=0", (user_id,))
-        normal_count = cur.fetchone()["cnt"]
-
-        cur.execute("SELECT date FROM daily_reports WHERE user_id=? ORDER BY date DESC LIMIT 1", (user_id,))
-        last_row = cur.fetchone()
-        last_prediction_date = last_row["date"] if last_row else None
-
-        conn.close()
+        # Get prediction stats (summary row, or one aggregate over history)
+        with sql_timer("profile_stats"):
+            cur.execute(queries.PROFILE_STATS_SUMMARY if SUMMARY_TABLES else queries.PROFILE_STATS, (user_id,))
+            stats = cur.fetchone()
 
-        return jsonify({
-            "profile": {
-                "id": user["id"],
-                "username": user["username"],
-                "email": user["email"] or "",
-                "full_name": user["full_name"] or "",
-                "phone": user["phone"] or "",
-                "created_at": user["created_at"] or ""
-            },
-            "stats": {
-                "total_predictions": total_predictions,
-                "diabetic_count": diabetic_count,
-                "normal_count": normal_count,
-                "last_prediction_date": last_prediction_date
-            }
-        })
+        return jsonify(profile_payload(user, stats))
 
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+def profile_payload(user, stats):
+    """/profile response from a USER_PROFILE row and a (possibly missing) stats row."""
+    return {
+        "profile": {
+            "id": user["id"],
+            "username": user["username"],
+            "email": user["email"] or "",
+            "full_name": user["full_name"] or "",
+            "phone": user["phone"] or "",
+            "created_at": user["created_at"] or ""
+        },
+        "stats": {
+            "total_predictions": stats["total_predictions"] if stats else 0,
+            "diabetic_count": stats["diabetic_count"] if stats else 0,
+            "normal_count": stats["normal_count"] if stats else 0,
+            "last_prediction_date": stats["last_prediction_date"] if stats else None
+        }
+    }
+
 @app.route("/profile/<int:user_id>", methods=["PUT"])
 def update_profile(user_id):
     data = request.get_json(force=True)
 
     try:
-        conn = sqlite3.connect("diabetes.db")
-        cur = conn.cursor()
+        cur = db_pool.getConnection().cursor()
 
-        cur.execute("SELECT id FROM users WHERE id=?", (user_id,))
-        if not cur.fetchone():
-            conn.close()
+        with sql_timer("select_user"):
+            cur.execute(queries.USER_EXISTS, (user_id,))
+            exists = cur.fetchone()
+        if not exists:
             return jsonify({"status": "error", "message": "User not found"}), 404
 
         full_name = data.get("full_name", "")
         email = data.get("email", "")
         phone = data.get("phone", "")
 
-        cur.execute("""
-            UPDATE users SET full_name=?, email=?, phone=? WHERE id=?
-        """, (full_name, email, phone, user_id))
-
-        conn.commit()
-        conn.close()
+        with sql_timer("update_user"), db_pool.transaction() as conn:
+            conn.execute(queries.UPDATE_USER_PROFILE, (full_name, email, phone, user_id))
 
         return jsonify({"status": "success", "message": "Profile updated successfully"})
 
@@ -242,14 +469,9 @@ def update_profile(user_id):
 # =====================================================
 @app.route("/predict", methods=["POST"])
 def predict():
-    def safe_float(value):
-        try:
-            return float(value)
-        except:
-            return 0.0
-
+    stage_began = time.perf_counter()
     data = request.get_json(force=True)
-    logger.info("Prediction request received")
+    log_info("Prediction request received")
 
     try:
         # Extract and validate user_id
@@ -278,144 +500,363 @@ def predict():
             dpf,
             age
         ]])
-
-        # Apply KNN Imputer
-        features = imputer.transform(features)
-
-        # Apply Standard Scaler
-        features = scaler.transform(features)
-
-        # Get predictions from all three models
-        rf_p = rf.predict_proba(features)[0][1]
-        xgb_p = xgb.predict_proba(features)[0][1]
-        et_p = et.predict_proba(features)[0][1]
-
-        # Calculate average probability
-        avg_probability = float((rf_p + xgb_p + et_p) / 3)
+        observe_stage("parse", stage_began)
+
+        pipeline = model_manager.active
+        avg_probability = None
+        if prediction_cache is not None:
+            stage_began = time.perf_counter()
+            avg_probability = prediction_cache.get(features[0], pipeline.version)
+            observe_stage("cache", stage_began)
+
+        if avg_probability is None:
+            # KNN Imputer -> Standard Scaler -> average probability of the three models
+            # (per-model timings are recorded by the pipeline's stage observer)
+            stage_began = time.perf_counter()
+            if batcher is not None:
+                avg_probability = float(batcher.submit(features, scorer(pipeline))[0])
+            else:
+                avg_probability = float(scorer(pipeline)(features)[0])
+            observe_stage("predict", stage_began)
+
+            if prediction_cache is not None:
+                prediction_cache.set(features[0], avg_probability, pipeline.version)
         probability_percentage = round(avg_probability * 100, 2)
 
-        # Determine prediction (0 or 1)
-        prediction = 1 if avg_probability >= 0.5 else 0
+        prediction, risk_level = categorize_probability(avg_probability)
 
-        # Determine risk level
-        if avg_probability < 0.3:
-            risk_level = "LOW"
-        elif avg_probability < 0.6:
-            risk_level = "MEDIUM"
-        else:
-            risk_level = "HIGH"
-
-        logger.info("Prediction: %s (%s), Risk: %s", prediction, ['Not Diabetic', 'Diabetic'][prediction], risk_level)
+        log_info("Prediction: %s (%s), Risk: %s", prediction, ['Not Diabetic', 'Diabetic'][prediction], risk_level)
 
         # Save to database if user_id is provided
         if user_id:
+            row = (user_id, pregnancies, glucose, bmi, blood_pressure, skin_thickness, insulin, dpf, age, prediction, probability_percentage, risk_level)
+            stage_began = time.perf_counter()
             try:
-                conn = sqlite3.connect("diabetes.db")
-                cur = conn.cursor()
-
-                cur.execute("""
-                    CREATE TABLE IF NOT EXISTS daily_reports (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        user_id INTEGER,
-                        date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        pregnancies REAL,
-                        glucose REAL,
-                        bmi REAL,
-                        blood_pressure REAL,
-                        skin_thickness REAL,
-                        insulin REAL,
-                        dpf REAL,
-                        age REAL,
-                        prediction INTEGER,
-                        probability REAL,
-                        risk_level TEXT
-                    )
-                """)
-
-                # Add columns if they don't exist (for existing databases)
-                for col in ['pregnancies', 'dpf', 'age']:
+                queued = False
+                if report_writer is not None:
                     try:
-                        cur.execute(f"ALTER TABLE daily_reports ADD COLUMN {col} REAL")
-                    except sqlite3.OperationalError:
-                        pass  # Column already exists
-
-                cur.execute("""
-                    INSERT INTO daily_reports
-                    (user_id, pregnancies, glucose, bmi, blood_pressure, skin_thickness, insulin, dpf, age, prediction, probability, risk_level)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (user_id, pregnancies, glucose, bmi, blood_pressure, skin_thickness, insulin, dpf, age, prediction, probability_percentage, risk_level))
-
-                conn.commit()
-                conn.close()
-                logger.info("Saved prediction to database for user %s", user_id)
+                        report_writer.submit(row)
+                        queued = True
+                    except queue.Full:
+                        logger.warning("Write-behind queue full, saving synchronously")
+
+                if not queued:
+                    with db_pool.transaction() as conn:
+                        conn.execute(INSERT_DAILY_REPORT, row)
+
+                log_info("%s prediction to database for user %s", "Queued" if queued else "Saved", user_id)
             except Exception as db_error:
                 logger.error("Database save error: %s", db_error)
+            observe_stage("db_write", stage_began)
 
         # Prepare response
         response = {
             "prediction": prediction,
             "riskLevel": risk_level,
             "probability": probability_percentage,
-            "score": round(avg_probability, 3)
+            "score": round(avg_probability, 3),
+            "model_version": pipeline.version
         }
 
-        logger.info("Prediction successful: %s", response)
+        log_info("Prediction successful: score %.3f, model %s", response["score"], pipeline.version)
 
-        return jsonify(response)
+        stage_began = time.perf_counter()
+        body = jsonify(response)
+        observe_stage("serialize", stage_began)
+        return body
 
     except Exception as e:
         logger.error("Prediction failed: %s", e, exc_info=True)
         return jsonify({"status": "error", "message": f"Prediction failed: {str(e)}"}), 500
 
+def score_rows(pipeline, features):
+    """Ensemble probabilities for an N x 8 matrix, computing only cache misses."""
+    if prediction_cache is None:
+        return scorer(pipeline)(features)
+
+    probabilities = np.array([prediction_cache.get(row, pipeline.version) for row in features], dtype=float)
+    misses = np.isnan(probabilities)
+    if misses.any():
+        probabilities[misses] = scorer(pipeline)(features[misses])
+        for row, value in zip(features[misses], probabilities[misses]):
+            prediction_cache.set(row, value, pipeline.version)
+    return probabilities
+
+# =====================================================
+# BATCH PREDICTION
+# =====================================================
+@app.route("/predict/batch", methods=["POST"])
+def predict_batch():
+    stage_began = time.perf_counter()
+    data = request.get_json(force=True)
+
+    if isinstance(data, dict):
+        patients = data.get("patients")
+        default_user_id = data.get("user_id")
+    else:
+        patients = data
+        default_user_id = None
+
+    if not isinstance(patients, list) or not patients:
+        return jsonify({"status": "error", "message": "patients must be a non-empty list"}), 400
+
+    if len(patients) > MAX_BATCH_ROWS:
+        return jsonify({"status": "error", "message": f"Batch exceeds {MAX_BATCH_ROWS} rows"}), 413
+
+    log_info("Batch prediction request received: %d rows", len(patients))
+
+    # Validate rows individually so one bad row doesn't fail the whole batch
+    valid_indices = []
+    valid_values = []
+    errors = []
+    for index, row in enumerate(patients):
+        try:
+            valid_values.append(parse_batch_row(row))
+            valid_indices.append(index)
+        except ValueError as e:
+            errors.append({"index": index, "message": str(e)})
+    observe_stage("parse", stage_began)
+
+    pipeline = model_manager.active
+    if not valid_values:
+        return jsonify({"results": [], "errors": errors, "saved": 0, "model_version": pipeline.version})
+
+    try:
+        # One imputer / scaler / ensemble pass over the whole N x 8 matrix
+        stage_began = time.perf_counter()
+        probabilities = score_rows(pipeline, np.array(valid_values, dtype=float))
+        observe_stage("predict", stage_began)
+    except Exception as e:
+        logger.error("Batch prediction failed: %s", e, exc_info=True)
+        return jsonify({"status": "error", "message": f"Batch prediction failed: {str(e)}"}), 500
+
+    results = []
+    db_rows = []
+    for index, values, avg_probability in zip(valid_indices, valid_values, probabilities):
+        avg_probability = float(avg_probability)
+        probability_percentage = round(avg_probability * 100, 2)
+        prediction, risk_level = categorize_probability(avg_probability)
+
+        results.append({
+            "index": index,
+            "prediction": prediction,
+            "riskLevel": risk_level,
+            "probability": probability_percentage,
+            "score": round(avg_probability, 3)
+        })
+
+        user_id = patients[index].get("user_id", default_user_id)
+        if user_id:
+            db_rows.append(report_row(user_id, values, prediction, probability_percentage, risk_level))
+
+    # Bulk insert in a single transaction
+    saved = 0
+    if db_rows:
+        stage_began = time.perf_counter()
+        try:
+            with db_pool.transaction() as conn:
+                conn.executemany(INSERT_DAILY_REPORT, db_rows)
+            saved = len(db_rows)
+            log_info("Saved %d batch predictions to database", saved)
+        except Exception as db_error:
+            logger.error("Database batch save error: %s", db_error)
+        observe_stage("db_write", stage_began)
+
+    log_info("Batch prediction finished: %d scored, %d errors", len(results), len(errors))
+
+    stage_began = time.perf_counter()
+    body = jsonify({"results": results, "errors": errors, "saved": saved, "model_version": pipeline.version})
+    observe_stage("serialize", stage_began)
+    return body
+
+# =====================================================
+# MODEL ADMIN
+# =====================================================
+@app.route("/admin/reload-models", methods=["POST"])
+def reload_models():
+    if not ADMIN_TOKEN:
+        return jsonify({"status": "error", "message": "Model reload endpoint is disabled"}), 404
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", "").encode(), ADMIN_TOKEN.encode()):
+        return jsonify({"status": "error", "message": "Invalid admin token"}), 403
+
+    data = request.get_json(silent=True) or {}
+    try:
+        result = model_manager.reload(force=bool(data.get("force")))
+    except Exception as e:
+        logger.error("Model reload failed: %s", e, exc_info=True)
+        return jsonify({
+            "status": "error",
+            "message": f"Model reload failed: {str(e)}",
+            "model_version": model_manager.active.version
+        }), 422
+
+    return jsonify(dict(result, status="success"))
+
+@app.route("/stats/startup", methods=["GET"])
+def startup_stats():
+    return jsonify(startup_timings)
+
+@app.route("/stats/model", methods=["GET"])
+def model_stats():
+    return jsonify(model_manager.getStats())
+
+@app.route("/stats/batcher", methods=["GET"])
+def batcher_stats():
+    if batcher is None:
+        return jsonify({"enabled": False})
+    return jsonify(dict(batcher.getStats(), enabled=True))
+
+@app.route("/stats/inference-workers", methods=["GET"])
+def inference_worker_stats():
+    if inference_pool is None:
+        return jsonify({"enabled": False})
+    return jsonify(dict(inference_pool.getStats(), enabled=True))
+
+@app.route("/stats/cache", methods=["GET"])
+def cache_stats():
+    if prediction_cache is None:
+        return jsonify({"enabled": False})
+    return jsonify(dict(prediction_cache.getStats(), enabled=True))
+
+@app.route("/stats/profiles", methods=["GET"])
+def profile_stats():
+    # Slowest captured requests first; ?limit=N (default 20)
+    if not profiler.enabled:
+        return jsonify({"enabled": False})
+    # Captures expose request paths and internal file names
+    if not PROFILE_TOKEN:
+        return jsonify({"status": "error", "message": "Profile listing requires PROFILE_TOKEN"}), 404
+    if not profiler.checkToken(request.headers.get("X-Profile-Token")):
+        return jsonify({"status": "error", "message": "Invalid profile token"}), 403
+    try:
+        limit = max(1, int(request.args.get("limit", 20)))
+    except ValueError:
+        return jsonify({"status": "error", "message": "limit must be an integer"}), 400
+    return jsonify({"enabled": True, "directory": PROFILE_DIR, "profiles": profiler.slowest(limit)})
+
+@app.route("/stats/write-behind", methods=["GET"])
+def write_behind_stats():
+    if report_writer is None:
+        return jsonify({"enabled": False})
+    return jsonify(dict(report_writer.getStats(), enabled=True))
+
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    if not METRICS_ENABLED:
+        return jsonify({"status": "error", "message": "Metrics are disabled"}), 404
+    return Response(metrics.render(), content_type=prometheus.CONTENT_TYPE)
+
 # =====================================================
 # PREDICTION HISTORY
 # =====================================================
 @app.route("/history/<int:user_id>", methods=["GET"])
 def get_history(user_id):
-    logger.info("History request for user %s", user_id)
+    log_info("History request for user %s", user_id)
 
+    # ?fields=glucose,probability  ?limit=50  ?before=<date>,<id>  ?format=ndjson|json-stream
     try:
-        conn = sqlite3.connect("diabetes.db")
-        conn.row_factory = sqlite3.Row
-        cur = conn.cursor()
-
-        cur.execute("""
-            SELECT id, user_id, date, pregnancies, glucose, bmi, blood_pressure,
-                   skin_thickness, insulin, dpf, age, prediction, probability, risk_level
-            FROM daily_reports
-            WHERE user_id = ?
-            ORDER BY date DESC
-        """, (user_id,))
-
-        rows = cur.fetchall()
-        conn.close()
-
-        history = []
-        for row in rows:
-            history.append({
-                "id": row["id"],
-                "date": row["date"],
-                "pregnancies": row["pregnancies"],
-                "glucose": row["glucose"],
-                "bmi": row["bmi"],
-                "blood_pressure": row["blood_pressure"],
-                "skin_thickness": row["skin_thickness"],
-                "insulin": row["insulin"],
-                "dpf": row["dpf"],
-                "age": row["age"],
-                "prediction": row["prediction"],
-                "probability": row["probability"],
-                "risk_level": row["risk_level"]
-            })
+        fields = parse_history_fields(request.args.get("fields"))
+        limit = parse_history_limit(request.args.get("limit"))
+        before = parse_history_cursor(request.args.get("before"))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+    output_format = request.args.get("format", "json")
+    if output_format not in ("json", "ndjson", "json-stream"):
+        return jsonify({"status": "error", "message": f"Unsupported format: {output_format}"}), 400
+
+    params = [user_id]
+    if before:
+        params.extend(before)
+    if limit:
+        params.append(limit)
+
+    try:
+        cur = db_pool.getConnection().cursor()
+
+        with sql_timer("history"):
+            cur.execute(queries.historyQuery(fields, paged=bool(before), limited=bool(limit)), params)
+
+        if output_format != "json":
+            # Rows go from the cursor straight to the socket, one at a time
+            generator = stream_history_ndjson if output_format == "ndjson" else stream_history_json
+            mimetype = "application/x-ndjson" if output_format == "ndjson" else "application/json"
+            return Response(stream_with_context(generator(cur, fields, limit)), mimetype=mimetype)
+
+        with sql_timer("history_fetch"):
+            rows = cur.fetchall()
 
-        logger.info("Found %d history records for user %s", len(history), user_id)
+        history = [history_record(row, fields) for row in rows]
 
-        return jsonify({"history": history})
+        log_info("Found %d history records for user %s", len(history), user_id)
+
+        response = {"history": history}
+        if limit:
+            response["next_before"] = next_history_cursor(rows[-1] if rows else None, len(rows), limit)
+        return jsonify(response)
 
     except Exception as e:
         logger.error("History error: %s", e, exc_info=True)
         return jsonify({"status": "error", "message": str(e)}), 500
 
+def parse_history_fields(value):
+    if not value:
+        return queries.HISTORY_FIELDS
+    fields = [field.strip() for field in value.split(",") if field.strip()]
+    unknown = [field for field in fields if field not in queries.HISTORY_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+def parse_history_limit(value):
+    if value is None:
+        return None
+    limit = int(value)
+    if not 1 <= limit <= HISTORY_MAX_LIMIT:
+        raise ValueError(f"limit must be between 1 and {HISTORY_MAX_LIMIT}")
+    return limit
+
+def parse_history_cursor(value):
+    # Cursor is "<date>,<id>" of the last row of the previous page
+    if not value:
+        return None
+    date, _, row_id = value.rpartition(",")
+    if not date:
+        raise ValueError("before must look like <date>,<id>")
+    return date, int(row_id)
+
+def history_record(row, fields):
+    return {field: row[field] for field in fields}
+
+def next_history_cursor(last_row, count, limit):
+    # A short page means there is nothing older left
+    if last_row is None or count < limit:
+        return None
+    return f"{last_row['date']},{last_row['id']}"
+
+def stream_history_ndjson(cur, fields, limit):
+    count = 0
+    last_row = None
+    for row in timed_rows(cur, "history_fetch"):
+        yield json.dumps(history_record(row, fields)) + "\n"
+        count += 1
+        last_row = row
+    if limit:
+        yield json.dumps({"next_before": next_history_cursor(last_row, count, limit)}) + "\n"
+
+def stream_history_json(cur, fields, limit):
+    yield '{"history": ['
+    count = 0
+    last_row = None
+    for row in timed_rows(cur, "history_fetch"):
+        yield ("," if count else "") + json.dumps(history_record(row, fields))
+        count += 1
+        last_row = row
+    yield "]"
+    if limit:
+        yield ', "next_before": ' + json.dumps(next_history_cursor(last_row, count, limit))
+    yield "}"
+
 # =====================================================
 # MONTHLY REPORT
 # =====================================================
@@ -424,66 +865,32 @@ def monthly_report(user_id):
     month = request.args.get("month")
     year = request.args.get("year")
 
-    logger.info("Monthly report request for user %s: %s/%s", user_id, month, year)
+    log_info("Monthly report request for user %s: %s/%s", user_id, month, year)
 
     if not month or not year:
         return jsonify({"status": "error", "message": "Month and year are required"}), 400
 
     try:
-        conn = sqlite3.connect("diabetes.db")
-        cur = conn.cursor()
-
-        # Query all records for the user in the specified month/year
-        cur.execute("""
-            SELECT glucose, bmi, blood_pressure, prediction, probability
-            FROM daily_reports
-            WHERE user_id = ?
-            AND strftime('%m', date) = ?
-            AND strftime('%Y', date) = ?
-        """, (user_id, month.zfill(2), year))
-
-        records = cur.fetchall()
-        conn.close()
-
-        logger.info("Found %d records for monthly report", len(records))
-
-        if not records:
-            return jsonify({
-                "avg_glucose": 0,
-                "avg_bmi": 0,
-                "avg_bp": 0,
-                "avg_risk": 0,
-                "diabetic_days": 0,
-                "normal_days": 0,
-                "total_records": 0
-            })
+        start_date, end_date = queries.monthRange(int(year), int(month))
+    except ValueError:
+        return jsonify({"status": "error", "message": "Invalid month or year"}), 400
 
-        # Calculate statistics
-        total_glucose = sum(r[0] for r in records)
-        total_bmi = sum(r[1] for r in records)
-        total_bp = sum(r[2] for r in records)
-        total_probability = sum(r[4] for r in records)
+    try:
+        cur = db_pool.getConnection().cursor()
 
-        diabetic_days = sum(1 for r in records if r[3] == 1)
-        normal_days = len(records) - diabetic_days
+        # One pre-aggregated rollup row, or one aggregate query over the month
+        with sql_timer("monthly_stats"):
+            if SUMMARY_TABLES:
+                cur.execute(queries.MONTHLY_ROLLUP, (user_id, int(year), int(month)))
+            else:
+                cur.execute(queries.MONTHLY_STATS, (user_id, start_date, end_date))
+            row = cur.fetchone()
 
-        avg_glucose = round(total_glucose / len(records), 2)
-        avg_bmi = round(total_bmi / len(records), 2)
-        avg_bp = round(total_bp / len(records), 2)
-        avg_risk = round(total_probability / len(records), 2)
+        response = monthly_summary(row)
 
-        response = {
-            "avg_glucose": avg_glucose,
-            "avg_bmi": avg_bmi,
-            "avg_bp": avg_bp,
-            "avg_risk": avg_risk,
-            "diabetic_days": diabetic_days,
-            "normal_days": normal_days,
-            "total_records": len(records)
-        }
-
-        logger.info("Monthly report generated: glucose=%.2f, bmi=%.2f, bp=%.2f, risk=%.2f%%",
-                    avg_glucose, avg_bmi, avg_bp, avg_risk)
+        log_info("Monthly report generated from %d records: glucose=%.2f, bmi=%.2f, bp=%.2f, risk=%.2f%%",
+                    response["total_records"], response["avg_glucose"], response["avg_bmi"],
+                    response["avg_bp"], response["avg_risk"])
 
         return jsonify(response)
 
@@ -491,6 +898,79 @@ def monthly_report(user_id):
         logger.error("Monthly report error: %s", e, exc_info=True)
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route("/monthly-report/<int:user_id>/trailing", methods=["GET"])
+def monthly_report_trailing(user_id):
+    # Trailing N months (default 12) ending at ?year=&month= (default: current UTC month)
+    now = datetime.now(timezone.utc)
+
+    try:
+        months = int(request.args.get("months", 12))
+        end_year = int(request.args.get("year", now.year))
+        end_month = int(request.args.get("month", now.month))
+        if not 1 <= months <= MAX_TRAILING_MONTHS:
+            raise ValueError
+        periods = queries.trailingMonths(end_year, end_month, months)
+        start_date = queries.monthRange(*periods[0])[0]
+        end_date = queries.monthRange(*periods[-1])[1]
+    except ValueError:
+        return jsonify({"status": "error", "message": "Invalid months, month or year"}), 400
+
+    log_info("Trailing report request for user %s: %d months to %s/%s", user_id, months, end_month, end_year)
+
+    try:
+        cur = db_pool.getConnection().cursor()
+
+        with sql_timer("monthly_stats_range"):
+            if SUMMARY_TABLES:
+                cur.execute(queries.MONTHLY_ROLLUPS_RANGE, (user_id, *periods[0], *periods[-1]))
+            else:
+                cur.execute(queries.MONTHLY_STATS_BY_MONTH, (user_id, start_date, end_date))
+            rows = cur.fetchall()
+
+        by_month = {(row["year"], row["month"]): row for row in rows}
+
+        return jsonify({
+            "months": [
+                dict(monthly_summary(by_month.get((year, month))), year=year, month=month)
+                for year, month in periods
+            ]
+        })
+
+    except Exception as e:
+        logger.error("Trailing report error: %s", e, exc_info=True)
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+def monthly_summary(row):
+    """Report fields from a row of monthly sums and non-NULL counts."""
+    total_records = row["total_records"] if row else 0
+
+    if not total_records:
+        return {
+            "avg_glucose": 0,
+            "avg_bmi": 0,
+            "avg_bp": 0,
+            "avg_risk": 0,
+            "diabetic_days": 0,
+            "normal_days": 0,
+            "total_records": 0
+        }
+
+    # Missing readings are stored as NULL and not counted
+    def average(total, count):
+        return round(total / count, 2) if count else 0
+
+    diabetic_days = row["diabetic_days"]
+
+    return {
+        "avg_glucose": average(row["glucose_sum"], row["glucose_count"]),
+        "avg_bmi": average(row["bmi_sum"], row["bmi_count"]),
+        "avg_bp": average(row["bp_sum"], row["bp_count"]),
+        "avg_risk": average(row["probability_sum"], row["probability_count"]),
+        "diabetic_days": diabetic_days,
+        "normal_days": total_records - diabetic_days,
+        "total_records": total_records
+    }
+
 # =====================================================
 # SERVE REACT
 # =====================================================
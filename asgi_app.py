@@ -0,0 +1,402 @@
+# backend/asgi_app.py
+#
+#   uvicorn asgi_app:app --port 8000
+#
+# ASGI variant of the API (Starlette) for many slow or concurrent clients
+# per process. It serves the same routes and JSON as app.py: /register,
+# /login, /profile, /predict, /predict/batch, /history and /monthly-report.
+# The event loop never blocks:
+#   - SQLite work runs on a bounded DB thread pool (each thread keeps its
+#     pooled connection)
+#   - imputer + ensemble scoring runs on a bounded inference thread pool
+#     (sklearn and XGBoost release the GIL for most of predict_proba), or
+#     waits there on the INFERENCE_WORKERS processes when those are enabled
+# A pool with more than ASGI_MAX_PENDING jobs running or queued answers 503
+# rather than queueing without limit.
+#
+# Configuration, the loaded models, the connection pool, the prediction
+# cache / write-behind queue and the request helpers all come from
+# importing app.py, so both entry points behave the same.
+# /history only serves format=json here; the streaming formats need the
+# Flask app.
+
+import asyncio
+import functools
+import os
+import queue
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+import app as flask_api
+from app import (
+    CORS_ORIGIN, FEATURE_FIELDS, MAX_BATCH_ROWS, MAX_TRAILING_MONTHS, SUMMARY_TABLES,
+    categorize_probability, db_pool, history_record, logger, model_manager, monthly_summary, next_history_cursor,
+    parse_batch_row, parse_history_cursor, parse_history_fields, parse_history_limit, profile_payload, report_row,
+    safe_float, score_rows,
+)
+from database import queries
+from database.database_manager import INSERT_DAILY_REPORT
+
+ASGI_DB_THREADS = int(os.environ.get("ASGI_DB_THREADS", 8))
+ASGI_INFERENCE_THREADS = int(os.environ.get("ASGI_INFERENCE_THREADS", os.cpu_count() or 1))
+ASGI_MAX_PENDING = int(os.environ.get("ASGI_MAX_PENDING", 512))
+
+
+class ExecutorBusy(Exception):
+    pass
+
+
+class BoundedExecutor:
+    """
+    Thread pool with a cap on running + queued jobs. The counter is only
+    touched from the event loop thread, so it needs no lock.
+    """
+
+    def __init__(self, name: str, threads: int, maxPending: int):
+        self.name = name
+        self.maxPending = maxPending
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(threads, thread_name_prefix=name)
+
+    # +run(fn : callable, *args) : awaitable
+    async def run(self, fn, *args):
+        if self.pending >= self.maxPending:
+            raise ExecutorBusy(f"{self.name} pool is busy ({self.pending} jobs pending)")
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args))
+        finally:
+            self.pending -= 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+db_executor = BoundedExecutor("asgi-db", ASGI_DB_THREADS, ASGI_MAX_PENDING)
+inference_executor = BoundedExecutor("asgi-inference", ASGI_INFERENCE_THREADS, ASGI_MAX_PENDING)
+
+# ---------------- DB HELPERS (run on db_executor) ----------------
+def fetch_one(sql, params):
+    return db_pool.getConnection().execute(sql, params).fetchone()
+
+def fetch_all(sql, params):
+    return db_pool.getConnection().execute(sql, params).fetchall()
+
+def execute_write(sql, params):
+    with db_pool.transaction() as conn:
+        return conn.execute(sql, params).lastrowid
+
+def execute_many(sql, rows):
+    with db_pool.transaction() as conn:
+        conn.executemany(sql, rows)
+    return len(rows)
+
+def load_profile(user_id):
+    user = fetch_one(queries.USER_PROFILE, (user_id,))
+    if not user:
+        return None
+    stats = fetch_one(queries.PROFILE_STATS_SUMMARY if SUMMARY_TABLES else queries.PROFILE_STATS, (user_id,))
+    return profile_payload(user, stats)
+
+def save_report(row):
+    # Same write path as app.py: write-behind queue if enabled, else a direct insert
+    if flask_api.report_writer is not None:
+        try:
+            flask_api.report_writer.submit(row)
+            return
+        except queue.Full:
+            logger.warning("Write-behind queue full, saving synchronously")
+    execute_write(INSERT_DAILY_REPORT, row)
+
+# ---------------- REQUEST HELPERS ----------------
+def error(message, status):
+    return JSONResponse({"status": "error", "message": message}, status_code=status)
+
+async def read_json(request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+# =====================================================
+# ACCOUNT
+# =====================================================
+async def register(request):
+    data = await read_json(request)
+    if not isinstance(data, dict):
+        return error("Invalid JSON body", 400)
+
+    username = data.get("username")
+    password = data.get("password")
+    email = data.get("email", "")
+
+    if not username or not password:
+        return error("Missing fields", 400)
+
+    try:
+        user_id = await db_executor.run(execute_write, queries.INSERT_USER, (username, password, email))
+    except sqlite3.IntegrityError:
+        return error("User already exists", 409)
+
+    return JSONResponse({"status": "success", "user_id": user_id})
+
+async def login(request):
+    data = await read_json(request)
+    if not isinstance(data, dict):
+        return error("Invalid JSON body", 400)
+
+    user = await db_executor.run(fetch_one, queries.USER_BY_CREDENTIALS, (data.get("username"), data.get("password")))
+    if user:
+        return JSONResponse({"status": "success", "user_id": user[0], "username": user[1], "email": user[2]})
+    return error("Invalid credentials", 401)
+
+async def get_profile(request):
+    payload = await db_executor.run(load_profile, request.path_params["user_id"])
+    if payload is None:
+        return error("User not found", 404)
+    return JSONResponse(payload)
+
+async def update_profile(request):
+    user_id = request.path_params["user_id"]
+    data = await read_json(request)
+    if not isinstance(data, dict):
+        return error("Invalid JSON body", 400)
+
+    if not await db_executor.run(fetch_one, queries.USER_EXISTS, (user_id,)):
+        return error("User not found", 404)
+
+    params = (data.get("full_name", ""), data.get("email", ""), data.get("phone", ""), user_id)
+    await db_executor.run(execute_write, queries.UPDATE_USER_PROFILE, params)
+    return JSONResponse({"status": "success", "message": "Profile updated successfully"})
+
+# =====================================================
+# PREDICTION
+# =====================================================
+async def predict(request):
+    data = await read_json(request)
+    if not isinstance(data, dict):
+        return error("Invalid JSON body", 400)
+
+    user_id = data.get("user_id")
+    values = [safe_float(data.get(field)) for field in FEATURE_FIELDS]
+
+    # One pipeline per request, as in app.py, so a reload cannot switch models mid-request
+    pipeline = model_manager.active
+    avg_probability = float((await inference_executor.run(score_rows, pipeline, np.array([values])))[0])
+    probability_percentage = round(avg_probability * 100, 2)
+    prediction, risk_level = categorize_probability(avg_probability)
+
+    if user_id:
+        try:
+            await db_executor.run(save_report, report_row(user_id, values, prediction, probability_percentage, risk_level))
+        except ExecutorBusy:
+            raise
+        except Exception as db_error:
+            logger.error("Database save error: %s", db_error)
+
+    return JSONResponse({
+        "prediction": prediction,
+        "riskLevel": risk_level,
+        "probability": probability_percentage,
+        "score": round(avg_probability, 3),
+        "model_version": pipeline.version
+    })
+
+async def predict_batch(request):
+    data = await read_json(request)
+
+    if isinstance(data, dict):
+        patients = data.get("patients")
+        default_user_id = data.get("user_id")
+    else:
+        patients = data
+        default_user_id = None
+
+    if not isinstance(patients, list) or not patients:
+        return error("patients must be a non-empty list", 400)
+
+    if len(patients) > MAX_BATCH_ROWS:
+        return error(f"Batch exceeds {MAX_BATCH_ROWS} rows", 413)
+
+    valid_indices = []
+    valid_values = []
+    errors = []
+    for index, row in enumerate(patients):
+        try:
+            valid_values.append(parse_batch_row(row))
+            valid_indices.append(index)
+        except ValueError as e:
+            errors.append({"index": index, "message": str(e)})
+
+    pipeline = model_manager.active
+    if not valid_values:
+        return JSONResponse({"results": [], "errors": errors, "saved": 0, "model_version": pipeline.version})
+
+    probabilities = await inference_executor.run(score_rows, pipeline, np.array(valid_values, dtype=float))
+
+    results = []
+    db_rows = []
+    for index, values, avg_probability in zip(valid_indices, valid_values, probabilities):
+        avg_probability = float(avg_probability)
+        probability_percentage = round(avg_probability * 100, 2)
+        prediction, risk_level = categorize_probability(avg_probability)
+
+        results.append({
+            "index": index,
+            "prediction": prediction,
+            "riskLevel": risk_level,
+            "probability": probability_percentage,
+            "score": round(avg_probability, 3)
+        })
+
+        user_id = patients[index].get("user_id", default_user_id)
+        if user_id:
+            db_rows.append(report_row(user_id, values, prediction, probability_percentage, risk_level))
+
+    saved = 0
+    if db_rows:
+        try:
+            saved = await db_executor.run(execute_many, INSERT_DAILY_REPORT, db_rows)
+        except ExecutorBusy:
+            raise
+        except Exception as db_error:
+            logger.error("Database batch save error: %s", db_error)
+
+    return JSONResponse({"results": results, "errors": errors, "saved": saved, "model_version": pipeline.version})
+
+# =====================================================
+# PREDICTION HISTORY
+# =====================================================
+async def get_history(request):
+    user_id = request.path_params["user_id"]
+    try:
+        fields = parse_history_fields(request.query_params.get("fields"))
+        limit = parse_history_limit(request.query_params.get("limit"))
+        before = parse_history_cursor(request.query_params.get("before"))
+    except ValueError as e:
+        return error(str(e), 400)
+
+    output_format = request.query_params.get("format", "json")
+    if output_format != "json":
+        return error(f"Unsupported format: {output_format} (streaming formats are served by app.py)", 400)
+
+    params = [user_id]
+    if before:
+        params.extend(before)
+    if limit:
+        params.append(limit)
+
+    rows = await db_executor.run(fetch_all, queries.historyQuery(fields, paged=bool(before), limited=bool(limit)), params)
+
+    response = {"history": [history_record(row, fields) for row in rows]}
+    if limit:
+        response["next_before"] = next_history_cursor(rows[-1] if rows else None, len(rows), limit)
+    return JSONResponse(response)
+
+# =====================================================
+# MONTHLY REPORT
+# =====================================================
+async def monthly_report(request):
+    user_id = request.path_params["user_id"]
+    month = request.query_params.get("month")
+    year = request.query_params.get("year")
+
+    if not month or not year:
+        return error("Month and year are required", 400)
+
+    try:
+        start_date, end_date = queries.monthRange(int(year), int(month))
+    except ValueError:
+        return error("Invalid month or year", 400)
+
+    if SUMMARY_TABLES:
+        row = await db_executor.run(fetch_one, queries.MONTHLY_ROLLUP, (user_id, int(year), int(month)))
+    else:
+        row = await db_executor.run(fetch_one, queries.MONTHLY_STATS, (user_id, start_date, end_date))
+
+    return JSONResponse(monthly_summary(row))
+
+async def monthly_report_trailing(request):
+    user_id = request.path_params["user_id"]
+    now = datetime.now(timezone.utc)
+
+    try:
+        months = int(request.query_params.get("months", 12))
+        end_year = int(request.query_params.get("year", now.year))
+        end_month = int(request.query_params.get("month", now.month))
+        if not 1 <= months <= MAX_TRAILING_MONTHS:
+            raise ValueError
+        periods = queries.trailingMonths(end_year, end_month, months)
+        start_date = queries.monthRange(*periods[0])[0]
+        end_date = queries.monthRange(*periods[-1])[1]
+    except ValueError:
+        return error("Invalid months, month or year", 400)
+
+    if SUMMARY_TABLES:
+        rows = await db_executor.run(fetch_all, queries.MONTHLY_ROLLUPS_RANGE, (user_id, *periods[0], *periods[-1]))
+    else:
+        rows = await db_executor.run(fetch_all, queries.MONTHLY_STATS_BY_MONTH, (user_id, start_date, end_date))
+
+    by_month = {(row["year"], row["month"]): row for row in rows}
+    return JSONResponse({
+        "months": [
+            dict(monthly_summary(by_month.get((year, month))), year=year, month=month)
+            for year, month in periods
+        ]
+    })
+
+# =====================================================
+# APP
+# =====================================================
+async def executor_busy(request, exc):
+    return error(str(exc), 503)
+
+async def server_error(request, exc):
+    logger.error("%s %s failed: %s", request.method, request.url.path, exc, exc_info=exc)
+    return error(str(exc), 500)
+
+@asynccontextmanager
+async def lifespan(app):
+    if flask_api.inference_pool is not None:
+        # Start the inference worker processes now rather than on the first request
+        await asyncio.get_running_loop().run_in_executor(None, flask_api.inference_pool.start)
+    logger.info("ASGI app ready: %d DB threads, %d inference threads, %d pending jobs max per pool",
+                ASGI_DB_THREADS, ASGI_INFERENCE_THREADS, ASGI_MAX_PENDING)
+    yield
+    db_executor.shutdown()
+    inference_executor.shutdown()
+
+app = Starlette(
+    routes=[
+        Route("/register", register, methods=["POST"]),
+        Route("/login", login, methods=["POST"]),
+        Route("/profile/{user_id:int}", get_profile, methods=["GET"]),
+        Route("/profile/{user_id:int}", update_profile, methods=["PUT"]),
+        Route("/predict", predict, methods=["POST"]),
+        Route("/predict/batch", predict_batch, methods=["POST"]),
+        Route("/history/{user_id:int}", get_history, methods=["GET"]),
+        Route("/monthly-report/{user_id:int}", monthly_report, methods=["GET"]),
+        Route("/monthly-report/{user_id:int}/trailing", monthly_report_trailing, methods=["GET"]),
+    ],
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=[CORS_ORIGIN], allow_methods=["*"], allow_headers=["*"],
+                   allow_credentials=True),
+    ],
+    exception_handlers={ExecutorBusy: executor_busy, Exception: server_error},
+    lifespan=lifespan,
+)
+
+# =====================================================
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=int(os.environ.get("PORT", 8000)))
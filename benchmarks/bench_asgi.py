@@ -0,0 +1,244 @@
+# backend/benchmarks/bench_asgi.py
+#
+# Load test of the Flask app (app.py) against the ASGI app (asgi_app.py).
+# Each server runs as its own process on a scratch copy of the schema.
+# A closed-loop client with C concurrent connections then sends a mix of
+# /predict, /history, /profile and /monthly-report requests at each
+# concurrency level. Reports throughput, p50/p95/p99 latency and non-2xx
+# responses per server and level.
+#
+#   python benchmarks/bench_asgi.py
+#   python benchmarks/bench_asgi.py --concurrency 1 16 64 256 --requests 2000 --output load.json
+#   python benchmarks/bench_asgi.py --flask-server gunicorn --flask-workers 4
+#
+# The client is stdlib only (one thread and keep-alive connection per
+# concurrent client). On small boxes it competes with the server for CPU,
+# so compare servers with each other rather than with absolute numbers.
+
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HOST = "127.0.0.1"
+
+# Share of each request type in the mix
+ROUTE_MIX = {"predict": 0.5, "history": 0.2, "profile": 0.2, "monthly": 0.1}
+
+SAMPLE_FEATURES = {
+    "Pregnancies": 6, "Glucose": 148, "BloodPressure": 72, "SkinThickness": 35,
+    "Insulin": 0, "BMI": 33.6, "DiabetesPedigreeFunction": 0.627, "Age": 50,
+}
+
+
+# ---------------- SERVERS ----------------
+
+def serverCommand(kind: str, port: int, flaskServer: str, workers: int) -> list:
+    if kind == "asgi":
+        return [sys.executable, "-m", "uvicorn", "asgi_app:app", "--host", HOST, "--port", str(port),
+                "--log-level", "warning", "--no-access-log"]
+    if flaskServer == "gunicorn":
+        return [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"{HOST}:{port}",
+                "--workers", str(workers), "app:app"]
+    # Werkzeug's threaded server: one thread per connection
+    return [sys.executable, "-c", f"import app; app.app.run(host='{HOST}', port={port}, threaded=True)"]
+
+
+def startServer(kind: str, port: int, scratch: str, flaskServer: str, workers: int):
+    env = dict(
+        os.environ,
+        DATABASE_PATH=os.path.join(scratch, f"{kind}.db"),
+        REQUEST_LOG_SAMPLE_RATE="0",
+        PYTHONWARNINGS="ignore",
+    )
+    log = open(os.path.join(scratch, f"{kind}.log"), "w")
+    process = subprocess.Popen(serverCommand(kind, port, flaskServer, workers), cwd=BASE_DIR, env=env,
+                               stdout=log, stderr=subprocess.STDOUT)
+
+    deadline = time.time() + 180
+    while time.time() < deadline:
+        if process.poll() is not None:
+            log.close()
+            with open(log.name) as file:
+                raise RuntimeError(f"{kind} server exited:\n" + "".join(file.readlines()[-20:]))
+        try:
+            connection = http.client.HTTPConnection(HOST, port, timeout=2)
+            connection.request("GET", "/profile/0")
+            connection.getresponse().read()
+            return process
+        except OSError:
+            time.sleep(0.25)
+    process.kill()
+    raise RuntimeError(f"{kind} server did not start within 180 s")
+
+
+def stopServer(process):
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+# ---------------- CLIENT ----------------
+
+def call(connection, method: str, path: str, body=None):
+    payload = json.dumps(body).encode() if body is not None else None
+    headers = {"Content-Type": "application/json"} if payload is not None else {}
+    connection.request(method, path, body=payload, headers=headers)
+    response = connection.getresponse()
+    data = response.read()
+    return response.status, data
+
+
+def seedUser(port: int) -> int:
+    connection = http.client.HTTPConnection(HOST, port, timeout=30)
+    call(connection, "POST", "/register", {"username": "load", "password": "load"})
+    _, data = call(connection, "POST", "/login", {"username": "load", "password": "load"})
+    userId = json.loads(data)["user_id"]
+    for _ in range(50):
+        call(connection, "POST", "/predict", dict(SAMPLE_FEATURES, user_id=userId))
+    connection.close()
+    return userId
+
+
+def requestFor(kind: str, userId: int, rng: random.Random):
+    if kind == "predict":
+        features = {name: value * rng.uniform(0.8, 1.2) for name, value in SAMPLE_FEATURES.items()}
+        return "POST", "/predict", dict(features, user_id=userId)
+    if kind == "history":
+        return "GET", f"/history/{userId}?limit=50", None
+    if kind == "profile":
+        return "GET", f"/profile/{userId}", None
+    now = time.gmtime()
+    return "GET", f"/monthly-report/{userId}?month={now.tm_mon}&year={now.tm_year}", None
+
+
+def runLevel(port: int, userId: int, concurrency: int, totalRequests: int, timeout: float) -> dict:
+    """
+    Closed loop: concurrency clients, each sending its next request as soon
+    as the previous one returns, until totalRequests have been sent
+    """
+    kinds, weights = zip(*ROUTE_MIX.items())
+    remaining = [totalRequests]
+    lock = threading.Lock()
+    samples = []
+
+    def client(seed):
+        rng = random.Random(seed)
+        connection = http.client.HTTPConnection(HOST, port, timeout=timeout)
+        local = []
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    break
+                remaining[0] -= 1
+            kind = rng.choices(kinds, weights)[0]
+            method, path, body = requestFor(kind, userId, rng)
+            startedAt = time.perf_counter()
+            try:
+                try:
+                    status, _ = call(connection, method, path, body)
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    # Server closed the keep-alive connection: reconnect once
+                    connection.close()
+                    status, _ = call(connection, method, path, body)
+            except OSError:
+                connection.close()
+                status = 0
+            local.append((kind, status, time.perf_counter() - startedAt))
+        connection.close()
+        with lock:
+            samples.extend(local)
+
+    startedAt = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(seed,)) for seed in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - startedAt
+
+    return summarize(samples, elapsed)
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    def stats(rows):
+        latencies = np.array([seconds for _, _, seconds in rows]) * 1000
+        return {
+            "requests": len(rows),
+            "errors": sum(1 for _, status, _ in rows if not 200 <= status < 300),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+        }
+
+    result = dict(stats(samples), seconds=elapsed, requests_per_sec=len(samples) / elapsed)
+    result["routes"] = {kind: stats([row for row in samples if row[0] == kind])
+                        for kind in ROUTE_MIX if any(row[0] == kind for row in samples)}
+    return result
+
+
+# ---------------- MAIN ----------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test app.py (Flask) against asgi_app.py (ASGI)")
+    parser.add_argument("--servers", nargs="+", default=["flask", "asgi"], choices=["flask", "asgi"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--requests", type=int, default=1000, help="requests per concurrency level")
+    parser.add_argument("--timeout", type=float, default=60.0, help="client socket timeout in seconds")
+    parser.add_argument("--flask-server", default="werkzeug", choices=["werkzeug", "gunicorn"])
+    parser.add_argument("--flask-workers", type=int, default=2, help="gunicorn workers")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="bench_asgi_")
+    report = {"concurrency": args.concurrency, "requests": args.requests, "route_mix": ROUTE_MIX,
+              "flask_server": args.flask_server, "cpu_count": os.cpu_count(), "servers": {}}
+
+    try:
+        for kind in args.servers:
+            print(f"Starting {kind} server...")
+            process = startServer(kind, args.port, scratch, args.flask_server, args.flask_workers)
+            try:
+                userId = seedUser(args.port)
+                # Warm-up: first calls load lazily imported modules
+                runLevel(args.port, userId, 4, 40, args.timeout)
+                report["servers"][kind] = {}
+                for concurrency in args.concurrency:
+                    result = runLevel(args.port, userId, concurrency, args.requests, args.timeout)
+                    report["servers"][kind][str(concurrency)] = result
+                    print(f"  {kind:>5} c={concurrency:<4} {result['requests_per_sec']:>8.1f} req/s  "
+                          f"p50 {result['p50_ms']:>8.1f} ms  p95 {result['p95_ms']:>8.1f} ms  "
+                          f"p99 {result['p99_ms']:>8.1f} ms  errors {result['errors']}")
+            finally:
+                stopServer(process)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    if len(report["servers"]) == 2:
+        print(f"\n{'concurrency':>11}{'flask req/s':>13}{'asgi req/s':>12}{'flask p99':>11}{'asgi p99':>10}")
+        for concurrency in map(str, args.concurrency):
+            flask, asgi = report["servers"]["flask"][concurrency], report["servers"]["asgi"][concurrency]
+            print(f"{concurrency:>11}{flask['requests_per_sec']:>13.1f}{asgi['requests_per_sec']:>12.1f}"
+                  f"{flask['p99_ms']:>11.1f}{asgi['p99_ms']:>10.1f}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# backend/benchmarks/bench_cold_start.py
+#
+# Measures API cold start: imports `app` in fresh interpreters with
+# `python -X importtime`, then reports
+#   - wall time to import app (median over --runs)
+#   - app's own startup report (imports / database / models / artifacts)
+#   - the slowest modules imported directly by app, by cumulative time
+#   - which heavy optional modules (pandas, fpdf, matplotlib, ...) were
+#     loaded and through which import chain (sklearn >= 1.6 imports pandas
+#     itself whenever it is installed)
+#
+# Uses a scratch database so the tracked diabetes.db is never touched.
+#
+#   python benchmarks/bench_cold_start.py --engine compiled --runs 5
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that should only load when their feature is used
+LAZY_MODULES = ["pandas", "fpdf", "matplotlib", "seaborn"]
+
+PROBE = f"""
+import json, sys, time
+sys.path.insert(0, {BASE_DIR!r})
+began = time.perf_counter()
+import app
+elapsed = (time.perf_counter() - began) * 1000
+print("COLD_START " + json.dumps({{
+    "import_ms": elapsed,
+    "startup": app.startup_timings,
+    "loaded": [name for name in {LAZY_MODULES!r} if name in sys.modules],
+}}))
+"""
+
+
+def parseImportTime(stderr: str) -> list:
+    """
+    Returns (cumulative_ms, self_ms, depth, module) for each import in
+    -X importtime output, in print order (children before their parent)
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        selfUs, cumulativeUs, module = line[len("import time:"):].split("|")
+        depth = (len(module) - len(module.lstrip()) - 1) // 2
+        imports.append((int(cumulativeUs) / 1000, int(selfUs) / 1000, depth, module.strip()))
+    return imports
+
+
+def importChain(imports: list, name: str) -> list:
+    """
+    Modules that (transitively) imported name, outermost first
+    """
+    for index, (_, _, depth, module) in enumerate(imports):
+        if module == name:
+            break
+    else:
+        return []
+
+    chain = [name]
+    for _, _, parentDepth, parent in imports[index + 1:]:
+        if parentDepth < depth:
+            chain.append(parent)
+            depth = parentDepth
+    return list(reversed(chain))
+
+
+def runOnce(engine: str, databasePath: str):
+    env = dict(os.environ, INFERENCE_ENGINE=engine, DATABASE_PATH=databasePath, PYTHONWARNINGS="ignore")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    report = next(line for line in completed.stdout.splitlines() if line.startswith("COLD_START "))
+    return json.loads(report[len("COLD_START "):]), parseImportTime(completed.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold start time of the API process")
+    parser.add_argument("--engine", default="sklearn", choices=["sklearn", "compiled"])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15, help="slowest imports to list")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        databasePath = os.path.join(scratch, "cold_start.db")
+        # The first run creates the schema; later runs see a migrated database
+        runs = [runOnce(args.engine, databasePath) for _ in range(args.runs)]
+
+    reports = [report for report, _ in runs]
+    print(f"engine={args.engine} runs={args.runs}")
+    print(f"import app: median {statistics.median(r['import_ms'] for r in reports):.0f} ms, "
+          f"min {min(r['import_ms'] for r in reports):.0f} ms")
+
+    startup = reports[-1]["startup"]
+    print(f"startup report: imports {startup['imports']:.0f} ms, database {startup['database']:.0f} ms, "
+          f"models {startup['models']:.0f} ms")
+    for name, ms in startup["artifacts"].items():
+        print(f"  {name:<28}{ms:>8.1f} ms")
+
+    # Modules imported directly by app sit one level below it
+    imports = runs[-1][1]
+    direct = sorted((item for item in imports if item[2] == 1 and "app" in importChain(imports, item[3])), reverse=True)
+    print("slowest imports made by app (cumulative / self ms):")
+    for cumulative, own, _, module in direct[:args.top]:
+        print(f"  {module:<36}{cumulative:>9.1f}{own:>9.1f}")
+
+    loaded = reports[-1]["loaded"]
+    print("lazy modules loaded at startup:", "none" if not loaded else "")
+    for name in loaded:
+        print(f"  {name}: " + " -> ".join(importChain(imports, name)[:4]) + " -> ...")
+
+
+if __name__ == "__main__":
+    main()
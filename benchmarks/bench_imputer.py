@@ -0,0 +1,60 @@
+# backend/benchmarks/bench_imputer.py
+#
+# Compares sklearn's KNNImputer.transform with IndexedKNNImputer on
+# complete rows (fast path) and rows with missing values (KD-tree path).
+#
+#   python benchmarks/bench_imputer.py
+
+import os
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from preprocessing.knn_imputer import IndexedKNNImputer
+
+warnings.filterwarnings("ignore")
+
+
+def timeCall(fn, data, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn(data)
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    imputer = joblib.load(os.path.join(BASE_DIR, "saved_models", "imputer.pkl"))
+    indexed = IndexedKNNImputer(imputer)
+
+    data = pd.read_csv(os.path.join(BASE_DIR, "data", "pima_diabetes.csv")).drop("Outcome", axis=1).to_numpy(dtype=float)
+    rng = np.random.default_rng(42)
+
+    withMissing = data.copy()
+    withMissing[rng.random(data.shape) < 0.2] = np.nan
+
+    # Warm the KD-tree cache so the benchmark measures steady state
+    indexed.transform(withMissing)
+
+    cases = [
+        ("complete, 1 row", data[:1], 500),
+        ("complete, 768 rows", data, 50),
+        ("missing, 1 row", withMissing[np.isnan(withMissing).any(axis=1)][:1], 200),
+        ("missing, 768 rows", withMissing, 5),
+    ]
+
+    print(f"{'case':<22}{'sklearn ms':>14}{'indexed ms':>14}{'speedup':>10}")
+    for name, rows, repeats in cases:
+        baseline = timeCall(imputer.transform, rows, repeats)
+        fast = timeCall(indexed.transform, rows, repeats)
+        print(f"{name:<22}{baseline * 1000:>14.3f}{fast * 1000:>14.3f}{baseline / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+# backend/benchmarks/bench_inference.py
+#
+# Latency / throughput benchmark of the serving path, with rows sampled
+# from data/pima_diabetes.csv (optionally with readings blanked out so the
+# imputer has work to do):
+#   pipeline   raw imputer -> scaler -> rf / xgb / et, single-row p50/p95/p99
+#              and rows/sec at batch sizes 1..10k with a per-stage breakdown
+#   flask      /predict and /predict/batch through the Flask test client, plus
+#              the DB insert and JSON encoding of a /predict response
+#   memory     tracemalloc peak per batch size and process peak RSS
+#
+# Results are written as JSON; --baseline compares *_ms / rows_per_sec
+# against an earlier run and exits 1 when anything regressed by more
+# than --tolerance. Uses a scratch database, never diabetes.db.
+#
+#   python benchmarks/bench_inference.py --output run.json
+#   python benchmarks/bench_inference.py --engine compiled --baseline run.json --tolerance 0.25
+
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+warnings.filterwarnings("ignore")
+
+DATA_PATH = os.path.join(BASE_DIR, "data", "pima_diabetes.csv")
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+
+
+# ---------------- HELPERS ----------------
+
+def sampleRows(count: int, missingRate: float, seed: int = 42) -> np.ndarray:
+    data = np.loadtxt(DATA_PATH, delimiter=",", skiprows=1)[:, :8]
+    rng = np.random.default_rng(seed)
+    rows = data[rng.integers(0, len(data), count)]
+    rows[rng.random(rows.shape) < missingRate] = np.nan
+    return rows
+
+
+def timeCalls(fn, repeats: int) -> np.ndarray:
+    """
+    Seconds per call, after one warm-up call
+    """
+    fn()
+    samples = np.empty(repeats)
+    for i in range(repeats):
+        startedAt = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - startedAt
+    return samples
+
+
+def summarize(samples: np.ndarray) -> dict:
+    milliseconds = samples * 1000
+    return {
+        "n": int(len(samples)),
+        "mean_ms": float(milliseconds.mean()),
+        "p50_ms": float(np.percentile(milliseconds, 50)),
+        "p95_ms": float(np.percentile(milliseconds, 95)),
+        "p99_ms": float(np.percentile(milliseconds, 99)),
+    }
+
+
+def tracemallocPeak(fn) -> float:
+    """
+    Peak MB of Python-tracked allocations during one call
+    """
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / (1 << 20)
+    finally:
+        tracemalloc.stop()
+
+
+def repeatsFor(batchSize: int, repeats: int) -> int:
+    # Keep large batches from dominating the run time
+    return max(3, min(repeats, 20000 // batchSize))
+
+
+# ---------------- PIPELINE ----------------
+
+def stageFunctions(pipeline, batch: np.ndarray) -> dict:
+    """
+    One callable per serving stage, each fed the previous stage's output
+    """
+    imputed = pipeline.imputer.transform(batch)
+    scaled = pipeline.scale(imputed)
+
+    stages = {
+        "imputer": lambda: pipeline.imputer.transform(batch),
+        "scaler": lambda: pipeline.scale(imputed),
+    }
+    if pipeline.engine == "compiled":
+        stages["compiled_ensemble"] = lambda: pipeline.ensemble.combinePredictionsBatch(scaled)
+    else:
+        for name, model in pipeline.models.items():
+            stages[name] = lambda model=model: model.predict_proba(scaled)
+    return stages
+
+
+def benchPipeline(pipeline, rows: np.ndarray, batchSizes: list, repeats: int) -> dict:
+    result = {"single_row": summarize(timeCalls(lambda: pipeline.predictProba(rows[:1]), repeats)), "batches": {}}
+
+    for batchSize in batchSizes:
+        batch = rows[:batchSize]
+        count = repeatsFor(batchSize, repeats)
+        total = timeCalls(lambda: pipeline.predictProba(batch), count)
+
+        result["batches"][str(batchSize)] = dict(
+            summarize(total),
+            rows_per_sec=float(batchSize / np.median(total)),
+            stages_ms={name: float(np.median(timeCalls(fn, count)) * 1000)
+                       for name, fn in stageFunctions(pipeline, batch).items()},
+            tracemalloc_peak_mb=tracemallocPeak(lambda: pipeline.predictProba(batch)),
+        )
+    return result
+
+
+# ---------------- FLASK ----------------
+
+def benchFlask(rows: np.ndarray, batchSizes: list, repeats: int) -> dict:
+    import app as api
+    from database.database_manager import INSERT_DAILY_REPORT
+
+    client = api.app.test_client()
+    client.post("/register", json={"username": "bench", "password": "bench"})
+    userId = client.post("/login", json={"username": "bench", "password": "bench"}).get_json()["user_id"]
+
+    def body(row):
+        return {name: (None if np.isnan(value) else float(value)) for name, value in zip(api.FEATURE_FIELDS, row)}
+
+    bodies = [dict(body(row), user_id=userId) for row in rows[:max(repeats, 1)]]
+    position = iter(range(10 ** 9))
+
+    def predictOnce():
+        response = client.post("/predict", json=bodies[next(position) % len(bodies)])
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+    result = {"predict": summarize(timeCalls(predictOnce, repeats)), "predict_batch": {}}
+
+    for batchSize in [size for size in batchSizes if size <= api.MAX_BATCH_ROWS]:
+        payload = {"user_id": userId, "patients": [body(row) for row in rows[:batchSize]]}
+        samples = timeCalls(lambda: client.post("/predict/batch", json=payload), repeatsFor(batchSize, repeats))
+        result["predict_batch"][str(batchSize)] = dict(summarize(samples), rows_per_sec=float(batchSize / np.median(samples)))
+
+    # The two /predict stages outside the model
+    row = (userId, *rows[0].tolist(), 0, 24.25, "LOW")
+
+    def insertOnce():
+        with api.db_pool.transaction() as connection:
+            connection.execute(INSERT_DAILY_REPORT, row)
+
+    response = {"prediction": 0, "riskLevel": "LOW", "probability": 24.25, "score": 0.242, "model_version": "bench"}
+
+    def encodeOnce():
+        with api.app.app_context():
+            api.jsonify(response).get_data()
+
+    result["db_insert"] = summarize(timeCalls(insertOnce, repeats))
+    result["json_encode"] = summarize(timeCalls(encodeOnce, repeats))
+    return result
+
+
+# ---------------- REGRESSION CHECK ----------------
+
+def flatten(report: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in report.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, path + "."))
+        elif isinstance(value, (int, float)):
+            flat[path] = value
+    return flat
+
+
+def findRegressions(current: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Metrics that got worse than baseline by more than tolerance (fraction):
+    *_ms and per-stage times (stages_ms.<stage>) must not grow,
+    rows_per_sec must not shrink
+    """
+    now, before = flatten(current), flatten(baseline)
+    regressions = []
+    for path, old in before.items():
+        if path not in now or old <= 0 or path.endswith("mean_ms"):
+            continue
+        isTime = path.endswith("_ms") or path.split(".")[-2:-1] == ["stages_ms"]
+        if isTime and now[path] > old * (1 + tolerance):
+            regressions.append((path, old, now[path]))
+        elif path.endswith("rows_per_sec") and now[path] < old / (1 + tolerance):
+            regressions.append((path, old, now[path]))
+    return regressions
+
+
+# ---------------- MAIN ----------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Serving-path latency and throughput")
+    parser.add_argument("--engine", default="sklearn", choices=["sklearn", "compiled"])
+    parser.add_argument("--repeats", type=int, default=200, help="timed calls per single-row measurement")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=BATCH_SIZES)
+    parser.add_argument("--missing-rate", type=float, default=0.05, help="fraction of readings blanked out")
+    parser.add_argument("--skip-flask", action="store_true")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="earlier --output file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown vs. the baseline")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="bench_inference_")
+    # Must be set before app / database_manager are imported
+    os.environ["DATABASE_PATH"] = os.path.join(scratch, "bench.db")
+    os.environ["INFERENCE_ENGINE"] = args.engine
+
+    from models.inference_pipeline import MODEL_DIR, InferencePipeline
+    import sklearn
+
+    rows = sampleRows(max(args.batch_sizes + [args.repeats]), args.missing_rate)
+    pipeline = InferencePipeline(MODEL_DIR, args.engine)
+
+    report = {
+        "meta": {
+            "engine": args.engine,
+            "model_version": pipeline.version,
+            "missing_rate": args.missing_rate,
+            "repeats": args.repeats,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "sklearn": sklearn.__version__,
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "pipeline": benchPipeline(pipeline, rows, args.batch_sizes, args.repeats),
+    }
+    if not args.skip_flask:
+        report["flask"] = benchFlask(rows, args.batch_sizes, args.repeats)
+    report["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    single = report["pipeline"]["single_row"]
+    print(f"engine={args.engine} model={pipeline.version} missing_rate={args.missing_rate}")
+    print(f"pipeline single row: p50 {single['p50_ms']:.3f} ms  p95 {single['p95_ms']:.3f} ms  p99 {single['p99_ms']:.3f} ms")
+    print(f"{'batch':>7}{'p50 ms':>11}{'rows/s':>12}{'peak MB':>9}  stages (ms)")
+    for batchSize, batch in report["pipeline"]["batches"].items():
+        stages = "  ".join(f"{name} {ms:.3f}" for name, ms in batch["stages_ms"].items())
+        print(f"{batchSize:>7}{batch['p50_ms']:>11.3f}{batch['rows_per_sec']:>12.0f}{batch['tracemalloc_peak_mb']:>9.1f}  {stages}")
+
+    if "flask" in report:
+        flask = report["flask"]
+        print(f"/predict: p50 {flask['predict']['p50_ms']:.3f} ms  p95 {flask['predict']['p95_ms']:.3f} ms  "
+              f"p99 {flask['predict']['p99_ms']:.3f} ms")
+        print(f"  db insert p50 {flask['db_insert']['p50_ms']:.3f} ms, json encode p50 {flask['json_encode']['p50_ms']:.3f} ms")
+        for batchSize, batch in flask["predict_batch"].items():
+            print(f"/predict/batch {batchSize:>6}: p50 {batch['p50_ms']:.1f} ms, {batch['rows_per_sec']:.0f} rows/s")
+    print(f"peak RSS {report['peak_rss_mb']:.0f} MB")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = findRegressions(report, json.load(file), args.tolerance)
+        for path, old, new in regressions:
+            print(f"REGRESSION {path}: {old:.3f} -> {new:.3f}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} of the baseline")
+
+
+if __name__ == "__main__":
+    main()
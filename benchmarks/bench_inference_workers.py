@@ -0,0 +1,126 @@
+# backend/benchmarks/bench_inference_workers.py
+#
+# In-process InferencePipeline.predictProba against InferenceWorkerPool.
+# C caller threads each score batches of N rows until R rows are done;
+# reports rows/sec and p50/p99 call latency for both, plus the largest
+# score difference between them.
+#
+#   python benchmarks/bench_inference_workers.py
+#   python benchmarks/bench_inference_workers.py --workers 4 --threads 1 8 --batch 1 256 4096 --output workers.json
+#
+# Worker processes only pay off with spare cores: on a 1-2 CPU box the
+# pool adds copy and hand-off cost for nothing.
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from models.inference_pipeline import FEATURE_ORDER, InferencePipeline  # noqa: E402
+from models.inference_workers import InferenceWorkerPool  # noqa: E402
+
+
+# ---------------- WORKLOAD ----------------
+
+def sampleRows(count: int, seed: int = 0) -> np.ndarray:
+    # Plausible raw features with ~10% missing values for the imputer
+    rng = np.random.default_rng(seed)
+    low = np.array([0, 60, 40, 10, 15, 18, 0.08, 21], dtype=np.float64)
+    high = np.array([12, 200, 110, 50, 400, 50, 1.8, 80], dtype=np.float64)
+    rows = rng.uniform(low, high, size=(count, len(FEATURE_ORDER)))
+    rows[rng.random(rows.shape) < 0.1] = np.nan
+    return rows
+
+
+def runLevel(predictFn, rows: np.ndarray, threads: int, batchSize: int, totalRows: int) -> dict:
+    remaining = [totalRows]
+    lock = threading.Lock()
+    latencies = []
+
+    def caller(seed):
+        rng = np.random.default_rng(seed)
+        local = []
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    break
+                remaining[0] -= batchSize
+            start = int(rng.integers(0, len(rows) - batchSize + 1))
+            startedAt = time.perf_counter()
+            predictFn(rows[start:start + batchSize])
+            local.append(time.perf_counter() - startedAt)
+        with lock:
+            latencies.extend(local)
+
+    startedAt = time.perf_counter()
+    callers = [threading.Thread(target=caller, args=(seed,)) for seed in range(threads)]
+    for thread in callers:
+        thread.start()
+    for thread in callers:
+        thread.join()
+    elapsed = time.perf_counter() - startedAt
+
+    latencies = np.array(latencies) * 1000
+    return {
+        "calls": len(latencies),
+        "rows_per_sec": len(latencies) * batchSize / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+    }
+
+
+# ---------------- MAIN ----------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark in-process scoring against the inference worker pool")
+    parser.add_argument("--workers", type=int, default=max(2, os.cpu_count() or 1))
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 64, 2048])
+    parser.add_argument("--rows", type=int, default=8192, help="rows scored per level")
+    parser.add_argument("--slot-rows", type=int, default=1024)
+    parser.add_argument("--engine", default="sklearn", choices=["sklearn", "compiled"])
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    rows = sampleRows(max(args.batch) * 4)
+    pipeline = InferencePipeline(engine=args.engine)
+    pool = InferenceWorkerPool(args.workers, slotRows=args.slot_rows, engine=args.engine)
+
+    startedAt = time.perf_counter()
+    pool.start()
+    print(f"Started {args.workers} workers in {(time.perf_counter() - startedAt) * 1000:.0f} ms")
+
+    report = {"workers": args.workers, "slot_rows": args.slot_rows, "engine": args.engine,
+              "cpu_count": os.cpu_count(), "levels": []}
+    try:
+        check = rows[:min(len(rows), 4096)]
+        report["max_abs_diff"] = float(np.max(np.abs(pipeline.predictProba(check) - pool.predictProba(check, pipeline.version))))
+        print(f"Max score difference in-process vs workers: {report['max_abs_diff']:.2e}")
+
+        for threads in args.threads:
+            for batchSize in args.batch:
+                totalRows = max(args.rows, batchSize * threads)
+                local = runLevel(pipeline.predictProba, rows, threads, batchSize, totalRows)
+                workers = runLevel(pool.scorer(pipeline), rows, threads, batchSize, totalRows)
+                report["levels"].append({"threads": threads, "batch": batchSize, "in_process": local, "workers": workers})
+                print(f"  threads={threads:<3} batch={batchSize:<5} "
+                      f"in-process {local['rows_per_sec']:>9.0f} rows/s p99 {local['p99_ms']:>8.1f} ms   "
+                      f"workers {workers['rows_per_sec']:>9.0f} rows/s p99 {workers['p99_ms']:>8.1f} ms")
+        report["pool"] = pool.getStats()
+    finally:
+        pool.close()
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# backend/benchmarks/bench_inserts.py
+#
+# Inserts/sec into daily_reports with the old /predict write path
+# (CREATE TABLE IF NOT EXISTS + three failing ALTER TABLEs before every
+# INSERT) versus the migrated path (INSERT only). Runs on a throwaway
+# database in a temp directory.
+#
+#   python benchmarks/bench_inserts.py --rows 2000
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from database.database_manager import ConnectionPool
+from database.migrations import migrate
+
+INSERT_DAILY_REPORT = """
+    INSERT INTO daily_reports
+    (user_id, pregnancies, glucose, bmi, blood_pressure, skin_thickness, insulin, dpf, age, prediction, probability, risk_level)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+LEGACY_DDL = """
+    CREATE TABLE IF NOT EXISTS daily_reports (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER,
+        date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        pregnancies REAL,
+        glucose REAL,
+        bmi REAL,
+        blood_pressure REAL,
+        skin_thickness REAL,
+        insulin REAL,
+        dpf REAL,
+        age REAL,
+        prediction INTEGER,
+        probability REAL,
+        risk_level TEXT
+    )
+"""
+
+ROW = (1, 6, 148, 33.6, 72, 35, 0, 0.627, 50, 1, 95.28, "HIGH")
+
+
+def legacyInsert(connection):
+    cursor = connection.cursor()
+    cursor.execute(LEGACY_DDL)
+    for col in ["pregnancies", "dpf", "age"]:
+        try:
+            cursor.execute(f"ALTER TABLE daily_reports ADD COLUMN {col} REAL")
+        except sqlite3.OperationalError:
+            pass
+    cursor.execute(INSERT_DAILY_REPORT, ROW)
+    connection.commit()
+
+
+def migratedInsert(connection):
+    connection.execute(INSERT_DAILY_REPORT, ROW)
+    connection.commit()
+
+
+def run(insertFn, rows):
+    with tempfile.TemporaryDirectory() as directory:
+        pool = ConnectionPool(os.path.join(directory, "bench.db"))
+        connection = pool.getConnection()
+        migrate(connection)
+
+        start = time.perf_counter()
+        for _ in range(rows):
+            insertFn(connection)
+        elapsed = time.perf_counter() - start
+
+        pool.closeAll()
+    return rows / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="daily_reports insert throughput")
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    before = run(legacyInsert, args.rows)
+    after = run(migratedInsert, args.rows)
+
+    print(f"per-request DDL + INSERT : {before:>10.0f} inserts/sec")
+    print(f"INSERT only              : {after:>10.0f} inserts/sec")
+    print(f"speedup                  : {after / before:>10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
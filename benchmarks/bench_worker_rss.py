@@ -0,0 +1,93 @@
+# backend/benchmarks/bench_worker_rss.py
+#
+# Reports per-worker memory for N forked workers under three loading
+# strategies:
+#   private  - every worker joblib.loads the artifacts itself
+#   mmap     - every worker loads them with mmap_mode="r"
+#   preload  - the parent loads once before forking (gunicorn --preload)
+#
+# RSS counts shared pages in full for every process; PSS splits them
+# between the processes sharing them, so PSS is the number that drops.
+#
+#   python benchmarks/bench_worker_rss.py --workers 4 --engine compiled
+
+import argparse
+import multiprocessing
+import os
+import sys
+import warnings
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from models.inference_pipeline import MODEL_DIR, InferencePipeline
+
+warnings.filterwarnings("ignore")
+
+SAMPLE_ROW = [6, 148, 72, 35, 0, 33.6, 0.627, 50]
+
+
+def readMemory() -> dict:
+    memory = {}
+    with open("/proc/self/smaps_rollup") as file:
+        for line in file:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                memory[key.lower()] = int(rest.split()[0]) / 1024
+    return memory
+
+
+def worker(strategy, engine, preloaded, barrier, results):
+    if strategy == "preload":
+        pipeline = preloaded
+    else:
+        pipeline = InferencePipeline(MODEL_DIR, engine, "r" if strategy == "mmap" else None)
+
+    # Touch every model page the way a real request would
+    pipeline.predictProba(np.array([SAMPLE_ROW] * 64, dtype=float))
+
+    # Measure while all workers are alive so shared pages are split between them
+    barrier.wait()
+    results.put(readMemory())
+    barrier.wait()
+
+
+def runStrategy(strategy, engine, workers):
+    context = multiprocessing.get_context("fork")
+    preloaded = InferencePipeline(MODEL_DIR, engine) if strategy == "preload" else None
+
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(strategy, engine, preloaded, barrier, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    samples = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    return {
+        "rss_mb": sum(sample["rss"] for sample in samples) / workers,
+        "pss_mb": sum(sample["pss"] for sample in samples) / workers,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-worker memory by model loading strategy")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--engine", default="compiled", choices=["sklearn", "compiled"])
+    args = parser.parse_args()
+
+    print(f"engine={args.engine} workers={args.workers}")
+    print(f"{'strategy':<10}{'RSS/worker MB':>16}{'PSS/worker MB':>16}")
+    for strategy in ["private", "mmap", "preload"]:
+        result = runStrategy(strategy, args.engine, args.workers)
+        print(f"{strategy:<10}{result['rss_mb']:>16.1f}{result['pss_mb']:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
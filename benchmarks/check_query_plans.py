@@ -0,0 +1,71 @@
+# backend/benchmarks/check_query_plans.py
+#
+# EXPLAIN QUERY PLAN regression check for the daily_reports read
+# queries. Builds a throwaway migrated database, then fails (exit 1) if
+# any query scans a table, sorts in a temp b-tree, or stops using the
+# index it is expected to use.
+#
+#   python benchmarks/check_query_plans.py
+
+import os
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from database import queries
+from database.database_manager import INSERT_DAILY_REPORT, ConnectionPool
+from database.migrations import migrate
+
+START, END = queries.monthRange(2024, 5)
+
+# (name, sql, params, index that must appear in the plan)
+EXPECTED_PLANS = [
+    ("history", queries.HISTORY, (1,), "idx_daily_reports_user_date"),
+    ("history page", queries.HISTORY_PAGE, (1, "2024-05-10 00:00:00", 50, 20), "idx_daily_reports_user_date"),
+    ("profile stats", queries.PROFILE_STATS, (1,), "idx_daily_reports_user_date"),
+    ("monthly stats", queries.MONTHLY_STATS, (1, START, END), "idx_daily_reports_user_date"),
+    ("monthly by month", queries.MONTHLY_STATS_BY_MONTH, (1, START, END), "idx_daily_reports_user_date"),
+    ("monthly rollup", queries.MONTHLY_ROLLUP, (1, 2024, 5), "PRIMARY KEY"),
+    ("monthly rollup range", queries.MONTHLY_ROLLUPS_RANGE, (1, 2023, 6, 2024, 5), "PRIMARY KEY"),
+]
+
+
+def checkPlans(connection) -> list:
+    failures = []
+    for name, sql, params, index in EXPECTED_PLANS:
+        plan = queries.explainQueryPlan(connection, sql, params)
+        text = " | ".join(plan)
+        if "SCAN " in text or "TEMP B-TREE FOR ORDER BY" in text or index not in text:
+            failures.append(f"{name}: expected {index}, got: {text}")
+        else:
+            print(f"ok   {name:<20} {text}")
+    return failures
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        pool = ConnectionPool(os.path.join(directory, "plans.db"))
+        connection = pool.getConnection()
+        migrate(connection)
+
+        rows = [
+            (userId, 1, 120, 30, 70, 20, 80, 0.5, 40, userId % 2, 50.0, "MEDIUM")
+            for userId in range(1, 201)
+            for _ in range(20)
+        ]
+        with pool.transaction() as transaction:
+            transaction.executemany(INSERT_DAILY_REPORT, rows)
+        connection.execute("ANALYZE")
+
+        failures = checkPlans(connection)
+        pool.closeAll()
+
+    for failure in failures:
+        print("FAIL", failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,164 @@
 import sqlite3
 import os
+import threading
+import weakref
+from contextlib import contextmanager
+
+from database.migrations import migrate
+
+# backend folder ka path
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.environ.get("DATABASE_PATH", os.path.join(BASE_DIR, "diabetes.db"))
+
+INSERT_DAILY_REPORT = """
+    INSERT INTO daily_reports
+    (user_id, pregnancies, glucose, bmi, blood_pressure, skin_thickness, insulin, dpf, age, prediction, probability, risk_level)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Applied to every pooled connection. WAL lets readers run alongside a
+# writer; NORMAL sync is durable in WAL mode except on power loss.
+CONNECTION_PRAGMAS = [
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA temp_store = MEMORY",
+]
+
+
+class _ThreadConnection:
+    # Lives in the owning thread's local storage; its finalizer closes the
+    # connection once the thread exits and the holder is collected
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+        self.pid = os.getpid()
+
+
+class ConnectionPool:
+    """
+    One long-lived SQLite connection per thread (per process after fork).
+
+    Connections keep sqlite3's statement cache warm, so repeated queries
+    reuse their prepared statements instead of being re-parsed. A thread's
+    connection is closed when the thread exits, so thread-per-request
+    servers do not pile up connections and file descriptors.
+    """
+
+    def __init__(self, path: str = DB_PATH, timeout: float = 10.0, cachedStatements: int = 256):
+        self.path = path
+        self.timeout = timeout
+        self.cachedStatements = cachedStatements
+
+        self._local = threading.local()
+        # Open connections by holder id, for closeAll()
+        self._connections = {}
+        self._lock = threading.Lock()
+
+        # journal_mode is stored in the database file, so setting it once is enough
+        self.getConnection().execute("PRAGMA journal_mode = WAL")
+
+    # +getConnection() : Connection
+    def getConnection(self) -> sqlite3.Connection:
+        holder = getattr(self._local, "holder", None)
+        if holder is None or holder.pid != os.getpid():
+            holder = _ThreadConnection(self._connect())
+            self._local.holder = holder
+            with self._lock:
+                self._connections[id(holder)] = holder.connection
+            weakref.finalize(holder, self._release, id(holder))
+        return holder.connection
+
+    # +transaction() : Connection
+    @contextmanager
+    def transaction(self):
+        """
+        Yields this thread's connection; commits on success, rolls back on error
+        """
+        connection = self.getConnection()
+        with connection:
+            yield connection
+
+    def closeAll(self):
+        """
+        Closes every pooled connection (shutdown only)
+        """
+        with self._lock:
+            connections, self._connections = self._connections, {}
+        for connection in connections.values():
+            connection.close()
+        self._local = threading.local()
+
+    def _afterFork(self):
+        # Connections inherited from the parent belong to it: keep them
+        # referenced (never used, never closed) so the child cannot close
+        # the parent's handles, and start this process with an empty pool
+        _inheritedConnections.extend(self._connections.values())
+        self._connections = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _release(self, key: int):
+        with self._lock:
+            connection = self._connections.pop(key, None)
+        if connection is not None:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            cached_statements=self.cachedStatements,
+            check_same_thread=False
+        )
+        connection.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            connection.execute(pragma)
+        return connection
+
+
+_pools = {}
+_poolsLock = threading.Lock()
+_inheritedConnections = []
+
+
+def _resetPoolsAfterFork():
+    global _poolsLock
+    _poolsLock = threading.Lock()
+    for pool in _pools.values():
+        pool._afterFork()
+
+
+# gunicorn preload_app imports app.py (and opens connections) in the master
+os.register_at_fork(after_in_child=_resetPoolsAfterFork)
+
+
+def getPool(path: str = DB_PATH) -> ConnectionPool:
+    """
+    Returns the shared pool for a database file, creating it on first use
+    """
+    path = os.path.abspath(path)
+    pool = _pools.get(path)
+    if pool is None:
+        with _poolsLock:
+            pool = _pools.get(path)
+            if pool is None:
+                pool = ConnectionPool(path)
+                _pools[path] = pool
+    return pool
+
 
 class Database:
-    def __init__(self):
-        # backend folder ka path
-        BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        DB_PATH = os.path.join(BASE_DIR, "diabetes.db")
+    def __init__(self, pool: ConnectionPool = None):
+        self.pool = pool or getPool()
 
-        self.connection = sqlite3.connect(DB_PATH, check_same_thread=False)
+        self.connection = self.pool.getConnection()
         self.cursor = self.connection.cursor()
 
         self.createTable()
 
     def createTable(self):
-        self.cursor.execute("""
-            CREATE TABLE IF NOT EXISTS patients (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT,
-                age INTEGER,
-                gender TEXT,
-                pregnancies INTEGER,
-                glucose REAL,
-                bloodPressure REAL,
-                skinThickness REAL,
-                insulin REAL,
-                BMI REAL,
-                diabetesPedigreeFunction REAL,
-                riskLevel TEXT
-            )
-        """)
-        self.connection.commit()
+        # patients is created by the versioned migrations
+        migrate(self.connection)
 
     def savePatientData(self, patient, riskLevel):
         self.cursor.execute("""
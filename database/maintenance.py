@@ -0,0 +1,80 @@
+# backend/database/maintenance.py
+#
+# Consistency check / rebuild of the trigger-maintained summary tables
+# (user_stats, monthly_rollups).
+#
+#   python -m database.maintenance check     # exit 1 if anything drifted
+#   python -m database.maintenance rebuild
+
+import argparse
+import sys
+
+from database import queries
+from database.database_manager import DB_PATH, ConnectionPool
+from database.migrations import migrate
+
+
+def checkUserStats(connection) -> list:
+    """
+    Returns (user_id, problem) pairs where user_stats disagrees with daily_reports
+    """
+    return [tuple(row) for row in connection.execute(queries.USER_STATS_MISMATCHES)]
+
+
+def rebuildUserStats(connection) -> int:
+    """
+    Recomputes user_stats from daily_reports in one transaction
+    """
+    with connection:
+        connection.execute("DELETE FROM user_stats")
+        cursor = connection.execute(queries.USER_STATS_REBUILD)
+    return cursor.rowcount
+
+
+def checkMonthlyRollups(connection) -> list:
+    """
+    Returns (user_id, year, month, problem) rows where monthly_rollups disagrees with daily_reports
+    """
+    return [tuple(row) for row in connection.execute(queries.MONTHLY_ROLLUPS_MISMATCHES)]
+
+
+def rebuildMonthlyRollups(connection) -> int:
+    """
+    Recomputes monthly_rollups from daily_reports in one transaction
+    """
+    with connection:
+        connection.execute("DELETE FROM monthly_rollups")
+        cursor = connection.execute(queries.MONTHLY_ROLLUPS_REBUILD)
+    return cursor.rowcount
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summary table maintenance")
+    parser.add_argument("command", choices=["check", "rebuild"])
+    parser.add_argument("--database", default=DB_PATH)
+    args = parser.parse_args()
+
+    pool = ConnectionPool(args.database)
+    connection = pool.getConnection()
+    migrate(connection)
+
+    if args.command == "rebuild":
+        print(f"user_stats rebuilt: {rebuildUserStats(connection)} users")
+        print(f"monthly_rollups rebuilt: {rebuildMonthlyRollups(connection)} months")
+        return
+
+    userMismatches = checkUserStats(connection)
+    for userId, problem in userMismatches:
+        print(f"user_stats {problem}: user {userId}")
+    print(f"user_stats: {len(userMismatches)} inconsistent users")
+
+    monthMismatches = checkMonthlyRollups(connection)
+    for userId, year, month, problem in monthMismatches:
+        print(f"monthly_rollups {problem}: user {userId} {year}-{month:02d}")
+    print(f"monthly_rollups: {len(monthMismatches)} inconsistent months")
+
+    sys.exit(1 if userMismatches or monthMismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+# backend/database/migrations.py
+#
+# Versioned schema migrations. PRAGMA user_version stores how many
+# entries of MIGRATIONS have been applied; migrate() runs the rest once
+# at startup so request handlers never issue DDL.
+
+import sqlite3
+
+
+def _addMissingColumns(cursor, table: str, columns: dict):
+    existing = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+    for name, columnType in columns.items():
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {columnType}")
+
+
+def _createUsers(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS users(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE,
+            password TEXT,
+            email TEXT,
+            full_name TEXT,
+            phone TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # Databases created before these columns existed
+    _addMissingColumns(cursor, "users", {
+        "email": "TEXT",
+        "full_name": "TEXT",
+        "phone": "TEXT",
+        "created_at": "TEXT"
+    })
+
+
+def _createDailyReports(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS daily_reports (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            pregnancies REAL,
+            glucose REAL,
+            bmi REAL,
+            blood_pressure REAL,
+            skin_thickness REAL,
+            insulin REAL,
+            dpf REAL,
+            age REAL,
+            prediction INTEGER,
+            probability REAL,
+            risk_level TEXT
+        )
+    """)
+
+    _addMissingColumns(cursor, "daily_reports", {
+        "pregnancies": "REAL",
+        "dpf": "REAL",
+        "age": "REAL"
+    })
+
+
+def _createPatients(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS patients (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            age INTEGER,
+            gender TEXT,
+            pregnancies INTEGER,
+            glucose REAL,
+            bloodPressure REAL,
+            skinThickness REAL,
+            insulin REAL,
+            BMI REAL,
+            diabetesPedigreeFunction REAL,
+            riskLevel TEXT
+        )
+    """)
+
+
+def _indexDailyReports(cursor):
+    # Per-user lookups sorted / ranged by date (history, profile, monthly)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_daily_reports_user_date
+        ON daily_reports(user_id, date)
+    """)
+    # Small partial index for the per-user diabetic counts
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_daily_reports_user_diabetic
+        ON daily_reports(user_id, date)
+        WHERE prediction = 1
+    """)
+
+
+def _createUserStats(cursor):
+    # Per-user prediction counters, kept current by a trigger so /profile
+    # reads one row regardless of history length
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS user_stats (
+            user_id INTEGER PRIMARY KEY,
+            total_predictions INTEGER NOT NULL DEFAULT 0,
+            diabetic_count INTEGER NOT NULL DEFAULT 0,
+            normal_count INTEGER NOT NULL DEFAULT 0,
+            last_prediction_date TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_daily_reports_user_stats
+        AFTER INSERT ON daily_reports
+        WHEN NEW.user_id IS NOT NULL
+        BEGIN
+            INSERT INTO user_stats (user_id, total_predictions, diabetic_count, normal_count, last_prediction_date)
+            VALUES (NEW.user_id, 1, COALESCE(NEW.prediction = 1, 0), COALESCE(NEW.prediction = 0, 0), NEW.date)
+            ON CONFLICT(user_id) DO UPDATE SET
+                total_predictions = total_predictions + 1,
+                diabetic_count = diabetic_count + excluded.diabetic_count,
+                normal_count = normal_count + excluded.normal_count,
+                last_prediction_date = CASE
+                    WHEN last_prediction_date IS NULL OR excluded.last_prediction_date > last_prediction_date
+                    THEN excluded.last_prediction_date
+                    ELSE last_prediction_date
+                END;
+        END
+    """)
+    # Backfill from existing history
+    cursor.execute("""
+        INSERT OR REPLACE INTO user_stats (user_id, total_predictions, diabetic_count, normal_count, last_prediction_date)
+        SELECT user_id, COUNT(*), COALESCE(SUM(prediction = 1), 0), COALESCE(SUM(prediction = 0), 0), MAX(date)
+        FROM daily_reports
+        WHERE user_id IS NOT NULL
+        GROUP BY user_id
+    """)
+
+
+def _createMonthlyRollups(cursor):
+    # Per-user, per-calendar-month sums and counts, kept current by a
+    # trigger. Sums and non-NULL counts are stored separately so averages
+    # skip missing readings exactly like AVG() does.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS monthly_rollups (
+            user_id INTEGER NOT NULL,
+            year INTEGER NOT NULL,
+            month INTEGER NOT NULL,
+            total_records INTEGER NOT NULL DEFAULT 0,
+            diabetic_days INTEGER NOT NULL DEFAULT 0,
+            glucose_sum REAL NOT NULL DEFAULT 0,
+            glucose_count INTEGER NOT NULL DEFAULT 0,
+            bmi_sum REAL NOT NULL DEFAULT 0,
+            bmi_count INTEGER NOT NULL DEFAULT 0,
+            bp_sum REAL NOT NULL DEFAULT 0,
+            bp_count INTEGER NOT NULL DEFAULT 0,
+            probability_sum REAL NOT NULL DEFAULT 0,
+            probability_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, year, month)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_daily_reports_monthly_rollups
+        AFTER INSERT ON daily_reports
+        WHEN NEW.user_id IS NOT NULL
+        BEGIN
+            INSERT INTO monthly_rollups (
+                user_id, year, month, total_records, diabetic_days,
+                glucose_sum, glucose_count, bmi_sum, bmi_count,
+                bp_sum, bp_count, probability_sum, probability_count
+            )
+            VALUES (
+                NEW.user_id,
+                CAST(strftime('%Y', NEW.date) AS INTEGER),
+                CAST(strftime('%m', NEW.date) AS INTEGER),
+                1,
+                COALESCE(NEW.prediction = 1, 0),
+                COALESCE(NEW.glucose, 0), NEW.glucose IS NOT NULL,
+                COALESCE(NEW.bmi, 0), NEW.bmi IS NOT NULL,
+                COALESCE(NEW.blood_pressure, 0), NEW.blood_pressure IS NOT NULL,
+                COALESCE(NEW.probability, 0), NEW.probability IS NOT NULL
+            )
+            ON CONFLICT(user_id, year, month) DO UPDATE SET
+                total_records = total_records + 1,
+                diabetic_days = diabetic_days + excluded.diabetic_days,
+                glucose_sum = glucose_sum + excluded.glucose_sum,
+                glucose_count = glucose_count + excluded.glucose_count,
+                bmi_sum = bmi_sum + excluded.bmi_sum,
+                bmi_count = bmi_count + excluded.bmi_count,
+                bp_sum = bp_sum + excluded.bp_sum,
+                bp_count = bp_count + excluded.bp_count,
+                probability_sum = probability_sum + excluded.probability_sum,
+                probability_count = probability_count + excluded.probability_count;
+        END
+    """)
+    # Backfill from existing history
+    cursor.execute("""
+        INSERT OR REPLACE INTO monthly_rollups
+        SELECT user_id,
+               CAST(strftime('%Y', date) AS INTEGER) AS year,
+               CAST(strftime('%m', date) AS INTEGER) AS month,
+               COUNT(*), COALESCE(SUM(prediction = 1), 0),
+               COALESCE(SUM(glucose), 0), COUNT(glucose),
+               COALESCE(SUM(bmi), 0), COUNT(bmi),
+               COALESCE(SUM(blood_pressure), 0), COUNT(blood_pressure),
+               COALESCE(SUM(probability), 0), COUNT(probability)
+        FROM daily_reports
+        WHERE user_id IS NOT NULL AND date IS NOT NULL
+        GROUP BY user_id, year, month
+    """)
+
+
+def _addConfirmedOutcomes(cursor):
+    # Ground truth for training: the diagnosis confirmed after a prediction
+    # (0 / 1), NULL until recorded. Partial indexes keep the training
+    # export a seek over labeled rows only, however sparse they are.
+    for table in ["daily_reports", "patients"]:
+        _addMissingColumns(cursor, table, {
+            "confirmed_outcome": "INTEGER CHECK (confirmed_outcome IN (0, 1))"
+        })
+        cursor.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_{table}_confirmed
+            ON {table}(id)
+            WHERE confirmed_outcome IS NOT NULL
+        """)
+
+
+# Append only: never edit or reorder an entry that has shipped
+MIGRATIONS = [
+    _createUsers,
+    _createDailyReports,
+    _createPatients,
+    _indexDailyReports,
+    _createUserStats,
+    _createMonthlyRollups,
+    _addConfirmedOutcomes,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def getSchemaVersion(connection: sqlite3.Connection) -> int:
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(connection: sqlite3.Connection) -> int:
+    """
+    Applies pending migrations and returns the resulting schema version
+    """
+    if getSchemaVersion(connection) >= SCHEMA_VERSION:
+        return SCHEMA_VERSION
+
+    # IMMEDIATE takes the write lock up front, so concurrently starting
+    # workers wait here instead of applying the same migration twice
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        current = getSchemaVersion(connection)
+        cursor = connection.cursor()
+        for version in range(current, SCHEMA_VERSION):
+            MIGRATIONS[version](cursor)
+            cursor.execute(f"PRAGMA user_version = {version + 1}")
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+
+    return max(current, SCHEMA_VERSION)
@@ -0,0 +1,272 @@
+# backend/database/queries.py
+#
+# Queries shared by the API handlers (app.py, asgi_app.py) and the
+# EXPLAIN QUERY PLAN check (benchmarks/check_query_plans.py). Every
+# query filters on user_id and, where it touches dates, on a plain
+# date range so idx_daily_reports_user_date can be used.
+
+HISTORY_FIELDS = [
+    "id",
+    "date",
+    "pregnancies",
+    "glucose",
+    "bmi",
+    "blood_pressure",
+    "skin_thickness",
+    "insulin",
+    "dpf",
+    "age",
+    "prediction",
+    "probability",
+    "risk_level"
+]
+
+
+def historyQuery(fields: list, paged: bool = False, limited: bool = False) -> str:
+    """
+    Newest-first history for one user. fields must come from HISTORY_FIELDS;
+    id and date are always selected because they form the keyset cursor.
+    paged adds the (date, id) < (?, ?) cursor condition, limited a LIMIT ?.
+    """
+    columns = ["id", "date"] + [field for field in fields if field not in ("id", "date")]
+    sql = f"SELECT {', '.join(columns)} FROM daily_reports WHERE user_id = ?"
+    if paged:
+        # Row-value comparison lets SQLite seek the (user_id, date) index
+        sql += " AND (date, id) < (?, ?)"
+    sql += " ORDER BY date DESC, id DESC"
+    if limited:
+        sql += " LIMIT ?"
+    return sql
+
+
+HISTORY = historyQuery(HISTORY_FIELDS)
+HISTORY_PAGE = historyQuery(HISTORY_FIELDS, paged=True, limited=True)
+
+# users statements of the account routes (Flask app.py and asgi_app.py)
+INSERT_USER = "INSERT INTO users (username, password, email) VALUES (?,?,?)"
+USER_BY_CREDENTIALS = "SELECT id, username, email FROM users WHERE username=? AND password=?"
+USER_PROFILE = "SELECT id, username, email, full_name, phone, created_at FROM users WHERE id=?"
+USER_EXISTS = "SELECT id FROM users WHERE id=?"
+UPDATE_USER_PROFILE = "UPDATE users SET full_name=?, email=?, phone=? WHERE id=?"
+
+# All /profile counters in one pass over the user's rows
+PROFILE_STATS = """
+    SELECT COUNT(*) AS total_predictions,
+           COALESCE(SUM(prediction = 1), 0) AS diabetic_count,
+           COALESCE(SUM(prediction = 0), 0) AS normal_count,
+           MAX(date) AS last_prediction_date
+    FROM daily_reports
+    WHERE user_id = ?
+"""
+
+# Same counters from the trigger-maintained summary table (O(1))
+PROFILE_STATS_SUMMARY = """
+    SELECT total_predictions, diabetic_count, normal_count, last_prediction_date
+    FROM user_stats
+    WHERE user_id = ?
+"""
+
+# Rebuild / consistency check of user_stats against daily_reports
+USER_STATS_REBUILD = """
+    INSERT INTO user_stats (user_id, total_predictions, diabetic_count, normal_count, last_prediction_date)
+    SELECT user_id, COUNT(*), COALESCE(SUM(prediction = 1), 0), COALESCE(SUM(prediction = 0), 0), MAX(date)
+    FROM daily_reports
+    WHERE user_id IS NOT NULL
+    GROUP BY user_id
+"""
+
+USER_STATS_MISMATCHES = """
+    WITH actual AS (
+        SELECT user_id, COUNT(*) AS total_predictions,
+               COALESCE(SUM(prediction = 1), 0) AS diabetic_count,
+               COALESCE(SUM(prediction = 0), 0) AS normal_count,
+               MAX(date) AS last_prediction_date
+        FROM daily_reports
+        WHERE user_id IS NOT NULL
+        GROUP BY user_id
+    )
+    SELECT actual.user_id, 'stale' AS problem FROM actual
+    LEFT JOIN user_stats AS stored ON stored.user_id = actual.user_id
+    WHERE stored.user_id IS NULL
+       OR stored.total_predictions != actual.total_predictions
+       OR stored.diabetic_count != actual.diabetic_count
+       OR stored.normal_count != actual.normal_count
+       OR stored.last_prediction_date IS NOT actual.last_prediction_date
+    UNION ALL
+    SELECT stored.user_id, 'orphan' AS problem FROM user_stats AS stored
+    WHERE stored.user_id NOT IN (SELECT user_id FROM actual)
+"""
+
+# date is stored as 'YYYY-MM-DD HH:MM:SS' text, so a half-open string
+# range selects one calendar month without strftime() on every row
+MONTHLY_COLUMNS = """
+    COUNT(*) AS total_records,
+    COALESCE(SUM(prediction = 1), 0) AS diabetic_days,
+    COALESCE(SUM(glucose), 0) AS glucose_sum, COUNT(glucose) AS glucose_count,
+    COALESCE(SUM(bmi), 0) AS bmi_sum, COUNT(bmi) AS bmi_count,
+    COALESCE(SUM(blood_pressure), 0) AS bp_sum, COUNT(blood_pressure) AS bp_count,
+    COALESCE(SUM(probability), 0) AS probability_sum, COUNT(probability) AS probability_count
+"""
+
+# One month aggregated in SQL over the (user_id, date) index range
+MONTHLY_STATS = f"""
+    SELECT {MONTHLY_COLUMNS}
+    FROM daily_reports
+    WHERE user_id = ?
+    AND date >= ?
+    AND date < ?
+"""
+
+# Several months at once, one row per month that has data
+MONTHLY_STATS_BY_MONTH = f"""
+    SELECT CAST(strftime('%Y', date) AS INTEGER) AS year,
+           CAST(strftime('%m', date) AS INTEGER) AS month,
+           {MONTHLY_COLUMNS}
+    FROM daily_reports
+    WHERE user_id = ?
+    AND date >= ?
+    AND date < ?
+    GROUP BY year, month
+"""
+
+ROLLUP_COLUMNS = """
+    total_records, diabetic_days,
+    glucose_sum, glucose_count, bmi_sum, bmi_count,
+    bp_sum, bp_count, probability_sum, probability_count
+"""
+
+# Same numbers from the trigger-maintained monthly_rollups table
+MONTHLY_ROLLUP = f"""
+    SELECT {ROLLUP_COLUMNS}
+    FROM monthly_rollups
+    WHERE user_id = ? AND year = ? AND month = ?
+"""
+
+MONTHLY_ROLLUPS_RANGE = f"""
+    SELECT year, month, {ROLLUP_COLUMNS}
+    FROM monthly_rollups
+    WHERE user_id = ?
+    AND (year, month) >= (?, ?)
+    AND (year, month) <= (?, ?)
+"""
+
+MONTHLY_ROLLUPS_REBUILD = """
+    INSERT INTO monthly_rollups
+    SELECT user_id,
+           CAST(strftime('%Y', date) AS INTEGER) AS year,
+           CAST(strftime('%m', date) AS INTEGER) AS month,
+           COUNT(*), COALESCE(SUM(prediction = 1), 0),
+           COALESCE(SUM(glucose), 0), COUNT(glucose),
+           COALESCE(SUM(bmi), 0), COUNT(bmi),
+           COALESCE(SUM(blood_pressure), 0), COUNT(blood_pressure),
+           COALESCE(SUM(probability), 0), COUNT(probability)
+    FROM daily_reports
+    WHERE user_id IS NOT NULL AND date IS NOT NULL
+    GROUP BY user_id, year, month
+"""
+
+# Float sums are compared with a tolerance, counts exactly
+MONTHLY_ROLLUPS_MISMATCHES = f"""
+    WITH actual AS (
+        SELECT user_id,
+               CAST(strftime('%Y', date) AS INTEGER) AS year,
+               CAST(strftime('%m', date) AS INTEGER) AS month,
+               {MONTHLY_COLUMNS}
+        FROM daily_reports
+        WHERE user_id IS NOT NULL AND date IS NOT NULL
+        GROUP BY user_id, year, month
+    )
+    SELECT actual.user_id, actual.year, actual.month, 'stale' AS problem FROM actual
+    LEFT JOIN monthly_rollups AS stored
+        ON stored.user_id = actual.user_id AND stored.year = actual.year AND stored.month = actual.month
+    WHERE stored.user_id IS NULL
+       OR stored.total_records != actual.total_records
+       OR stored.diabetic_days != actual.diabetic_days
+       OR stored.glucose_count != actual.glucose_count
+       OR stored.bmi_count != actual.bmi_count
+       OR stored.bp_count != actual.bp_count
+       OR stored.probability_count != actual.probability_count
+       OR ABS(stored.glucose_sum - actual.glucose_sum) > 1e-6
+       OR ABS(stored.bmi_sum - actual.bmi_sum) > 1e-6
+       OR ABS(stored.bp_sum - actual.bp_sum) > 1e-6
+       OR ABS(stored.probability_sum - actual.probability_sum) > 1e-6
+    UNION ALL
+    SELECT stored.user_id, stored.year, stored.month, 'orphan' AS problem FROM monthly_rollups AS stored
+    WHERE NOT EXISTS (
+        SELECT 1 FROM actual
+        WHERE actual.user_id = stored.user_id AND actual.year = stored.year AND actual.month = stored.month
+    )
+"""
+
+# Labeled rows for Trainmodel's streaming ingestion, read in id order with
+# a keyset cursor (id > ?) so every chunk is a seek on the rowid. Feature
+# columns follow FEATURE_ORDER. The label is confirmed_outcome (migration 7),
+# the diagnosis recorded after the fact; it stays NULL until someone
+# records one, and those rows are never trained on. The served prediction
+# and risk level are model output and must not be used as labels.
+TRAINING_LABEL = "confirmed_outcome"
+TRAINING_SOURCES = {
+    "daily_reports": "pregnancies, glucose, blood_pressure, skin_thickness, insulin, bmi, dpf, age",
+    "patients": "pregnancies, glucose, bloodPressure, skinThickness, insulin, BMI, diabetesPedigreeFunction, age",
+}
+
+
+def labeledRowsCountQuery(table: str) -> str:
+    return f"SELECT COUNT(*) FROM {table} WHERE {TRAINING_LABEL} IS NOT NULL"
+
+
+def trainingRowsQuery(table: str) -> str:
+    """
+    Next chunk of (id, 8 features, outcome) rows after a given id; params (afterId, limit)
+    """
+    return f"""
+        SELECT id, {TRAINING_SOURCES[table]}, {TRAINING_LABEL} AS outcome
+        FROM {table}
+        WHERE id > ? AND {TRAINING_LABEL} IS NOT NULL
+        ORDER BY id
+        LIMIT ?
+    """
+
+
+def monthRange(year: int, month: int) -> tuple:
+    """
+    Returns the [start, end) date strings covering one calendar month
+    """
+    if not 1 <= month <= 12:
+        raise ValueError(f"Invalid month: {month}")
+    nextYear, nextMonth = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f"{year:04d}-{month:02d}-01", f"{nextYear:04d}-{nextMonth:02d}-01"
+
+
+def trailingMonths(year: int, month: int, count: int) -> list:
+    """
+    Returns the (year, month) pairs of the count months ending at year/month, oldest first
+    """
+    index = year * 12 + (month - 1)
+    return [(value // 12, value % 12 + 1) for value in range(index - count + 1, index + 1)]
+
+
+def explainQueryPlan(connection, sql: str, params: tuple) -> list:
+    """
+    Returns the detail lines of EXPLAIN QUERY PLAN for a query
+    """
+    return [row[-1] for row in connection.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+def labeledIdsQuery(table: str) -> str:
+    """
+    Ids of all rows with a confirmed outcome, in id order
+    """
+    return f"SELECT id FROM {table} WHERE {TRAINING_LABEL} IS NOT NULL ORDER BY id"
+
+
+def trainingRowsByIdQuery(table: str, count: int) -> str:
+    """
+    (id, 8 features, outcome) of count given ids; params are the ids
+    """
+    return f"""
+        SELECT id, {TRAINING_SOURCES[table]}, {TRAINING_LABEL} AS outcome
+        FROM {table}
+        WHERE id IN ({", ".join("?" * count)}) AND {TRAINING_LABEL} IS NOT NULL
+        ORDER BY id
+    """
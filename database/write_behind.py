@@ -0,0 +1,191 @@
+# backend/database/write_behind.py
+
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# A batch failing with a transient error (database is locked, disk I/O) is
+# retried this many times in total, sleeping FLUSH_BACKOFF_SECONDS * 4^n
+# in between, before its rows are counted as failed
+FLUSH_ATTEMPTS = 4
+FLUSH_BACKOFF_SECONDS = 0.1
+
+# Guards the post-fork writer restart; replaced in the child so it is
+# never inherited in a locked state
+_forkLock = threading.Lock()
+
+
+def _resetForkLock():
+    global _forkLock
+    _forkLock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_resetForkLock)
+
+
+class WriteBehindQueue:
+    """
+    Bounded in-process queue of rows for one INSERT statement, flushed by
+    a background thread in batched transactions.
+
+    A flush happens when flushSize rows are waiting or flushIntervalMs has
+    passed since the oldest unflushed row. When the queue is full, submit()
+    blocks for up to putTimeout seconds (backpressure) and then raises
+    queue.Full so the caller can fall back to a synchronous write.
+
+    Rows accepted by submit() are written unless the database keeps
+    failing: close() waits for submits in progress before stopping the
+    writer, and failed flushes are retried (see FLUSH_ATTEMPTS).
+    """
+
+    def __init__(self, pool, sql: str, maxQueueSize: int = 10000, flushSize: int = 200,
+                 flushIntervalMs: float = 50.0, putTimeout: float = 1.0):
+        self.pool = pool
+        self.sql = sql
+        self.maxQueueSize = maxQueueSize
+        self.flushSize = flushSize
+        self.flushInterval = flushIntervalMs / 1000.0
+        self.putTimeout = putTimeout
+
+        self._statsLock = threading.Lock()
+        self._stats = {"submitted": 0, "written": 0, "failed": 0, "retries": 0, "flushes": 0}
+        self._closed = False
+        # Counts submits between the closed check and their put, so close()
+        # only queues the stop marker after them
+        self._submitting = 0
+        self._submitCondition = threading.Condition()
+        self._startWriter()
+
+    # +submit(row : tuple) : void
+    def submit(self, row: tuple):
+        if self._pid != os.getpid():
+            # Created before a fork: each worker process needs its own writer
+            with _forkLock:
+                if self._pid != os.getpid():
+                    self._statsLock = threading.Lock()
+                    self._submitting = 0
+                    self._submitCondition = threading.Condition()
+                    self._startWriter()
+
+        with self._submitCondition:
+            if self._closed:
+                raise RuntimeError("WriteBehindQueue is closed")
+            self._submitting += 1
+        try:
+            # Outside the lock: a full queue blocks only this caller
+            self._queue.put(row, timeout=self.putTimeout)
+        finally:
+            with self._submitCondition:
+                self._submitting -= 1
+                self._submitCondition.notify_all()
+        with self._statsLock:
+            self._stats["submitted"] += 1
+
+    # +getStats() : dict
+    def getStats(self) -> dict:
+        with self._statsLock:
+            return dict(self._stats, queue_depth=self._queue.qsize())
+
+    # +close() : void
+    def close(self, timeout: float = None):
+        """
+        Stops accepting rows and waits until everything queued is written
+        """
+        with self._submitCondition:
+            if self._closed:
+                return
+            self._closed = True
+            while self._submitting:
+                self._submitCondition.wait()
+        if self._pid == os.getpid():
+            self._queue.put(None)
+            self._writer.join(timeout)
+
+    # ---------------- INTERNAL METHODS ---------------- #
+
+    def _startWriter(self):
+        self._pid = os.getpid()
+        self._queue = queue.Queue(maxsize=self.maxQueueSize)
+        self._writer = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._writer.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            row = self._queue.get()
+            if row is None:
+                break
+
+            batch = [row]
+            deadline = time.monotonic() + self.flushInterval
+            while len(batch) < self.flushSize:
+                remaining = deadline - time.monotonic()
+                try:
+                    row = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if row is None:
+                    stopping = True
+                    break
+                batch.append(row)
+
+            self._flush(batch)
+
+        # Drain whatever is still queued after the shutdown marker
+        remaining = []
+        while True:
+            try:
+                row = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if row is not None:
+                remaining.append(row)
+        if remaining:
+            self._flush(remaining)
+
+    def _flush(self, batch: list):
+        for attempt in range(FLUSH_ATTEMPTS):
+            try:
+                self._write(batch)
+                self._recordFlush(len(batch), 0)
+                return
+            except sqlite3.OperationalError as e:
+                # Locked / busy database or I/O error: worth another try
+                if attempt + 1 == FLUSH_ATTEMPTS:
+                    logger.error("Write-behind flush of %d rows failed %d times, dropping them: %s",
+                                 len(batch), FLUSH_ATTEMPTS, e)
+                    self._recordFlush(0, len(batch))
+                    return
+                logger.warning("Write-behind flush of %d rows failed (%s), retrying", len(batch), e)
+                with self._statsLock:
+                    self._stats["retries"] += 1
+                time.sleep(FLUSH_BACKOFF_SECONDS * 4 ** attempt)
+            except Exception as e:
+                # A bad row (e.g. a constraint) fails the whole executemany:
+                # write the rows one by one so only that row is lost
+                logger.error("Write-behind flush of %d rows failed (%s), writing them one by one", len(batch), e)
+                break
+
+        failed = 0
+        for row in batch:
+            try:
+                self._write([row])
+            except Exception as e:
+                logger.error("Write-behind row dropped: %s", e)
+                failed += 1
+        self._recordFlush(len(batch) - failed, failed)
+
+    def _write(self, rows: list):
+        with self.pool.transaction() as connection:
+            connection.executemany(self.sql, rows)
+
+    def _recordFlush(self, written: int, failed: int):
+        with self._statsLock:
+            self._stats["written"] += written
+            self._stats["failed"] += failed
+            self._stats["flushes"] += 1
@@ -0,0 +1,26 @@
+# backend/gunicorn.conf.py
+#
+#   gunicorn app:app
+#
+# With preload_app the master imports app.py (and loads the models) once
+# before forking, so workers share those pages copy-on-write. Combine with
+# MODEL_MMAP=1 to memory-map the model arrays read-only from disk.
+#
+# Background threads and pooled SQLite connections opened by the master do
+# not carry over: each worker starts its own threads and connections, and
+# never closes the ones it inherited (see database_manager._resetPoolsAfterFork).
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+preload_app = os.environ.get("PRELOAD_APP", "1") == "1"
+
+
+def post_worker_init(worker):
+    # With INFERENCE_WORKERS set, each web worker starts its own inference
+    # processes at boot instead of on its first prediction
+    import app
+
+    if app.inference_pool is not None:
+        app.inference_pool.start()
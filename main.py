@@ -2,22 +2,20 @@
 
 from models.patient import Patient
 from preprocessing.data_preprocessor import DataPreprocessor
-from models.tri_ensemble_model import TriEnsembleModel
+from models.inference_pipeline import getPipeline
 from models.risk_categorizer import RiskCategorizer
 from database.database_manager import Database
 from reports.report_generator import ReportGenerator
-from visualization.visualization_module import VisualizationModule
 
 
 def main():
     print("=== Diabetes Risk Prediction System ===")
 
     preprocessor = DataPreprocessor()
-    model = TriEnsembleModel()
+    pipeline = getPipeline()
     riskCategorizer = RiskCategorizer()
     database = Database()
     reportGenerator = ReportGenerator()
-    visualizer = VisualizationModule()
 
     # Sample input
     inputData = {
@@ -43,13 +41,13 @@ def main():
     # 🔑 Convert Patient → dict
     patientDict = patient.displayPatientData()
 
-    # 🔑 Preprocess ONLY numeric data
-    processedData = preprocessor.preprocessInputData(patientDict)
+    # 🔑 ONLY numeric data (imputation + scaling run inside the pipeline)
+    features = preprocessor.buildFeatureRow(patientDict)
 
     print("Data preprocessing completed")
 
     # Prediction
-    score = model.combinePredictions(processedData)
+    score = pipeline.predictOne(features[0])
     riskLevel = riskCategorizer.categorizeRisk(score)
 
     print("Risk Level:", riskLevel)
@@ -63,7 +61,10 @@ def main():
     reportGenerator.exportReport("PDF")
     reportGenerator.exportReport("HTML")
 
-    # Visualization
+    # Visualization (matplotlib / seaborn / pandas load only here)
+    from visualization.visualization_module import VisualizationModule
+
+    visualizer = VisualizationModule()
     visualizer.displayRiskVisualization(riskLevel)
 
     print("=== Process Completed ===")
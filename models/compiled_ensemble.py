@@ -0,0 +1,247 @@
+# backend/models/compiled_ensemble.py
+
+import json
+import time
+
+import numpy as np
+import joblib
+
+# Order of the three models inside the packed arrays
+MODEL_ORDER = ["rf", "xgb", "et"]
+
+
+class CompiledEnsemble:
+    """
+    Tri-ensemble (RF + XGBoost + ExtraTrees) flattened into packed node
+    arrays and evaluated with vectorized NumPy traversal.
+
+    Every node of every tree lives in the same set of arrays
+    (feature / threshold / left / right / value / defaultLeft). Leaves
+    point to themselves, so walking maxDepth steps lands every row on
+    its leaf in every tree at once.
+    """
+
+    def __init__(self, arrays: dict):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.value = arrays["value"]
+        self.defaultLeft = arrays["defaultLeft"]
+        self.roots = arrays["roots"]
+        # Tree index boundaries of rf / xgb / et inside roots
+        self.modelOffsets = arrays["modelOffsets"]
+        self.maxDepth = int(arrays["maxDepth"])
+        self.xgbBaseMargin = float(arrays["xgbBaseMargin"])
+
+    # ---------------- EXPORT ---------------- #
+
+    @classmethod
+    def fromModels(cls, models: dict) -> "CompiledEnsemble":
+        """
+        Flattens the fitted rf / xgb / et models into packed arrays
+        """
+        trees = {
+            "rf": [_packSklearnTree(est.tree_, _positiveClassIndex(models["rf"])) for est in models["rf"].estimators_],
+            "xgb": _packXGBoostTrees(models["xgb"]),
+            "et": [_packSklearnTree(est.tree_, _positiveClassIndex(models["et"])) for est in models["et"].estimators_],
+        }
+
+        parts = {key: [] for key in ["feature", "threshold", "left", "right", "value", "defaultLeft"]}
+        roots = []
+        modelOffsets = [0]
+        maxDepth = 0
+        nodeOffset = 0
+
+        for name in MODEL_ORDER:
+            for tree in trees[name]:
+                isLeaf = tree["left"] < 0
+                nodeIds = np.arange(len(isLeaf))
+
+                # Leaves loop back to themselves so extra traversal steps are no-ops
+                parts["left"].append(np.where(isLeaf, nodeIds, tree["left"]) + nodeOffset)
+                parts["right"].append(np.where(isLeaf, nodeIds, tree["right"]) + nodeOffset)
+                parts["feature"].append(np.where(isLeaf, 0, tree["feature"]))
+                parts["threshold"].append(tree["threshold"])
+                parts["value"].append(tree["value"])
+                parts["defaultLeft"].append(tree["defaultLeft"])
+
+                roots.append(nodeOffset)
+                nodeOffset += len(isLeaf)
+                maxDepth = max(maxDepth, tree["depth"])
+            modelOffsets.append(len(roots))
+
+        arrays = {key: np.concatenate(values) for key, values in parts.items()}
+        arrays["feature"] = arrays["feature"].astype(np.intp)
+        arrays["left"] = arrays["left"].astype(np.intp)
+        arrays["right"] = arrays["right"].astype(np.intp)
+        arrays["threshold"] = arrays["threshold"].astype(np.float64)
+        arrays["value"] = arrays["value"].astype(np.float64)
+        arrays["defaultLeft"] = arrays["defaultLeft"].astype(bool)
+        arrays["roots"] = np.asarray(roots, dtype=np.intp)
+        arrays["modelOffsets"] = np.asarray(modelOffsets, dtype=np.intp)
+        arrays["maxDepth"] = np.asarray(maxDepth)
+        arrays["xgbBaseMargin"] = np.asarray(_xgboostBaseMargin(models["xgb"]))
+
+        return cls(arrays)
+
+    def save(self, path: str):
+        # Uncompressed so the arrays can be memory-mapped on load
+        joblib.dump(self.toArrays(), path, compress=0)
+
+    @classmethod
+    def load(cls, path: str, mmapMode: str = None) -> "CompiledEnsemble":
+        return cls(joblib.load(path, mmap_mode=mmapMode))
+
+    def toArrays(self) -> dict:
+        return {
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "left": self.left,
+            "right": self.right,
+            "value": self.value,
+            "defaultLeft": self.defaultLeft,
+            "roots": self.roots,
+            "modelOffsets": self.modelOffsets,
+            "maxDepth": np.asarray(self.maxDepth),
+            "xgbBaseMargin": np.asarray(self.xgbBaseMargin),
+        }
+
+    # ---------------- INFERENCE ---------------- #
+
+    def leafIndices(self, data: np.ndarray) -> np.ndarray:
+        """
+        Returns the (N, n_trees) matrix of leaf node ids reached by each row
+        """
+        # Trees compare float32 features, same as sklearn / XGBoost do internally
+        data = np.asarray(data, dtype=np.float32).astype(np.float64)
+        rows = np.arange(data.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (data.shape[0], len(self.roots)))
+
+        for _ in range(self.maxDepth):
+            values = data[rows, self.feature[nodes]]
+            goLeft = values <= self.threshold[nodes]
+            missing = np.isnan(values)
+            if missing.any():
+                goLeft = np.where(missing, self.defaultLeft[nodes], goLeft)
+            nodes = np.where(goLeft, self.left[nodes], self.right[nodes])
+
+        return nodes
+
+    def predictModelProbabilities(self, data: np.ndarray) -> dict:
+        """
+        Positive-class probability of each of the three models
+        """
+        leafValues = self.value[self.leafIndices(data)]
+        rfStart, xgbStart, etStart, end = self.modelOffsets
+
+        xgbMargin = self.xgbBaseMargin + leafValues[:, xgbStart:etStart].sum(axis=1)
+        return {
+            "rf": leafValues[:, rfStart:xgbStart].mean(axis=1),
+            "xgb": 1.0 / (1.0 + np.exp(-xgbMargin)),
+            "et": leafValues[:, etStart:end].mean(axis=1),
+        }
+
+    def combinePredictionsBatch(self, data: np.ndarray, timings: dict = None) -> np.ndarray:
+        """
+        Averaged probability for every row. All trees are walked together,
+        so timings (if given) gets one "compiled" entry rather than one per model.
+        """
+        startedAt = time.perf_counter() if timings is not None else None
+        probabilities = self.predictModelProbabilities(data)
+        combined = (probabilities["rf"] + probabilities["xgb"] + probabilities["et"]) / 3
+        if timings is not None:
+            timings["compiled"] = time.perf_counter() - startedAt
+        return combined
+
+    def combinePredictions(self, data: list) -> float:
+        return float(self.combinePredictionsBatch(np.asarray([data]))[0])
+
+    def verifyParity(self, models: dict, data: np.ndarray, tolerance: float = 1e-5) -> float:
+        """
+        Compares against the original models and raises if the averaged
+        probability differs by more than tolerance. Returns the max difference.
+        """
+        data = np.asarray(data, dtype=np.float64)
+        expected = (
+            models["rf"].predict_proba(data)[:, 1]
+            + models["xgb"].predict_proba(data)[:, 1]
+            + models["et"].predict_proba(data)[:, 1]
+        ) / 3
+        difference = float(np.max(np.abs(expected - self.combinePredictionsBatch(data))))
+
+        if difference > tolerance:
+            raise ValueError(f"Compiled ensemble differs from original models by {difference:.3g}")
+        return difference
+
+
+# ---------------- INTERNAL HELPERS ---------------- #
+
+def _positiveClassIndex(model) -> int:
+    return int(np.flatnonzero(model.classes_ == 1)[0])
+
+
+def _packSklearnTree(tree, classIndex: int) -> dict:
+    # sklearn sends a row left when X[feature] <= threshold
+    counts = tree.value[:, 0, :]
+    return {
+        "feature": tree.feature,
+        "threshold": tree.threshold,
+        "left": tree.children_left,
+        "right": tree.children_right,
+        "value": counts[:, classIndex] / counts.sum(axis=1),
+        "defaultLeft": np.asarray(tree.missing_go_to_left, dtype=bool),
+        "depth": tree.max_depth,
+    }
+
+
+def _packXGBoostTrees(model) -> list:
+    learner = json.loads(model.get_booster().save_raw("json"))["learner"]
+    trees = learner["gradient_booster"]["model"]["trees"]
+
+    # predict_proba stops at the best iteration when early stopping was used
+    try:
+        trees = trees[:model.best_iteration + 1]
+    except AttributeError:
+        pass
+
+    packed = []
+    for tree in trees:
+        left = np.asarray(tree["left_children"], dtype=np.intp)
+        splits = np.asarray(tree["split_conditions"], dtype=np.float32)
+        isLeaf = left < 0
+
+        # XGBoost sends a row left when x < split (in float32); for float32
+        # inputs that is the same as x <= the next float32 below split
+        threshold = np.nextafter(splits, np.float32(-np.inf)).astype(np.float64)
+
+        packed.append({
+            "feature": np.asarray(tree["split_indices"], dtype=np.intp),
+            "threshold": np.where(isLeaf, 0.0, threshold),
+            "left": left,
+            "right": np.asarray(tree["right_children"], dtype=np.intp),
+            # Leaf weights are stored in split_conditions
+            "value": np.where(isLeaf, splits.astype(np.float64), 0.0),
+            "defaultLeft": np.asarray(tree["default_left"], dtype=bool),
+            "depth": _treeDepth(left, np.asarray(tree["right_children"], dtype=np.intp)),
+        })
+    return packed
+
+
+def _treeDepth(left: np.ndarray, right: np.ndarray) -> int:
+    maxDepth = 0
+    stack = [(0, 0)]
+    while stack:
+        node, depth = stack.pop()
+        maxDepth = max(maxDepth, depth)
+        if left[node] >= 0:
+            stack.append((left[node], depth + 1))
+            stack.append((right[node], depth + 1))
+    return maxDepth
+
+
+def _xgboostBaseMargin(model) -> float:
+    learner = json.loads(model.get_booster().save_raw("json"))["learner"]
+    baseScore = float(learner["learner_model_param"]["base_score"].strip("[]"))
+    # binary:logistic stores base_score as a probability
+    return float(np.log(baseScore / (1.0 - baseScore)))
@@ -0,0 +1,223 @@
+# backend/models/inference_pipeline.py
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+import joblib
+import numpy as np
+
+from models.compiled_ensemble import CompiledEnsemble
+from models.tri_ensemble_model import TriEnsembleModel
+from preprocessing.knn_imputer import IndexedKNNImputer
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.path.join(BASE_DIR, "saved_models")
+
+# Column order expected by the imputer, scaler and models (PIMA dataset order)
+FEATURE_ORDER = [
+    "Pregnancies",
+    "Glucose",
+    "BloodPressure",
+    "SkinThickness",
+    "Insulin",
+    "BMI",
+    "DiabetesPedigreeFunction",
+    "Age"
+]
+
+# Lists the version of each engine's artifact set. Training writes it after
+# every artifact, so a set on disk is complete only when it matches.
+MANIFEST_FILE = "manifest.json"
+
+
+class InferencePipeline:
+    """
+    Imputer -> scaler -> tri-ensemble, loaded once and applied to plain
+    NumPy arrays of raw features (N x 8, NaN for missing readings).
+    """
+
+    def __init__(self, modelDir: str = MODEL_DIR, engine: str = "sklearn", mmapMode: str = None):
+        self.modelDir = modelDir
+        self.engine = engine
+        # mmapMode="r" maps the plain arrays of uncompressed joblib files
+        # read-only, so forked / sibling workers share the same OS pages
+        self.mmapMode = mmapMode
+        self._models = None
+        # Milliseconds spent on each artifact, for the startup report
+        self.loadTimings = {}
+        # Optional callable(stage, seconds) fed the time of every predictProba
+        # stage (impute, scale, then each model); None skips the timing
+        self.stageObserver = None
+
+        startedAt = time.perf_counter()
+        self.scaler = joblib.load(os.path.join(modelDir, "scaler.pkl"))
+        self._recordLoad("scaler.pkl", startedAt)
+
+        startedAt = time.perf_counter()
+        self.imputer = IndexedKNNImputer(joblib.load(os.path.join(modelDir, "imputer.pkl"), mmap_mode=mmapMode))
+        self._recordLoad("imputer.pkl", startedAt)
+
+        if engine == "compiled":
+            startedAt = time.perf_counter()
+            self.ensemble = CompiledEnsemble.load(os.path.join(modelDir, "tri_ensemble_compiled.pkl"), mmapMode=mmapMode)
+            self._recordLoad("tri_ensemble_compiled.pkl", startedAt)
+        else:
+            self.ensemble = TriEnsembleModel(self.models)
+
+        startedAt = time.perf_counter()
+        self.version = artifactVersion(modelDir, engine)
+        self._recordLoad("version_hash", startedAt)
+
+        # StandardScaler.transform as plain arithmetic (skips input validation)
+        self._mean = self.scaler.mean_ if self.scaler.with_mean else 0.0
+        self._scale = self.scaler.scale_ if self.scaler.with_std else 1.0
+
+    @property
+    def models(self) -> dict:
+        """
+        The pickled rf / xgb / et estimators. The compiled engine does not
+        need them, so they are only unpickled on first access.
+        """
+        if self._models is None:
+            # sklearn trees and XGBoost boosters copy their buffers on load,
+            # so mmap_mode would not save anything here
+            startedAt = time.perf_counter()
+            self._models = joblib.load(os.path.join(self.modelDir, "tri_ensemble.pkl"))
+            self._recordLoad("tri_ensemble.pkl", startedAt)
+        return self._models
+
+    # +transform(data : ndarray) : ndarray
+    def transform(self, data: np.ndarray) -> np.ndarray:
+        """
+        Imputes and scales raw features
+        """
+        return self.scale(self.imputer.transform(np.atleast_2d(np.asarray(data, dtype=float))))
+
+    # +scale(data : ndarray) : ndarray
+    def scale(self, data: np.ndarray) -> np.ndarray:
+        """
+        Standard-scales already imputed features
+        """
+        return (data - self._mean) / self._scale
+
+    # +predictProba(data : ndarray) : ndarray
+    def predictProba(self, data: np.ndarray) -> np.ndarray:
+        """
+        Averaged ensemble probability for every row of raw features
+        """
+        if self.stageObserver is None:
+            return self.ensemble.combinePredictionsBatch(self.transform(data))
+
+        timings = {}
+        startedAt = time.perf_counter()
+        imputed = self.imputer.transform(np.atleast_2d(np.asarray(data, dtype=float)))
+        timings["impute"] = time.perf_counter() - startedAt
+
+        startedAt = time.perf_counter()
+        scaled = self.scale(imputed)
+        timings["scale"] = time.perf_counter() - startedAt
+
+        probabilities = self.ensemble.combinePredictionsBatch(scaled, timings)
+        for stage, seconds in timings.items():
+            self.stageObserver(stage, seconds)
+        return probabilities
+
+    # +predictOne(row : list) : float
+    def predictOne(self, row) -> float:
+        return float(self.predictProba(np.asarray([row], dtype=float))[0])
+
+    def _recordLoad(self, name: str, startedAt: float):
+        self.loadTimings[name] = round((time.perf_counter() - startedAt) * 1000, 1)
+
+
+def artifactVersion(modelDir: str, engine: str = "sklearn") -> str:
+    """
+    Short content hash of the artifacts a pipeline would load
+    """
+    ensembleFile = "tri_ensemble_compiled.pkl" if engine == "compiled" else "tri_ensemble.pkl"
+    digest = hashlib.sha256()
+    for name in [ensembleFile, "scaler.pkl", "imputer.pkl"]:
+        with open(os.path.join(modelDir, name), "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+class UnpublishedArtifactsError(RuntimeError):
+    """
+    Raised when the artifacts on disk are not a complete published set
+    """
+
+
+def writeManifest(modelDir: str) -> dict:
+    """
+    Publishes the artifacts in modelDir; call after the last one is written
+    """
+    versions = {}
+    for engine in ["sklearn", "compiled"]:
+        try:
+            versions[engine] = artifactVersion(modelDir, engine)
+        except FileNotFoundError:
+            continue
+    manifest = {"versions": versions, "published_at": time.time()}
+
+    temporaryPath = os.path.join(modelDir, MANIFEST_FILE + ".tmp")
+    with open(temporaryPath, "w") as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(temporaryPath, os.path.join(modelDir, MANIFEST_FILE))
+    return manifest
+
+
+def publishedVersion(modelDir: str, engine: str = "sklearn") -> str:
+    """
+    Version of the published artifact set for engine. Raises
+    UnpublishedArtifactsError if there is none or the files on disk differ
+    from it (a training run is still writing them).
+    """
+    try:
+        with open(os.path.join(modelDir, MANIFEST_FILE)) as file:
+            published = json.load(file)["versions"].get(engine)
+    except FileNotFoundError:
+        raise UnpublishedArtifactsError(
+            f"No {MANIFEST_FILE} in {modelDir}: publish the artifacts with Trainmodel first") from None
+    if published is None:
+        raise UnpublishedArtifactsError(f"{MANIFEST_FILE} in {modelDir} lists no {engine} artifacts")
+
+    onDisk = artifactVersion(modelDir, engine)
+    if onDisk != published:
+        raise UnpublishedArtifactsError(
+            f"{engine} artifacts in {modelDir} ({onDisk}) are not the published set ({published})")
+    return published
+
+
+# ---------------- PROCESS-WIDE REGISTRY ---------------- #
+
+_registry = {}
+_registryLock = threading.Lock()
+
+
+def getPipeline(modelDir: str = MODEL_DIR, engine: str = "sklearn", mmapMode: str = None) -> InferencePipeline:
+    """
+    Returns the shared pipeline for modelDir / engine, loading it on first use
+    """
+    key = (os.path.abspath(modelDir), engine, mmapMode)
+    pipeline = _registry.get(key)
+    if pipeline is None:
+        with _registryLock:
+            pipeline = _registry.get(key)
+            if pipeline is None:
+                pipeline = InferencePipeline(modelDir, engine, mmapMode)
+                _registry[key] = pipeline
+    return pipeline
+
+
+def setPipeline(pipeline: InferencePipeline):
+    """
+    Makes pipeline the shared one for its modelDir / engine, so the one it
+    replaces (e.g. after a model reload) can be freed
+    """
+    with _registryLock:
+        _registry[(os.path.abspath(pipeline.modelDir), pipeline.engine, pipeline.mmapMode)] = pipeline
@@ -0,0 +1,498 @@
+# backend/models/inference_workers.py
+#
+# Inference in separate processes, so the three tree models are not
+# limited by the API process's GIL.
+#
+# Each worker process loads its own InferencePipeline. Rows and scores move
+# through two multiprocessing.shared_memory blocks cut into fixed-size
+# slots:
+#   inputs   slots x slotRows x 8 float64   (raw features, NaN = missing)
+#   outputs  slots x slotRows float64       (ensemble probabilities)
+# The pipes only carry (slot, rowCount, version) / (slot, status) integer
+# tuples, so arrays are never pickled. Batches larger than one slot are
+# split across several slots and scored by several workers at once.
+#
+# Every task names the model version (artifact hash) the caller's pipeline
+# was validated with. A worker holding other models loads the artifacts on
+# disk only if they hash to that version, and swaps them in only if the
+# load succeeds; otherwise it answers STATUS_STALE and the caller scores
+# in-process with its own pipeline. Scores therefore always come from the
+# model_version a response reports.
+#
+# Every worker has its own task and result pipe, so the pool knows which
+# slots each worker holds. A worker that dies (OOM kill, segfault) shows up
+# as EOF on its result pipe: its slots fail at once and a replacement is
+# started.
+
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing import connection, shared_memory
+
+import numpy as np
+
+from models.inference_pipeline import FEATURE_ORDER, MODEL_DIR, InferencePipeline, artifactVersion
+
+logger = logging.getLogger(__name__)
+
+FEATURE_COUNT = len(FEATURE_ORDER)
+
+# Status codes sent back with a slot index
+STATUS_OK = 0
+STATUS_FAILED = 1
+# The worker cannot score with the requested model version
+STATUS_STALE = 2
+
+# Version of a task that any loaded models may score
+ANY_VERSION = -1
+
+# Slot index of control messages (worker ready / stop)
+CONTROL_SLOT = -1
+
+# Seconds every worker gets to load the models at start
+READY_TIMEOUT_SECONDS = 300
+
+
+class StaleModelError(RuntimeError):
+    """
+    Raised when the workers cannot score with the requested model version
+    """
+
+
+def _versionNumber(version: str) -> int:
+    # Artifact hashes are 12 hex digits, so they fit the int64 task tuples
+    return int(version, 16) if version else ANY_VERSION
+
+
+def _matchingPipeline(pipeline: InferencePipeline, wanted: int) -> InferencePipeline:
+    """
+    pipeline if it has the wanted version, else freshly loaded artifacts if
+    they have it, else None
+    """
+    if wanted == ANY_VERSION or _versionNumber(pipeline.version) == wanted:
+        return pipeline
+    try:
+        # Hashing first skips a load when the files are not (or no longer) that version
+        if _versionNumber(artifactVersion(pipeline.modelDir, pipeline.engine)) != wanted:
+            return None
+        candidate = InferencePipeline(pipeline.modelDir, pipeline.engine, pipeline.mmapMode)
+    except Exception as e:
+        logger.error("Inference worker %d failed to reload models: %s", os.getpid(), e, exc_info=True)
+        return None
+    return candidate if _versionNumber(candidate.version) == wanted else None
+
+
+def _workerMain(names: dict, slots: int, slotRows: int, modelDir: str, engine: str, mmapMode: str, tasks, results):
+    # Spawned workers share the pool owner's resource tracker, so attaching
+    # here does not make the blocks outlive (or die with) this process
+    blocks = {key: shared_memory.SharedMemory(name=name) for key, name in names.items()}
+    inputs = np.ndarray((slots, slotRows, FEATURE_COUNT), dtype=np.float64, buffer=blocks["inputs"].buf)
+    outputs = np.ndarray((slots, slotRows), dtype=np.float64, buffer=blocks["outputs"].buf)
+
+    try:
+        pipeline = InferencePipeline(modelDir, engine, mmapMode)
+    except Exception as e:
+        logger.error("Inference worker %d failed to load models: %s", os.getpid(), e, exc_info=True)
+        results.send((CONTROL_SLOT, STATUS_FAILED))
+        return
+    results.send((CONTROL_SLOT, STATUS_OK))
+
+    while True:
+        try:
+            slot, rowCount, version = tasks.recv()
+        except EOFError:
+            # The pool owner is gone
+            break
+        if slot == CONTROL_SLOT:
+            break
+
+        status = STATUS_OK
+        try:
+            matching = _matchingPipeline(pipeline, version)
+            if matching is None:
+                status = STATUS_STALE
+            else:
+                pipeline = matching
+                outputs[slot, :rowCount] = pipeline.predictProba(inputs[slot, :rowCount])
+        except Exception as e:
+            logger.error("Inference worker %d failed on slot %d: %s", os.getpid(), slot, e, exc_info=True)
+            status = STATUS_FAILED
+        results.send((slot, status))
+
+    # Views must go before the blocks can be closed
+    del inputs, outputs
+    for block in blocks.values():
+        block.close()
+
+
+class _WorkerHandle:
+    def __init__(self, index: int, process, tasks, results):
+        self.index = index
+        self.process = process
+        # Parent ends of the worker's pipes; callers send, the collector receives
+        self.tasks = tasks
+        self.results = results
+        self.sendLock = threading.Lock()
+        # Slots queued on or being scored by this worker
+        self.slots = set()
+        # Set once the worker reported its models loaded; only workers that
+        # got that far are replaced when they die
+        self.ready = False
+
+
+class InferenceWorkerPool:
+    """
+    Scores rows in a pool of worker processes through shared-memory slots.
+
+    predictProba() may be called from many threads. A call takes free slots
+    from a ring, copies its rows in, hands each slot to the least busy
+    worker and waits for them. The pool starts on first use in each
+    process, so a pool created before a fork (gunicorn --preload) gets its
+    own workers in every web worker.
+    """
+
+    def __init__(self, workers: int, slots: int = None, slotRows: int = 1024, modelDir: str = MODEL_DIR,
+                 engine: str = "sklearn", mmapMode: str = None, timeoutSeconds: float = 30.0):
+        self.workers = workers
+        self.slots = slots or workers * 4
+        self.slotRows = slotRows
+        self.modelDir = modelDir
+        self.engine = engine
+        self.mmapMode = mmapMode
+        self.timeoutSeconds = timeoutSeconds
+
+        self._pid = None
+        self._startLock = threading.Lock()
+        self._statsLock = threading.Lock()
+        self._resetStats()
+
+    # +start() : void
+    def start(self):
+        """
+        Creates the shared memory and starts the workers; returns once every
+        worker has loaded its models. Called on first use if not called before.
+        """
+        with self._startLock:
+            if self._pid == os.getpid():
+                return
+            self._start()
+
+    # +predictProba(rows : ndarray, version : String) : ndarray
+    def predictProba(self, rows: np.ndarray, version: str = None) -> np.ndarray:
+        """
+        Averaged ensemble probability for every row of raw features, scored
+        by models of the given version (any loaded models if None). Raises
+        StaleModelError if a worker cannot provide that version.
+        """
+        if self._pid != os.getpid():
+            self.start()
+
+        rows = np.atleast_2d(np.asarray(rows, dtype=np.float64))
+        scores = np.empty(len(rows), dtype=np.float64)
+        chunks = [(start, min(start + self.slotRows, len(rows))) for start in range(0, len(rows), self.slotRows)]
+        inFlight = []
+        startedAt = time.perf_counter()
+
+        try:
+            for start, end in chunks:
+                slot = self._acquireSlot(inFlight, scores)
+                self._inputs[slot, :end - start] = rows[start:end]
+                self._done[slot].clear()
+                inFlight.append((slot, start, end))
+                self._dispatch(slot, end - start, _versionNumber(version))
+
+            while inFlight:
+                self._collect(inFlight.pop(0), scores)
+        except BaseException:
+            for slot, _, _ in inFlight:
+                self._abandon(slot)
+            raise
+
+        self._recordCall(len(rows), len(chunks), time.perf_counter() - startedAt)
+        return scores
+
+    # +scorer(pipeline : InferencePipeline) : callable
+    def scorer(self, pipeline: InferencePipeline):
+        """
+        predictFn scoring in the workers with pipeline's model version, or
+        in-process with pipeline itself while the workers cannot
+        """
+        return _PipelineScorer(self, pipeline)
+
+    # +getStats() : dict
+    def getStats(self) -> dict:
+        started = self._pid == os.getpid()
+        with self._statsLock:
+            calls = self._stats["calls"]
+            return {
+                "workers": self.workers,
+                "slots": self.slots,
+                "slot_rows": self.slotRows,
+                "started": started,
+                "alive_workers": sum(1 for handle in self._handles if handle is not None) if started else 0,
+                "free_slots": self._freeSlots.qsize() if started else self.slots,
+                "calls": calls,
+                "rows": self._stats["rows"],
+                "chunks": self._stats["chunks"],
+                "avg_call_ms": round(self._stats["seconds"] / calls * 1000, 3) if calls else 0,
+                "max_call_ms": round(self._stats["maxSeconds"] * 1000, 3),
+                "restarts": self._stats["restarts"],
+                "stale_fallbacks": self._stats["staleFallbacks"],
+            }
+
+    def close(self):
+        with self._startLock:
+            if self._pid != os.getpid():
+                return
+            self._closing = True
+            with self._slotLock:
+                handles = [handle for handle in self._handles if handle is not None]
+            for handle in handles:
+                try:
+                    with handle.sendLock:
+                        handle.tasks.send((CONTROL_SLOT, 0, ANY_VERSION))
+                except OSError:
+                    pass
+            self._stopProcesses(handles)
+            self._wakeWriter.send(None)
+            self._collector.join()
+
+            for handle in handles:
+                handle.tasks.close()
+                handle.results.close()
+            self._wakeReader.close()
+            self._wakeWriter.close()
+            self._releaseMemory()
+            self._pid = None
+
+    # ---------------- INTERNAL METHODS ---------------- #
+
+    def _start(self):
+        sizes = {
+            "inputs": self.slots * self.slotRows * FEATURE_COUNT * 8,
+            "outputs": self.slots * self.slotRows * 8,
+        }
+        self._blocks = {key: shared_memory.SharedMemory(create=True, size=size) for key, size in sizes.items()}
+        self._inputs = np.ndarray((self.slots, self.slotRows, FEATURE_COUNT), dtype=np.float64, buffer=self._blocks["inputs"].buf)
+        self._outputs = np.ndarray((self.slots, self.slotRows), dtype=np.float64, buffer=self._blocks["outputs"].buf)
+
+        # Ring of free slot indices; only this process hands slots out
+        self._freeSlots = queue.Queue()
+        for slot in range(self.slots):
+            self._freeSlots.put(slot)
+        self._done = [threading.Event() for _ in range(self.slots)]
+        self._status = [STATUS_OK] * self.slots
+        # Slots whose caller gave up; returned to the ring once their worker answers (or dies)
+        self._abandoned = set()
+        self._slotLock = threading.Lock()
+        self._closing = False
+
+        # spawn: the API process may already run threads (batcher, watcher)
+        self._context = multiprocessing.get_context("spawn")
+        self._names = {key: block.name for key, block in self._blocks.items()}
+        self._handles = [self._spawn(index) for index in range(self.workers)]
+
+        deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+        if not all(self._waitReady(handle, deadline) for handle in self._handles):
+            for handle in self._handles:
+                handle.process.terminate()
+            self._stopProcesses(self._handles)
+            for handle in self._handles:
+                handle.tasks.close()
+                handle.results.close()
+            self._releaseMemory()
+            raise RuntimeError("Inference workers failed to start (see the worker log output)")
+
+        # Wakes the collector when the pool closes
+        self._wakeReader, self._wakeWriter = self._context.Pipe(duplex=False)
+        self._collector = threading.Thread(target=self._collectResults, name="inference-results", daemon=True)
+        self._collector.start()
+        self._pid = os.getpid()
+        logger.info("Inference workers started: %d processes, %d slots x %d rows", self.workers, self.slots, self.slotRows)
+
+    def _spawn(self, index: int) -> _WorkerHandle:
+        taskReader, taskWriter = self._context.Pipe(duplex=False)
+        resultReader, resultWriter = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_workerMain,
+            args=(self._names, self.slots, self.slotRows, self.modelDir, self.engine, self.mmapMode, taskReader, resultWriter),
+            name=f"inference-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        # Only the worker keeps its ends open, so its death reads as EOF here
+        taskReader.close()
+        resultWriter.close()
+        return _WorkerHandle(index, process, taskWriter, resultReader)
+
+    def _waitReady(self, handle: _WorkerHandle, deadline: float) -> bool:
+        # False if the worker failed to load, died or ran past the deadline
+        try:
+            if not handle.results.poll(max(0.0, deadline - time.monotonic())):
+                return False
+            _, status = handle.results.recv()
+        except (EOFError, OSError):
+            return False
+        handle.ready = status == STATUS_OK
+        return handle.ready
+
+    def _stopProcesses(self, handles: list):
+        for handle in handles:
+            handle.process.join(timeout=10)
+            if handle.process.is_alive():
+                handle.process.terminate()
+                handle.process.join()
+
+    def _releaseMemory(self):
+        # Views must go before the blocks can be closed
+        del self._inputs, self._outputs
+        for block in self._blocks.values():
+            block.close()
+            block.unlink()
+
+    def _collectResults(self):
+        while True:
+            with self._slotLock:
+                readers = {handle.results: handle for handle in self._handles if handle is not None}
+            readable = connection.wait(list(readers) + [self._wakeReader])
+            if self._wakeReader in readable:
+                return
+            for reader in readable:
+                handle = readers[reader]
+                try:
+                    slot, status = reader.recv()
+                except (EOFError, OSError):
+                    self._replaceWorker(handle)
+                    continue
+                if slot == CONTROL_SLOT:
+                    # Ready message of a replacement worker
+                    handle.ready = status == STATUS_OK
+                    continue
+                self._finish(handle, slot, status)
+
+    def _replaceWorker(self, handle: _WorkerHandle):
+        handle.process.join(timeout=5)
+        # Only workers that loaded their models get a replacement: one that
+        # never did would fail the same way
+        replacement = self._spawn(handle.index) if handle.ready and not self._closing else None
+        # Swap and take the dead worker's slots at once, so none it was
+        # handed in the meantime is missed
+        with self._slotLock:
+            self._handles[handle.index] = replacement
+            orphaned = list(handle.slots)
+        handle.tasks.close()
+        handle.results.close()
+        if self._closing:
+            return
+
+        for slot in orphaned:
+            self._finish(handle, slot, STATUS_FAILED)
+        logger.error("Inference worker %d (pid %s) exited with code %s; failed %d in-flight slots%s",
+                     handle.index, handle.process.pid, handle.process.exitcode, len(orphaned),
+                     ", started a replacement" if replacement is not None else "")
+        if replacement is not None:
+            with self._statsLock:
+                self._stats["restarts"] += 1
+
+    def _dispatch(self, slot: int, rowCount: int, version: int):
+        with self._slotLock:
+            handles = [handle for handle in self._handles if handle is not None]
+            if not handles:
+                # Let the caller's cleanup return the slot to the ring
+                self._status[slot] = STATUS_FAILED
+                self._done[slot].set()
+                raise RuntimeError("No inference workers are running")
+            # Least busy worker; a replacement still loading only when all are
+            handle = min(handles, key=lambda candidate: (not candidate.ready, len(candidate.slots)))
+            handle.slots.add(slot)
+        try:
+            with handle.sendLock:
+                handle.tasks.send((slot, rowCount, version))
+        except OSError:
+            # The worker just died; the collector fails this slot with its others
+            pass
+
+    def _finish(self, handle: _WorkerHandle, slot: int, status: int):
+        with self._slotLock:
+            handle.slots.discard(slot)
+            if slot in self._abandoned:
+                self._abandoned.discard(slot)
+                self._freeSlots.put(slot)
+                return
+            self._status[slot] = status
+            self._done[slot].set()
+
+    def _abandon(self, slot: int):
+        # A worker may still write to an unfinished slot, so it is only
+        # reused after its result arrives
+        with self._slotLock:
+            if self._done[slot].is_set():
+                self._freeSlots.put(slot)
+            else:
+                self._abandoned.add(slot)
+
+    def _acquireSlot(self, inFlight: list, scores: np.ndarray) -> int:
+        # When the ring is empty, finish one of this call's own slots first:
+        # waiting while holding finished slots could deadlock two large calls
+        while True:
+            try:
+                return self._freeSlots.get_nowait()
+            except queue.Empty:
+                if inFlight:
+                    self._collect(inFlight.pop(0), scores)
+                    continue
+            try:
+                return self._freeSlots.get(timeout=self.timeoutSeconds)
+            except queue.Empty:
+                raise TimeoutError(f"No free inference slot within {self.timeoutSeconds} s")
+
+    def _collect(self, entry: tuple, scores: np.ndarray):
+        slot, start, end = entry
+        if not self._done[slot].wait(self.timeoutSeconds):
+            self._abandon(slot)
+            raise TimeoutError(f"Inference worker did not answer within {self.timeoutSeconds} s")
+        status = self._status[slot]
+        if status == STATUS_OK:
+            scores[start:end] = self._outputs[slot, :end - start]
+        self._freeSlots.put(slot)
+        if status == STATUS_STALE:
+            raise StaleModelError(f"Inference workers cannot score rows {start}-{end} with the requested model version")
+        if status != STATUS_OK:
+            raise RuntimeError(f"Inference worker failed to score rows {start}-{end}")
+
+    def _resetStats(self):
+        self._stats = {"calls": 0, "rows": 0, "chunks": 0, "seconds": 0.0, "maxSeconds": 0.0, "restarts": 0,
+                       "staleFallbacks": 0}
+
+    def _recordCall(self, rowCount: int, chunkCount: int, seconds: float):
+        with self._statsLock:
+            self._stats["calls"] += 1
+            self._stats["rows"] += rowCount
+            self._stats["chunks"] += chunkCount
+            self._stats["seconds"] += seconds
+            self._stats["maxSeconds"] = max(self._stats["maxSeconds"], seconds)
+
+
+class _PipelineScorer:
+    # Equal for the same pool and pipeline, so the micro-batcher still
+    # groups requests that started on the same models
+    def __init__(self, pool: InferenceWorkerPool, pipeline: InferencePipeline):
+        self.pool = pool
+        self.pipeline = pipeline
+
+    def __call__(self, rows: np.ndarray) -> np.ndarray:
+        try:
+            return self.pool.predictProba(rows, self.pipeline.version)
+        except StaleModelError:
+            with self.pool._statsLock:
+                self.pool._stats["staleFallbacks"] += 1
+            return self.pipeline.predictProba(rows)
+
+    def __eq__(self, other):
+        return isinstance(other, _PipelineScorer) and other.pool is self.pool and other.pipeline is self.pipeline
+
+    def __hash__(self):
+        return hash((id(self.pool), id(self.pipeline)))
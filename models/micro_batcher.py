@@ -0,0 +1,222 @@
+# backend/models/micro_batcher.py
+
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+
+# Guards the post-fork worker restart; replaced in the child so it is
+# never inherited in a locked state
+_forkLock = threading.Lock()
+
+
+def _resetForkLock():
+    global _forkLock
+    _forkLock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_resetForkLock)
+
+
+class _PendingRequest:
+    def __init__(self, rows: np.ndarray, predictFn):
+        self.rows = rows
+        self.predictFn = predictFn
+        self.enqueuedAt = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent prediction requests into one model call.
+
+    Requests arriving within maxWaitMs of the first queued request (or
+    until maxBatchSize rows are collected) are stacked into a single
+    matrix, scored with predictFn, and the results are handed back to
+    each waiting caller.
+
+    A caller may pass its own predictFn (e.g. the pipeline it started
+    with while a model reload is in progress); requests with different
+    functions share a batch window but are scored separately.
+
+    A caller waits at most timeoutSeconds for its scores. Requests still
+    queued when the batcher closes (or its thread dies) fail at once.
+    """
+
+    def __init__(self, predictFn, maxBatchSize: int = 64, maxWaitMs: float = 2.0, timeoutSeconds: float = 30.0):
+        self.predictFn = predictFn
+        self.maxBatchSize = maxBatchSize
+        self.maxWait = maxWaitMs / 1000.0
+        self.timeoutSeconds = timeoutSeconds
+
+        self._statsLock = threading.Lock()
+        self._resetStats()
+
+        self._closed = False
+        # Orders submits against close(): nothing is queued after the stop marker
+        self._submitLock = threading.Lock()
+        self._startWorker()
+
+    # +submit(rows : ndarray, predictFn : callable) : ndarray
+    def submit(self, rows: np.ndarray, predictFn=None) -> np.ndarray:
+        """
+        Queues rows (N x features) and blocks until their scores are ready
+        """
+        if self._pid != os.getpid():
+            # Created before a fork (e.g. gunicorn --preload): threads do not
+            # survive fork, so each worker process starts its own
+            with _forkLock:
+                if self._pid != os.getpid():
+                    self._statsLock = threading.Lock()
+                    self._submitLock = threading.Lock()
+                    self._resetStats()
+                    self._startWorker()
+
+        pending = _PendingRequest(np.atleast_2d(rows), predictFn or self.predictFn)
+        with self._submitLock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self._queue.put(pending)
+
+        if not pending.done.wait(self.timeoutSeconds):
+            raise TimeoutError(f"Micro-batch not scored within {self.timeoutSeconds} s")
+
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    # +getStats() : dict
+    def getStats(self) -> dict:
+        with self._statsLock:
+            batches = self._stats["batches"]
+            return {
+                "batches": batches,
+                "rows": self._stats["rows"],
+                "requests": self._stats["requests"],
+                "avg_batch_size": round(self._stats["rows"] / batches, 2) if batches else 0,
+                "max_batch_size": self._stats["maxBatchSize"],
+                "batch_size_histogram": dict(self._stats["batchSizeHistogram"]),
+                "avg_queue_wait_ms": round(self._stats["queueWait"] / self._stats["requests"] * 1000, 3) if self._stats["requests"] else 0,
+                "max_queue_wait_ms": round(self._stats["maxQueueWait"] * 1000, 3),
+                "queue_depth": self._queue.qsize(),
+            }
+
+    def resetStats(self):
+        with self._statsLock:
+            self._resetStats()
+
+    def close(self):
+        with self._submitLock:
+            if not self._closed:
+                self._closed = True
+                self._queue.put(None)
+        self._worker.join()
+
+    # ---------------- INTERNAL METHODS ---------------- #
+
+    def _startWorker(self):
+        self._pid = os.getpid()
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def _resetStats(self):
+        self._stats = {
+            "batches": 0,
+            "rows": 0,
+            "requests": 0,
+            "maxBatchSize": 0,
+            "batchSizeHistogram": {},
+            "queueWait": 0.0,
+            "maxQueueWait": 0.0,
+        }
+
+    def _collectBatch(self, first: _PendingRequest) -> list:
+        batch = [first]
+        rowCount = len(first.rows)
+        deadline = first.enqueuedAt + self.maxWait
+
+        while rowCount < self.maxBatchSize:
+            remaining = deadline - time.perf_counter()
+            try:
+                pending = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if pending is None:
+                # Shutdown marker: finish this batch, then stop
+                self._queue.put(None)
+                break
+            batch.append(pending)
+            rowCount += len(pending.rows)
+
+        return batch
+
+    def _run(self):
+        try:
+            self._serve()
+        finally:
+            self._failPending()
+
+    def _failPending(self):
+        # Runs as the worker exits (close or crash): refuse new submits and
+        # fail whatever is still queued instead of leaving callers waiting
+        with self._submitLock:
+            self._closed = True
+        error = RuntimeError("MicroBatcher is closed")
+        while True:
+            try:
+                pending = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if pending is not None:
+                pending.error = error
+                pending.done.set()
+
+    def _serve(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+
+            batch = self._collectBatch(first)
+            startedAt = time.perf_counter()
+
+            groups = {}
+            for pending in batch:
+                groups.setdefault(pending.predictFn, []).append(pending)
+
+            for predictFn, group in groups.items():
+                try:
+                    scores = np.asarray(predictFn(np.vstack([pending.rows for pending in group])))
+                    offset = 0
+                    for pending in group:
+                        pending.result = scores[offset:offset + len(pending.rows)]
+                        offset += len(pending.rows)
+                except Exception as e:
+                    for pending in group:
+                        pending.error = e
+
+            self._recordBatch(batch, startedAt)
+            for pending in batch:
+                pending.done.set()
+
+    def _recordBatch(self, batch: list, startedAt: float):
+        rowCount = sum(len(pending.rows) for pending in batch)
+        waits = [startedAt - pending.enqueuedAt for pending in batch]
+
+        # Power-of-two buckets keep the histogram small
+        bucket = str(1 << (rowCount - 1).bit_length())
+
+        with self._statsLock:
+            self._stats["batches"] += 1
+            self._stats["rows"] += rowCount
+            self._stats["requests"] += len(batch)
+            self._stats["maxBatchSize"] = max(self._stats["maxBatchSize"], rowCount)
+            self._stats["batchSizeHistogram"][bucket] = self._stats["batchSizeHistogram"].get(bucket, 0) + 1
+            self._stats["queueWait"] += sum(waits)
+            self._stats["maxQueueWait"] = max(self._stats["maxQueueWait"], max(waits))
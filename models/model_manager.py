@@ -0,0 +1,186 @@
+# backend/models/model_manager.py
+
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+
+from models.inference_pipeline import (MANIFEST_FILE, MODEL_DIR, InferencePipeline, UnpublishedArtifactsError,
+                                       publishedVersion, setPipeline)
+
+logger = logging.getLogger(__name__)
+
+# Rows every candidate pipeline must score before it is swapped in:
+# a complete PIMA record and a record with every reading missing
+SMOKE_ROWS = np.array([
+    [6, 148, 72, 35, 0, 33.6, 0.627, 50],
+    [np.nan] * 8,
+])
+
+# Guards the post-fork watcher restart; replaced in the child so it is
+# never inherited in a locked state
+_forkLock = threading.Lock()
+
+
+def _resetForkLock():
+    global _forkLock
+    _forkLock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_resetForkLock)
+
+
+class ModelManager:
+    """
+    Owns the active InferencePipeline and replaces it without a restart.
+
+    reload() loads a fresh artifact set next to the serving one, checks it
+    with a smoke prediction and then swaps the reference. Only the set
+    named by the manifest training writes last is loaded, so a reload
+    during training never mixes old and new files. Callers read
+    `active` once per request, so in-flight requests finish on the
+    pipeline they started with.
+    """
+
+    def __init__(self, modelDir: str = MODEL_DIR, engine: str = "sklearn", mmapMode: str = None,
+                 pipeline: InferencePipeline = None):
+        self.modelDir = modelDir
+        self.engine = engine
+        self.mmapMode = mmapMode
+
+        self._active = pipeline or InferencePipeline(modelDir, engine, mmapMode)
+        self._reloadLock = threading.Lock()
+        self._listeners = []
+        self._history = []
+        self.loadedAt = time.time()
+
+        self._watchInterval = None
+        self._pid = os.getpid()
+
+    @property
+    def active(self) -> InferencePipeline:
+        if self._watchInterval and self._pid != os.getpid():
+            # Watching started before a fork: each worker process polls on its own
+            with _forkLock:
+                if self._pid != os.getpid():
+                    self._startWatcher()
+        return self._active
+
+    # +onSwap(listener : callable) : void
+    def onSwap(self, listener):
+        """
+        Registers listener(newPipeline, oldPipeline), called after every swap
+        """
+        self._listeners.append(listener)
+
+    # +reload(force : bool) : dict
+    def reload(self, force: bool = False) -> dict:
+        """
+        Loads and validates the published artifacts and swaps them in.
+        Raises (keeping the current pipeline) if the files on disk are not
+        a complete published set, or loading or the smoke prediction fails.
+        """
+        with self._reloadLock:
+            previous = self._active
+            version = publishedVersion(self.modelDir, self.engine)
+            if version == previous.version and not force:
+                return {"changed": False, "version": version, "previous_version": previous.version}
+
+            startedAt = time.perf_counter()
+            candidate = InferencePipeline(self.modelDir, self.engine, self.mmapMode)
+            loadMs = (time.perf_counter() - startedAt) * 1000
+            if candidate.version != version:
+                # A new set started replacing the files while they loaded
+                raise UnpublishedArtifactsError(
+                    f"Artifacts in {self.modelDir} changed while loading ({version} -> {candidate.version})")
+            self._smokeTest(candidate)
+
+            self._active = candidate
+            # getPipeline() callers get the new models too; nothing keeps the old ones alive
+            setPipeline(candidate)
+            self.loadedAt = time.time()
+            for listener in self._listeners:
+                try:
+                    listener(candidate, previous)
+                except Exception as e:
+                    logger.error("Model swap listener failed: %s", e, exc_info=True)
+
+            result = {
+                "changed": candidate.version != previous.version,
+                "version": candidate.version,
+                "previous_version": previous.version,
+                "load_ms": round(loadMs, 1),
+            }
+            self._history.append(dict(result, loaded_at=self.loadedAt))
+            logger.info("Models reloaded: %s -> %s (%.0f ms)", previous.version, candidate.version, loadMs)
+            return result
+
+    # +watch(intervalSeconds : float) : void
+    def watch(self, intervalSeconds: float):
+        """
+        Polls the artifact files and reloads once a change has settled and
+        been published
+        """
+        self._watchInterval = intervalSeconds
+        self._startWatcher()
+
+    def getStats(self) -> dict:
+        return {
+            "version": self._active.version,
+            "engine": self.engine,
+            "loaded_at": self.loadedAt,
+            "watch_interval": self._watchInterval,
+            "reloads": list(self._history[-10:]),
+        }
+
+    # ---------------- INTERNAL METHODS ---------------- #
+
+    def _smokeTest(self, pipeline: InferencePipeline):
+        scores = np.asarray(pipeline.predictProba(SMOKE_ROWS))
+        if scores.shape != (len(SMOKE_ROWS),) or not np.all(np.isfinite(scores)) \
+                or scores.min() < 0 or scores.max() > 1:
+            raise ValueError(f"Smoke prediction for model version {pipeline.version} returned {scores!r}")
+
+    def _artifactSignature(self):
+        ensembleFile = "tri_ensemble_compiled.pkl" if self.engine == "compiled" else "tri_ensemble.pkl"
+        signature = []
+        for name in [ensembleFile, "scaler.pkl", "imputer.pkl", MANIFEST_FILE]:
+            try:
+                stat = os.stat(os.path.join(self.modelDir, name))
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def _startWatcher(self):
+        self._pid = os.getpid()
+        watcher = threading.Thread(target=self._watchLoop, name="model-watcher", daemon=True)
+        watcher.start()
+
+    def _watchLoop(self):
+        current = self._artifactSignature()
+        pending = None
+        while True:
+            time.sleep(self._watchInterval)
+            signature = self._artifactSignature()
+            if signature == current:
+                pending = None
+                continue
+            if signature != pending:
+                # Still being written (or just changed): wait one more poll
+                pending = signature
+                continue
+
+            current = signature
+            pending = None
+            try:
+                self.reload()
+            except UnpublishedArtifactsError as e:
+                # Retried when the manifest is written, which changes the signature
+                logger.warning("Not reloading models from %s yet, keeping %s: %s",
+                               self.modelDir, self._active.version, e)
+            except Exception as e:
+                logger.error("Model reload from %s failed, keeping %s: %s",
+                             self.modelDir, self._active.version, e, exc_info=True)
@@ -0,0 +1,167 @@
+# backend/models/prediction_cache.py
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from database.database_manager import ConnectionPool
+
+
+def canonicalKey(row, version: str) -> str:
+    """
+    Cache key for one raw feature row: model version plus the values
+    rounded to 6 decimals (so 148 and 148.0 match), NaN spelled "nan"
+    """
+    values = ["nan" if math.isnan(value) else repr(round(float(value), 6) + 0.0) for value in row]
+    return version + "|" + ",".join(values)
+
+
+class MemoryCacheBackend:
+    """
+    Per-process LRU with a TTL
+    """
+
+    def __init__(self, maxSize: int = 10000, ttlSeconds: float = 3600):
+        self.maxSize = maxSize
+        self.ttl = ttlSeconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expiresAt = entry
+            if expiresAt < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: float):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxSize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class SqliteCacheBackend:
+    """
+    Cache in a local SQLite file shared by every worker on the host.
+    Entries expire after the TTL; past maxSize the least recently
+    written entries are evicted.
+    """
+
+    def __init__(self, path: str, maxSize: int = 100000, ttlSeconds: float = 3600):
+        self.maxSize = maxSize
+        self.ttl = ttlSeconds
+        self.pool = ConnectionPool(path)
+        self._writes = 0
+
+        with self.pool.transaction() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS prediction_cache (
+                    key TEXT PRIMARY KEY,
+                    value REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            connection.execute("CREATE INDEX IF NOT EXISTS idx_prediction_cache_expires ON prediction_cache(expires_at)")
+
+    def get(self, key: str):
+        row = self.pool.getConnection().execute(
+            "SELECT value FROM prediction_cache WHERE key = ? AND expires_at >= ?", (key, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: float):
+        with self.pool.transaction() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO prediction_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, time.time() + self.ttl)
+            )
+
+        # Trimming is a full count, so only do it every so often
+        self._writes += 1
+        if self._writes % 1000 == 0:
+            self._trim()
+
+    def clear(self):
+        with self.pool.transaction() as connection:
+            connection.execute("DELETE FROM prediction_cache")
+
+    def size(self) -> int:
+        return self.pool.getConnection().execute("SELECT COUNT(*) FROM prediction_cache").fetchone()[0]
+
+    def _trim(self):
+        with self.pool.transaction() as connection:
+            connection.execute("DELETE FROM prediction_cache WHERE expires_at < ?", (time.time(),))
+            connection.execute("""
+                DELETE FROM prediction_cache WHERE key IN (
+                    SELECT key FROM prediction_cache ORDER BY expires_at
+                    LIMIT MAX((SELECT COUNT(*) FROM prediction_cache) - ?, 0)
+                )
+            """, (self.maxSize,))
+
+
+class PredictionCache:
+    """
+    Averaged ensemble probability per canonical feature row, keyed on
+    the model version so a reloaded model never serves stale results.
+    """
+
+    def __init__(self, backend, version: str):
+        self.backend = backend
+        self.version = version
+        self._statsLock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    # +get(row : list, version : String) : float
+    def get(self, row, version: str = None):
+        value = self.backend.get(canonicalKey(row, version or self.version))
+        with self._statsLock:
+            if value is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+        return value
+
+    # +set(row : list, value : float, version : String) : void
+    def set(self, row, value: float, version: str = None):
+        """
+        version is the model that produced value; a request that started
+        before a reload stores under the old version, which never matches
+        """
+        self.backend.set(canonicalKey(row, version or self.version), float(value))
+
+    # +setVersion(version : String) : void
+    def setVersion(self, version: str):
+        """
+        Switches to a new model version and drops every cached result
+        """
+        if version != self.version:
+            self.version = version
+            self.backend.clear()
+
+    def getStats(self) -> dict:
+        with self._statsLock:
+            lookups = self._hits + self._misses
+            return {
+                "backend": type(self.backend).__name__,
+                "model_version": self.version,
+                "size": self.backend.size(),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0,
+            }
@@ -0,0 +1,150 @@
+# backend/monitoring/metrics.py
+#
+# In-process counters and histograms rendered in the Prometheus text
+# exposition format (served by app.py at /metrics). Each process keeps
+# its own registry: with several gunicorn workers every scrape reaches
+# one worker, so run one worker per scrape target or aggregate by
+# instance on the Prometheus side.
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; spans sub-millisecond model stages up to slow batch requests
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Content type Prometheus expects from a text-format scrape
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _formatLabels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatNumber(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Monotonic count per label combination
+    """
+
+    def __init__(self, name: str, documentation: str, labelNames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelNames = tuple(labelNames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    # +inc(amount : float, **labels) : void
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels[name] for name in self.labelNames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in values:
+            lines.append(f"{self.name}{_formatLabels(self.labelNames, key)} {_formatNumber(value)}")
+        return lines
+
+
+class Histogram:
+    """
+    Bucketed distribution (plus sum and count) per label combination
+    """
+
+    def __init__(self, name: str, documentation: str, labelNames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelNames = tuple(labelNames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last one is +Inf), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    # +observe(value : float, **labels) : void
+    def observe(self, value: float, **labels):
+        key = tuple(labels[name] for name in self.labelNames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    # +time(**labels) : context manager
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observes the wall time of the with-block
+        """
+        startedAt = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - startedAt, **labels)
+
+    def render(self) -> list:
+        with self._lock:
+            series = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucketCount in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucketCount
+                le = 'le="' + _formatNumber(bound) + '"'
+                lines.append(f"{self.name}_bucket{_formatLabels(self.labelNames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_formatLabels(self.labelNames, key)} {_formatNumber(total)}")
+            lines.append(f"{self.name}_count{_formatLabels(self.labelNames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Named metrics of one process, rendered together for a scrape
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    # +counter(name : String, documentation : String, labelNames : tuple) : Counter
+    def counter(self, name: str, documentation: str, labelNames: tuple = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelNames))
+
+    # +histogram(name : String, documentation : String, labelNames : tuple, buckets : tuple) : Histogram
+    def histogram(self, name: str, documentation: str, labelNames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelNames, buckets))
+
+    # +render() : String
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
@@ -0,0 +1,142 @@
+# backend/monitoring/profiler.py
+#
+# Opt-in cProfile capture of single requests (wired up in app.py).
+# A request is profiled when it wins the sample-rate draw or carries the
+# configured debug token; each capture is written to the profile
+# directory as <name>.prof (load with pstats / snakeviz) plus a <name>.json
+# summary, and only the newest maxProfiles captures are kept. Listing the
+# captures (/stats/profiles) also requires the token.
+#
+# cProfile only sees the request's own thread: time spent in the
+# micro-batcher or write-behind threads shows up as a wait.
+
+import cProfile
+import glob
+import hmac
+import itertools
+import json
+import os
+import pstats
+import random
+import time
+
+
+class RequestProfiler:
+    """
+    Decides which requests to profile and stores / lists their captures
+    """
+
+    def __init__(self, directory: str, sampleRate: float = 0.0, token: str = None,
+                 maxProfiles: int = 200, topFunctions: int = 15):
+        self.directory = directory
+        self.sampleRate = sampleRate
+        self.token = token
+        self.maxProfiles = maxProfiles
+        self.topFunctions = topFunctions
+        self._sequence = itertools.count()
+
+    @property
+    def enabled(self) -> bool:
+        return self.sampleRate > 0 or bool(self.token)
+
+    # +shouldProfile(headerToken : String) : bool
+    def shouldProfile(self, headerToken: str = None) -> bool:
+        if self.checkToken(headerToken):
+            return True
+        return self.sampleRate > 0 and random.random() < self.sampleRate
+
+    # +checkToken(headerToken : String) : bool
+    def checkToken(self, headerToken: str = None) -> bool:
+        """
+        True if a token is configured and headerToken matches it (constant time)
+        """
+        if not self.token or headerToken is None:
+            return False
+        return hmac.compare_digest(headerToken.encode(), self.token.encode())
+
+    # +start() : Profile
+    def start(self):
+        """
+        Returns an enabled profiler, or None if another profiler is already
+        active (Python 3.12+ allows one at a time per process)
+        """
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return None
+        return profile
+
+    # +finish(profile : Profile, info : dict) : dict
+    def finish(self, profile, info: dict) -> dict:
+        """
+        Stops profile and stores it with info (route, duration_ms, ...);
+        returns the stored summary
+        """
+        profile.disable()
+        os.makedirs(self.directory, exist_ok=True)
+
+        name = "{}-{}-{}-{}".format(
+            time.strftime("%Y%m%dT%H%M%S"), os.getpid(), next(self._sequence), info.get("endpoint") or "request"
+        )
+        summary = dict(info, file=name + ".prof", captured_at=time.time(), top_functions=self._topFunctions(profile))
+
+        profile.dump_stats(os.path.join(self.directory, name + ".prof"))
+        temporaryPath = os.path.join(self.directory, name + ".json.tmp")
+        with open(temporaryPath, "w") as file:
+            json.dump(summary, file)
+        os.replace(temporaryPath, os.path.join(self.directory, name + ".json"))
+
+        self._rotate()
+        return summary
+
+    # +slowest(limit : int) : list
+    def slowest(self, limit: int = 20) -> list:
+        """
+        Stored summaries (from every worker writing to the directory),
+        slowest request first
+        """
+        summaries = []
+        for path in glob.glob(os.path.join(self.directory, "*.json")):
+            try:
+                with open(path) as file:
+                    summaries.append(json.load(file))
+            except (OSError, ValueError):
+                # Rotated away or half-written by another worker
+                continue
+        summaries.sort(key=lambda summary: -summary.get("duration_ms", 0))
+        return summaries[:limit]
+
+    # ---------------- INTERNAL METHODS ---------------- #
+
+    def _topFunctions(self, profile) -> list:
+        stats = pstats.Stats(profile).stats
+        ranked = sorted(stats.items(), key=lambda item: -item[1][3])[:self.topFunctions]
+        return [
+            {
+                "function": f"{_shortPath(filename)}:{line}({function})",
+                "calls": calls,
+                "own_ms": round(ownTime * 1000, 3),
+                "cumulative_ms": round(cumulativeTime * 1000, 3),
+            }
+            for (filename, line, function), (_, calls, ownTime, cumulativeTime, _) in ranked
+        ]
+
+    def _rotate(self):
+        try:
+            captures = sorted(glob.glob(os.path.join(self.directory, "*.prof")), key=os.path.getmtime)
+        except FileNotFoundError:
+            # Another worker rotated concurrently; the next capture retries
+            return
+        for path in captures[:max(0, len(captures) - self.maxProfiles)]:
+            for stale in [path, path[:-len(".prof")] + ".json"]:
+                try:
+                    os.remove(stale)
+                except FileNotFoundError:
+                    pass
+
+
+def _shortPath(filename: str) -> str:
+    # "flask/app.py" rather than a bare "app.py" that could be ours
+    parent, name = os.path.split(filename)
+    return os.path.join(os.path.basename(parent), name) if parent else name
@@ -1,27 +1,29 @@
-import pandas as pd
-import joblib
+import numpy as np
+
+from models.inference_pipeline import getPipeline
 
 class DataPreprocessor:
     def __init__(self):
-        self.imputer = joblib.load("saved_models/imputer.pkl")
-        self.scaler = joblib.load("saved_models/scaler.pkl")
+        # Shared with the API / TriEnsembleModel, loaded once per process
+        self.pipeline = getPipeline()
+        self.imputer = self.pipeline.imputer
+        self.scaler = self.pipeline.scaler
 
-    def preprocessInputData(self, patientData: dict) -> list:
-        numericData = {
-            "Pregnancies": patientData["pregnancies"],
-            "Glucose": patientData["glucose"],
-            "BloodPressure": patientData["bloodPressure"],
-            "SkinThickness": patientData["skinThickness"],
-            "Insulin": patientData["insulin"],
-            "BMI": patientData["BMI"],
-            "DiabetesPedigreeFunction": patientData["diabetesPedigreeFunction"],
-            "Age": patientData["age"]
-        }
+    def buildFeatureRow(self, patientData: dict) -> np.ndarray:
+        numericData = [
+            patientData["pregnancies"],
+            patientData["glucose"],
+            patientData["bloodPressure"],
+            patientData["skinThickness"],
+            patientData["insulin"],
+            patientData["BMI"],
+            patientData["diabetesPedigreeFunction"],
+            patientData["age"]
+        ]
 
-        df = pd.DataFrame([numericData])
+        # Missing values become NaN for the KNN imputer
+        return np.array([[np.nan if value is None else float(value) for value in numericData]])
 
+    def preprocessInputData(self, patientData: dict) -> list:
         # 🔥 ONLY transform (NO fit)
-        df = self.imputer.transform(df)
-        df = self.scaler.transform(df)
-
-        return df[0].tolist()
+        return self.pipeline.transform(self.buildFeatureRow(patientData))[0].tolist()
@@ -1,6 +1,9 @@
 # backend/preprocessing/feature_selector.py
 
-import pandas as pd
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 class FeatureSelector:
     def __init__(self):
@@ -8,7 +11,7 @@ class FeatureSelector:
         self.selectedFeatures = []
 
     # +selectImportantFeatures(dataset : DataFrame) : list
-    def selectImportantFeatures(self, dataset: pd.DataFrame) -> list:
+    def selectImportantFeatures(self, dataset: "pd.DataFrame") -> list:
         """
         Selects important features based on correlation with target.
         (Simple + explainable approach, can be extended later)
@@ -26,7 +29,7 @@ class FeatureSelector:
         return self.selectedFeatures
 
     # +reduceDimensionality(dataset : DataFrame) : DataFrame
-    def reduceDimensionality(self, dataset: pd.DataFrame) -> pd.DataFrame:
+    def reduceDimensionality(self, dataset: "pd.DataFrame") -> "pd.DataFrame":
         """
         Reduces dataset to selected important features
         """
@@ -1,7 +1,16 @@
 # backend/preprocessing/knn_imputer.py
 
-import pandas as pd
+import threading
+from typing import TYPE_CHECKING
+
+import numpy as np
 from sklearn.impute import KNNImputer as SklearnKNNImputer
+from sklearn.neighbors import KDTree
+
+if TYPE_CHECKING:
+    # Only the training-side KNNImputer returns DataFrames; the serving
+    # path never needs pandas
+    import pandas as pd
 
 
 class KNNImputer:
@@ -15,24 +24,101 @@ class KNNImputer:
         )
 
     # +fit(dataset : DataFrame) : void
-    def fit(self, dataset: pd.DataFrame):
+    def fit(self, dataset: "pd.DataFrame"):
         """
         Fits the KNN imputer on dataset
         """
         self.imputer.fit(dataset)
 
     # +transform(dataset : DataFrame) : DataFrame
-    def transform(self, dataset: pd.DataFrame) -> pd.DataFrame:
+    def transform(self, dataset: "pd.DataFrame") -> "pd.DataFrame":
         """
         Transforms dataset using fitted KNN imputer
         """
+        import pandas as pd
+
         imputed_array = self.imputer.transform(dataset)
         return pd.DataFrame(imputed_array, columns=dataset.columns)
 
     # +impute(dataset : DataFrame) : DataFrame
-    def impute(self, dataset: pd.DataFrame) -> pd.DataFrame:
+    def impute(self, dataset: "pd.DataFrame") -> "pd.DataFrame":
         """
         Fits and transforms dataset in one step
         """
+        import pandas as pd
+
         imputed_array = self.imputer.fit_transform(dataset)
         return pd.DataFrame(imputed_array, columns=dataset.columns)
+
+
+class IndexedKNNImputer:
+    """
+    Serving-side wrapper around a fitted sklearn KNNImputer.
+
+    Rows without missing values are returned untouched (KNNImputer never
+    changes them). Rows with missing values are filled from KD-trees built
+    over the stored fit data, one per missing-value pattern, instead of
+    brute-force nan_euclidean distances against every training row.
+    """
+
+    def __init__(self, imputer: SklearnKNNImputer):
+        self.imputer = imputer
+        self.fitData = np.asarray(imputer._fit_X, dtype=float)
+        self.neighbors = min(imputer.n_neighbors, len(self.fitData))
+        self.columnMeans = self.fitData.mean(axis=0)
+
+        # nan_euclidean over complete donors ranks neighbours exactly like
+        # euclidean over the present columns; anything else uses sklearn
+        self.supported = (
+            imputer.metric == "nan_euclidean"
+            and imputer.weights == "uniform"
+            and not np.isnan(self.fitData).any()
+            and isinstance(imputer.missing_values, float)
+            and np.isnan(imputer.missing_values)
+        )
+
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    # +transform(dataset : ndarray) : ndarray
+    def transform(self, dataset: np.ndarray) -> np.ndarray:
+        """
+        Imputes NaNs in an N x features matrix
+        """
+        dataset = np.asarray(dataset, dtype=float)
+        missing = np.isnan(dataset)
+
+        # Fast path: nothing to impute
+        if not missing.any():
+            return dataset
+        if not self.supported:
+            return self.imputer.transform(dataset)
+
+        result = dataset.copy()
+        missingRows = np.flatnonzero(missing.any(axis=1))
+        patterns, patternIds = np.unique(missing[missingRows], axis=0, return_inverse=True)
+
+        for patternId, pattern in enumerate(patterns):
+            rows = missingRows[patternIds.ravel() == patternId]
+            present = ~pattern
+
+            if not present.any():
+                # No distances possible, sklearn falls back to column means
+                result[np.ix_(rows, pattern)] = self.columnMeans[pattern]
+                continue
+
+            _, neighborIds = self._index(present).query(dataset[np.ix_(rows, present)], k=self.neighbors)
+            result[np.ix_(rows, pattern)] = self.fitData[neighborIds][:, :, pattern].mean(axis=1)
+
+        return result
+
+    def _index(self, present: np.ndarray) -> KDTree:
+        key = present.tobytes()
+        index = self._indexes.get(key)
+        if index is None:
+            with self._lock:
+                index = self._indexes.get(key)
+                if index is None:
+                    index = KDTree(self.fitData[:, present])
+                    self._indexes[key] = index
+        return index
@@ -1,8 +1,10 @@
 # backend/reports/report_generator.py
 
-from fpdf import FPDF
 import os
-from models.patient import Patient
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from models.patient import Patient
 
 class ReportGenerator:
     def __init__(self):
@@ -15,7 +17,7 @@ class ReportGenerator:
             os.makedirs("generated_reports")
 
     # +generatePatientReport(patient : Patient, riskLevel : String) : void
-    def generatePatientReport(self, patient: Patient, riskLevel: str):
+    def generatePatientReport(self, patient: "Patient", riskLevel: str):
         self.reportData = {
             "Name": patient.name,
             "Age": patient.age,
@@ -42,6 +44,9 @@ class ReportGenerator:
     # ---------------- INTERNAL METHODS ---------------- #
 
     def _exportPDF(self):
+        # fpdf is only needed for PDF export
+        from fpdf import FPDF
+
         pdf = FPDF()
         pdf.add_page()
         pdf.set_font("Arial", size=12)